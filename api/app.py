@@ -7,36 +7,68 @@ le bad buzz en temps réel.
 Endpoints:
     - GET /: Page d'accueil avec informations API
     - GET /health: Health check
+    - GET /health/live: Sonde de vie (le processus répond)
+    - GET /health/ready: Sonde de disponibilité (modèle chargé et préchauffé)
     - POST /predict: Prédiction de sentiment
     - POST /predict/batch: Prédiction batch
-    - GET /models: Liste des modèles disponibles
+    - POST /predict/stream: Prédiction en flux NDJSON, sans limite de taille
+    - GET /models: Liste des modèles disponibles et modèles chargés en mémoire
+    - GET /executor: État de l'exécuteur d'inférence
+    - GET /cache: Compteurs du cache des prédictions
+    - GET /metrics: Métriques Prometheus (latence par étape, requêtes en cours)
+    - POST /admin/reload: Rechargement à chaud du modèle, sans interruption
+    - GET /startup: Rapport de démarrage (imports, chargement, préchauffage)
 """
 
-from fastapi import FastAPI, HTTPException, status
+import time
+
+# Début de l'import du module (rapport de démarrage)
+APP_IMPORT_START = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict
+import asyncio
+import functools
+import json
 import logging
 from datetime import datetime
 import os
+import threading
 import joblib
 import numpy as np
 
-# Imports conditionnels pour les modèles lourds (uniquement si nécessaire)
-try:
-    import tensorflow as tf
-    from transformers import BertTokenizer, TFBertForSequenceClassification
-    TF_AVAILABLE = True
-except ImportError:
-    TF_AVAILABLE = False
-    logger = logging.getLogger(__name__)
-    logger.warning("TensorFlow/Transformers non disponibles. Seul le modèle logistique sera utilisable.")
-
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import backends
+from batching import MicroBatcher
+from bucketing import DEFAULT_BOUNDARIES, length_buckets, pad_bucket, parse_boundaries
+from cache import PredictionCache, compute_artifact_hash
+from compact_artifacts import is_compact_artifact, load_logistic_artifacts
+from compact_response import COMPACT_MEDIA_TYPE, compact_payload, compress, encode_json, wants_compact
+from executor import ExecutorSaturatedError, InferenceExecutor
+from hot_reload import ArtifactWatcher, ReloadInProgressError
+from keras_graph import KerasGraphModel
+from logging_setup import RequestIdMiddleware, setup_logging, should_sample
+from logistic_scorer import build_logistic_scorer
+import metrics
+from preprocessing import build_preprocessor
+from onnx_backend import MODEL_FILES as ONNX_MODEL_FILES, keras_tokenizer_config, load_onnx_model
+from metrics import BATCH_SIZE_BUCKETS, MetricsMiddleware, observe_stage, observe_tokenization, process_memory, process_rss_bytes, stage_timer
+from recycling import MemoryWatchdog
+from registry import ModelBundle, ModelRegistry, ModelUnavailableError, artifact_size
+from streaming import NDJSONStreamingResponse, iter_ndjson_lines, parse_tweet_line
+
+# TensorFlow et Transformers sont importés au chargement d'un modèle BERT ou Keras
+# (voir backends.py): le modèle logistique démarre sans eux
+
+# Configuration du logging: écriture dans un thread dédié (voir logging_setup.py),
+# JSON par défaut (LOG_FORMAT=text pour une lecture humaine)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Part des requêtes de prédiction journalisées (texte, classe, confiance): 1 pour toutes
+PREDICTION_LOG_SAMPLE_RATE = float(os.getenv("PREDICTION_LOG_SAMPLE_RATE", "0.01"))
+setup_logging(LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, captured_loggers=("uvicorn", "uvicorn.access"))
 logger = logging.getLogger(__name__)
 
 # Initialisation de l'application FastAPI
@@ -57,17 +89,162 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métriques Prometheus des endpoints de prédiction (exposées sur /metrics)
+app.add_middleware(
+    MetricsMiddleware,
+    tracked_paths={"/predict": "predict", "/predict/batch": "batch", "/predict/stream": "stream"}
+)
+
+# Identifiant de requête (X-Request-ID) repris dans chaque log de la requête
+app.add_middleware(RequestIdMiddleware)
+
 # Variables globales pour les modèles
 MODEL_TYPE = os.getenv("MODEL_TYPE", "logistic")  # bert, lstm, cnn, logistic
 MODEL_PATH = os.getenv("MODEL_PATH", "./models/logistic_regression_model.pkl")
 model = None
 tokenizer = None
 vectorizer = None
+model_version = None  # Empreinte des artefacts chargés
+model_size_bytes = 0  # Taille estimée du modèle par défaut
+model_artifacts: List[str] = []  # Fichiers du modèle par défaut
+logistic_scorer = None  # Scoreur compilé TF-IDF + régression logistique
+
+# Registre des autres modèles, chargés à la demande (?model=...) sous un budget mémoire
+# MODEL_PATH_<TYPE>: chemin des artefacts de chaque modèle
+AVAILABLE_MODELS = ["bert", "lstm", "cnn", "logistic", "onnx"]
+DEFAULT_MODEL_PATHS = {
+    "bert": "./models/bert_sentiment_model",
+    "lstm": "./models/lstm_model.h5",
+    "cnn": "./models/cnn_model.h5",
+    "logistic": "./models/logistic_regression_model.pkl",
+    "onnx": "./models/bert_sentiment_onnx",
+}
+MODEL_PATHS = {
+    name: os.getenv(f"MODEL_PATH_{name.upper()}", DEFAULT_MODEL_PATHS[name])
+    for name in AVAILABLE_MODELS
+}
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))  # 0 = illimité
+
+# Cascade (?model=cascade sur /predict et /predict/batch): le premier modèle répond seul
+# quand sa confiance atteint CASCADE_THRESHOLD, les autres tweets passent au second
+# (voir calibrate_cascade.py pour choisir le seuil)
+# CASCADE_DEFAULT: cascade pour les requêtes sans paramètre ?model=
+CASCADE_MODEL = "cascade"
+CASCADE_FIRST_STAGE = os.getenv("CASCADE_FIRST_STAGE", "logistic")
+CASCADE_SECOND_STAGE = os.getenv("CASCADE_SECOND_STAGE", "bert")
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.8"))
+CASCADE_DEFAULT = os.getenv("CASCADE_DEFAULT", "false").lower() == "true"
+
+# Scoreur compilé pour le modèle logistique (repli sur scikit-learn si désactivé)
+LOGISTIC_FAST_PATH = os.getenv("LOGISTIC_FAST_PATH", "true").lower() == "true"
+# Format compact (MODEL_PATH = répertoire exporté par compact_artifacts.py):
+# vérification des empreintes SHA-256 au chargement
+COMPACT_VERIFY = os.getenv("COMPACT_VERIFY", "true").lower() == "true"
+
+# Backend ONNX Runtime (MODEL_TYPE=onnx, MODEL_PATH = répertoire exporté par onnx_backend.py)
+# ONNX_PRECISION: int8 (quantifié, si exporté) ou fp32; ONNX_THREADS: 0 = nombre de coeurs
+ONNX_PRECISION = os.getenv("ONNX_PRECISION", "int8")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
 
 # Configuration
 MAX_LENGTH = 128
+# Tranches de longueur des séquences BERT: chaque tranche est complétée jusqu'à sa plus
+# longue séquence au lieu de MAX_LENGTH (voir bucketing.py)
+BERT_LENGTH_BUCKETS = parse_boundaries(
+    os.getenv("BERT_LENGTH_BUCKETS", ",".join(str(b) for b in DEFAULT_BOUNDARIES))
+)
 SENTIMENT_LABELS = {0: "Négatif", 1: "Positif"}
 
+# Rechargement à chaud du modèle par défaut (POST /admin/reload)
+# MODEL_WATCH_INTERVAL: scrutation des artefacts en secondes (0 = désactivée)
+# ADMIN_TOKEN: si défini, exigé dans l'en-tête X-Admin-Token des endpoints /admin
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+model_lock = threading.Lock()  # Échange atomique du modèle par défaut
+reload_lock = threading.Lock()  # Un seul rechargement à la fois
+
+# Workers gunicorn (gunicorn.conf.py): le modèle est chargé une fois dans le processus
+# maître puis partagé par fork. WORKER_MAX_MEMORY_MB: recyclage d'un worker dont la
+# mémoire propre dépasse ce seuil (0 = désactivé)
+WORKER_MAX_MEMORY_MB = float(os.getenv("WORKER_MAX_MEMORY_MB", "0"))
+WORKER_MEMORY_CHECK_INTERVAL = float(os.getenv("WORKER_MEMORY_CHECK_INTERVAL", "15"))
+model_preload: Optional[Dict] = None  # Rempli par preload_model() dans le maître
+worker_recycling_enabled = False  # Activé dans chaque worker par gunicorn.conf.py (post_fork)
+worker_started_at = time.time()
+
+# Préchauffage au démarrage: un batch représentatif de chaque taille de WARMUP_BATCH_SIZES
+# (par défaut, les tranches de taille des métriques) passe dans chaque modèle chargé,
+# ainsi que dans les modèles de WARMUP_MODELS, chargés dans le registre au démarrage.
+# /health/ready ne répond 200 qu'une fois le préchauffage terminé
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_BATCH_SIZES = parse_boundaries(
+    os.getenv("WARMUP_BATCH_SIZES", ",".join(str(upper) for upper, _ in BATCH_SIZE_BUCKETS))
+)
+WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "").split(",") if name.strip()]
+# Textes de longueurs variées (plusieurs tranches de longueur BERT)
+WARMUP_TEXTS = [
+    "Great flight, thank you!",
+    "Worst delay ever, they lost my luggage",
+    "Flight from Paris delayed four hours, no information at the gate, rude crew and my "
+    "luggage ended up in another city. Never flying with you again, terrible service!",
+]
+warmup_report: Dict = {"status": "pending", "seconds": {}, "error": None}
+
+# Prétraitement des tweets avant le modèle, identique à celui de l'entraînement
+# (voir preprocessing.py): lemmatize (modèles livrés), stem ou none (textes bruts).
+# Construit avec le modèle (nltk importé à ce moment, pas à l'import de l'API). Si nltk
+# ou ses corpus manquent, le worker n'est pas déclaré prêt: les modèles servis ont été
+# entraînés sur des textes lemmatisés, les textes bruts dégradent les prédictions.
+# PREPROCESSING_FALLBACK=true accepte explicitement de servir les textes bruts.
+TEXT_PREPROCESSING = os.getenv("TEXT_PREPROCESSING", "lemmatize")
+PREPROCESSING_CACHE_SIZE = int(os.getenv("PREPROCESSING_CACHE_SIZE", "100000"))
+PREPROCESSING_FALLBACK = os.getenv("PREPROCESSING_FALLBACK", "false").lower() == "true"
+text_preprocessor = None
+preprocessing_loaded = False
+preprocessing_error: Optional[str] = None
+
+# Micro-batching des appels concurrents à /predict
+# (taille maximale du batch, attente maximale en ms) par type de modèle,
+# surchargeables via MICROBATCH_MAX_SIZE_<TYPE> et MICROBATCH_MAX_WAIT_MS_<TYPE>
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "true").lower() == "true"
+MICROBATCH_DEFAULTS = {
+    "bert": (32, 10.0),
+    "lstm": (64, 5.0),
+    "cnn": (64, 5.0),
+    "logistic": (128, 2.0),
+    "onnx": (32, 5.0),
+    "cascade": (64, 5.0),
+}
+micro_batchers: Dict[str, MicroBatcher] = {}
+
+# Cache des prédictions (texte normalisé + type de modèle + empreinte des artefacts)
+# PREDICTION_CACHE_ENDPOINTS: endpoints qui consultent le cache (predict, batch)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_ENDPOINTS = {
+    endpoint.strip()
+    for endpoint in os.getenv("PREDICTION_CACHE_ENDPOINTS", "predict,batch").split(",")
+    if endpoint.strip()
+}
+prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+
+# Format compact de /predict/batch (?format=compact, voir compact_response.py), compressé
+# au-delà de RESPONSE_COMPRESSION_MIN_BYTES avec le premier algorithme de
+# RESPONSE_COMPRESSION accepté par le client (vide = pas de compression)
+RESPONSE_COMPRESSION = [
+    algorithm.strip() for algorithm in os.getenv("RESPONSE_COMPRESSION", "zstd,gzip").split(",")
+    if algorithm.strip()
+]
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+# Scoring en flux NDJSON: nombre de tweets inférés ensemble
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+
+# Exécuteur d'inférence (thread, process ou inline) hors de la boucle d'événements
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_POOL_SIZE = int(os.getenv("INFERENCE_POOL_SIZE", "0")) or None
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+
 
 # Modèles Pydantic pour la validation
 class TweetInput(BaseModel):
@@ -103,6 +280,8 @@ class PredictionOutput(BaseModel):
     probabilities: Dict[str, float]
     timestamp: str
     model_type: str
+    model_version: Optional[str] = None  # Empreinte des artefacts qui ont servi
+    stage: Optional[str] = None  # Cascade: modèle qui a répondu
 
 
 class BatchPredictionOutput(BaseModel):
@@ -117,6 +296,7 @@ class HealthResponse(BaseModel):
     """Modèle de sortie pour le health check"""
     status: str
     model_loaded: bool
+    ready: bool = False  # Modèle préchauffé (voir /health/ready)
     model_type: str
     timestamp: str
 
@@ -126,21 +306,221 @@ class ModelInfo(BaseModel):
     available_models: List[str]
     current_model: str
     model_path: str
+    resident_models: List[Dict] = []
+    registry: Dict = {}
+    cascade: Dict = {}
+    preprocessing: Dict = {}
 
 
-def load_bert_model():
+def build_bert_bundle(model_path: str) -> ModelBundle:
     """Charge le modèle BERT et son tokenizer"""
-    global model, tokenizer
+    backends.tensorflow()
+    hf = backends.transformers()
+
+    bert_model = hf.TFBertForSequenceClassification.from_pretrained(model_path)
+    # Tokenizer rapide (Rust), bien plus rapide que BertTokenizer en Python pur
+    bert_tokenizer = hf.BertTokenizerFast.from_pretrained(model_path)
+    return ModelBundle(
+        "bert", model_path, bert_model,
+        tokenizer=bert_tokenizer,
+        version=compute_artifact_hash([model_path]),
+        size_bytes=artifact_size([model_path]),
+        artifacts=[model_path]
+    )
 
-    if not TF_AVAILABLE:
-        logger.error("TensorFlow/Transformers non installés. Impossible de charger BERT.")
-        return False
 
+def build_dl_bundle(model_type: str, model_path: str) -> ModelBundle:
+    """
+    Charge un modèle Deep Learning (LSTM/CNN) et son tokenizer Keras, compilés en un
+    seul graphe TensorFlow (tokenisation comprise, voir keras_graph.py)
+
+    Raises:
+        FileNotFoundError: Si le tokenizer associé est absent
+    """
+    tf = backends.tensorflow()
+
+    dl_model = tf.keras.models.load_model(model_path)
+
+    # Charger le tokenizer Keras associé
+    tokenizer_path = model_path.replace('.h5', '_tokenizer.pkl')
+    if not os.path.exists(tokenizer_path):
+        raise FileNotFoundError(f"Tokenizer introuvable: {tokenizer_path}")
+    dl_tokenizer = joblib.load(tokenizer_path)
+    artifacts = [model_path, tokenizer_path]
+
+    graph_model = KerasGraphModel(dl_model, keras_tokenizer_config(dl_tokenizer), MAX_LENGTH)
+    return ModelBundle(
+        model_type, model_path, graph_model,
+        tokenizer=dl_tokenizer,
+        version=compute_artifact_hash(artifacts),
+        size_bytes=artifact_size(artifacts),
+        artifacts=artifacts
+    )
+
+
+def build_compact_logistic_bundle(artifact_dir: str) -> ModelBundle:
+    """Charge le modèle logistique au format compact (tableaux lus par numpy.memmap)"""
+    scorer, manifest = load_logistic_artifacts(artifact_dir, verify=COMPACT_VERIFY)
+    logger.info(
+        f"Artefacts compacts chargés (format v{manifest['format_version']}, "
+        f"vocabulary: {manifest['vocabulary_size']} mots)"
+    )
+
+    # Pas de pipeline scikit-learn: le scoreur compilé sert aussi de modèle
+    return ModelBundle(
+        "logistic", artifact_dir, scorer,
+        logistic_scorer=scorer,
+        version=manifest["version"],
+        size_bytes=artifact_size([artifact_dir]),
+        artifacts=[artifact_dir]
+    )
+
+
+def build_logistic_bundle(model_path: str) -> ModelBundle:
+    """Charge le modèle de régression logistique et son vectorizer TF-IDF"""
+    if is_compact_artifact(model_path):
+        return build_compact_logistic_bundle(model_path)
+
+    lr_model = joblib.load(model_path)
+
+    # Charger le vectorizer TF-IDF associé
+    base_dir = os.path.dirname(model_path)
+    vectorizer_path = os.path.join(base_dir, 'tfidf_vectorizer.pkl')
+
+    if not os.path.exists(vectorizer_path):
+        vectorizer_path = model_path.replace('logistic_regression_model.pkl', 'tfidf_vectorizer.pkl')
+
+    if not os.path.exists(vectorizer_path):
+        raise FileNotFoundError(f"Vectorizer non trouvé: {vectorizer_path}")
+
+    tfidf = joblib.load(vectorizer_path)
+
+    # Vérifier que le vectorizer a l'attribut idf_
+    if not hasattr(tfidf, 'idf_'):
+        raise ValueError("Le vectorizer n'a pas d'attribut idf_ - problème de version scikit-learn")
+
+    # Compilation du pipeline linéaire en une table terme -> (idf, idf * coef)
+    scorer = build_logistic_scorer(tfidf, lr_model) if LOGISTIC_FAST_PATH else None
+    if LOGISTIC_FAST_PATH and scorer is None:
+        logger.warning("Pipeline logistique non compilable, utilisation de scikit-learn")
+    logger.info(f"Modèle et vectorizer chargés avec succès (vocabulary: {len(tfidf.vocabulary_)} mots)")
+
+    artifacts = [model_path, vectorizer_path]
+    return ModelBundle(
+        "logistic", model_path, lr_model,
+        vectorizer=tfidf,
+        logistic_scorer=scorer,
+        version=compute_artifact_hash(artifacts),
+        size_bytes=artifact_size(artifacts),
+        artifacts=artifacts
+    )
+
+
+def build_onnx_bundle(model_path: str, precision: Optional[str] = None) -> ModelBundle:
+    """Charge un modèle exporté au format ONNX dans une session onnxruntime"""
+    onnx_model, onnx_tokenizer, manifest = load_onnx_model(
+        model_path, precision=precision or ONNX_PRECISION, threads=ONNX_THREADS
+    )
+    logger.info(
+        f"Modèle ONNX chargé ({manifest['source_type']}, {onnx_model.precision}, "
+        f"opset {manifest['opset']})"
+    )
+
+    # Version: empreinte du fichier servi (fp32 et int8 ont des prédictions différentes)
+    return ModelBundle(
+        "onnx", model_path, onnx_model,
+        tokenizer=onnx_tokenizer,
+        version=manifest["files"][ONNX_MODEL_FILES[onnx_model.precision]][:12],
+        size_bytes=artifact_size([model_path]),
+        artifacts=[model_path]
+    )
+
+
+def build_bundle(model_type: str, model_path: str) -> ModelBundle:
+    """
+    Charge les artefacts d'un modèle
+
+    Raises:
+        ValueError: Si le type de modèle n'est pas supporté
+    """
+    if model_type == "bert":
+        return build_bert_bundle(model_path)
+    elif model_type in ["lstm", "cnn"]:
+        return build_dl_bundle(model_type, model_path)
+    elif model_type == "logistic":
+        return build_logistic_bundle(model_path)
+    elif model_type == "onnx":
+        return build_onnx_bundle(model_path)
+    raise ValueError(f"Type de modèle non supporté: {model_type}")
+
+
+def install_bundle(bundle: ModelBundle):
+    """
+    Installe un modèle chargé comme modèle par défaut
+
+    L'échange est atomique: une requête voit soit l'ancien jeu d'artefacts, soit le
+    nouveau, jamais un mélange (ex: nouveau modèle avec l'ancien vectorizer).
+    """
+    global model, tokenizer, vectorizer, logistic_scorer, model_version, model_size_bytes
+    global model_artifacts, MODEL_PATH
+    with model_lock:
+        model = bundle.model
+        tokenizer = bundle.tokenizer
+        vectorizer = bundle.vectorizer
+        logistic_scorer = bundle.logistic_scorer
+        model_version = bundle.version
+        model_size_bytes = bundle.size_bytes
+        model_artifacts = bundle.artifacts
+        MODEL_PATH = bundle.model_path
+    model_registry.pinned_bytes = bundle.size_bytes
+
+
+def current_bundle() -> ModelBundle:
+    """
+    Modèle par défaut, lu dans les variables globales au moment de l'appel
+
+    Les requêtes en cours gardent ce modèle jusqu'à leur fin, même s'il est remplacé
+    entre-temps par un rechargement.
+    """
+    with model_lock:
+        return ModelBundle(
+            MODEL_TYPE, MODEL_PATH, model,
+            tokenizer=tokenizer,
+            vectorizer=vectorizer,
+            logistic_scorer=logistic_scorer,
+            version=model_version,
+            size_bytes=model_size_bytes,
+            artifacts=model_artifacts
+        )
+
+
+model_registry = ModelRegistry(
+    build_bundle,
+    MODEL_PATHS,
+    memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024)
+)
+
+
+def get_bundle(model_name: Optional[str] = None) -> ModelBundle:
+    """
+    Retourne le modèle demandé: le modèle par défaut (None ou MODEL_TYPE), ou un
+    modèle du registre, chargé au premier appel
+
+    Raises:
+        ValueError: Si le modèle est inconnu
+        ModelUnavailableError: Si le chargement échoue
+    """
+    if model_name is None or model_name == MODEL_TYPE:
+        return current_bundle()
+    return model_registry.get(model_name)
+
+
+def load_bert_model():
+    """Charge le modèle BERT et son tokenizer"""
     try:
         logger.info(f"Chargement du modèle BERT depuis {MODEL_PATH}")
-        model = TFBertForSequenceClassification.from_pretrained(MODEL_PATH)
-        tokenizer = BertTokenizer.from_pretrained(MODEL_PATH)
-        logger.info("Modèle BERT chargé avec succès")
+        install_bundle(build_bert_bundle(MODEL_PATH))
+        logger.info(f"Modèle BERT chargé avec succès (version: {model_version})")
         return True
     except Exception as e:
         logger.error(f"Erreur lors du chargement du modèle BERT: {e}")
@@ -149,55 +529,33 @@ def load_bert_model():
 
 def load_dl_model(model_path: str):
     """Charge un modèle Deep Learning (LSTM/CNN)"""
-    global model, vectorizer, tokenizer
-
-    if not TF_AVAILABLE:
-        logger.error("TensorFlow non installé. Impossible de charger le modèle Deep Learning.")
-        return False
-
     try:
         logger.info(f"Chargement du modèle DL depuis {model_path}")
-        model = tf.keras.models.load_model(model_path)
+        install_bundle(build_dl_bundle(MODEL_TYPE, model_path))
+        logger.info(f"Modèle DL chargé avec succès (version: {model_version})")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement du modèle DL: {e}")
+        return False
 
-        # Charger le tokenizer Keras associé
-        tokenizer_path = model_path.replace('.h5', '_tokenizer.pkl')
-        if os.path.exists(tokenizer_path):
-            tokenizer = joblib.load(tokenizer_path)
 
-        logger.info("Modèle DL chargé avec succès")
+def load_onnx_serving_model(model_path: str):
+    """Charge un modèle exporté au format ONNX"""
+    try:
+        logger.info(f"Chargement du modèle ONNX depuis {model_path}")
+        install_bundle(build_onnx_bundle(model_path))
+        logger.info(f"Modèle ONNX chargé avec succès (version: {model_version})")
         return True
     except Exception as e:
-        logger.error(f"Erreur lors du chargement du modèle DL: {e}")
+        logger.error(f"Erreur lors du chargement du modèle ONNX: {e}")
         return False
 
 
 def load_logistic_model(model_path: str):
     """Charge le modèle de régression logistique"""
-    global model, vectorizer
     try:
         logger.info(f"Chargement du modèle logistique depuis {model_path}")
-        model = joblib.load(model_path)
-
-        # Charger le vectorizer TF-IDF associé
-        base_dir = os.path.dirname(model_path)
-        vectorizer_path = os.path.join(base_dir, 'tfidf_vectorizer.pkl')
-
-        if not os.path.exists(vectorizer_path):
-            vectorizer_path = model_path.replace('logistic_regression_model.pkl', 'tfidf_vectorizer.pkl')
-
-        if os.path.exists(vectorizer_path):
-            vectorizer = joblib.load(vectorizer_path)
-
-            # Vérifier que le vectorizer a l'attribut idf_
-            if not hasattr(vectorizer, 'idf_'):
-                logger.error("Le vectorizer n'a pas d'attribut idf_ - problème de version scikit-learn")
-                return False
-
-            logger.info(f"Modèle et vectorizer chargés avec succès (vocabulary: {len(vectorizer.vocabulary_)} mots)")
-        else:
-            logger.error(f"Vectorizer non trouvé: {vectorizer_path}")
-            return False
-
+        install_bundle(build_logistic_bundle(model_path))
         return True
     except Exception as e:
         logger.error(f"Erreur lors du chargement du modèle logistique: {e}")
@@ -206,27 +564,13 @@ def load_logistic_model(model_path: str):
         return False
 
 
-def predict_bert(text: str) -> tuple:
+def _format_prediction(probabilities) -> tuple:
     """
-    Prédiction avec BERT
+    Convertit un vecteur de probabilités [négatif, positif] en prédiction
 
     Returns:
         (predicted_class, confidence, probabilities)
     """
-    # Tokenisation
-    encoding = tokenizer(
-        text,
-        truncation=True,
-        padding='max_length',
-        max_length=MAX_LENGTH,
-        return_tensors='tf'
-    )
-
-    # Prédiction
-    outputs = model(encoding)
-    logits = outputs.logits
-    probabilities = tf.nn.softmax(logits, axis=1).numpy()[0]
-
     predicted_class = int(np.argmax(probabilities))
     confidence = float(probabilities[predicted_class])
 
@@ -236,6 +580,109 @@ def predict_bert(text: str) -> tuple:
     }
 
 
+def _softmax(logits) -> np.ndarray:
+    """Softmax numériquement stable sur la dernière dimension"""
+    logits = np.asarray(logits, dtype=np.float64)
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _bert_bucketed_logits(texts: List[str], bert_tokenizer, forward, model_type: str) -> np.ndarray:
+    """
+    Tokenise un batch sans remplissage, puis exécute une passe forward par tranche de
+    longueur, chaque tranche complétée jusqu'à sa plus longue séquence
+
+    Args:
+        bert_tokenizer: Tokenizer Transformers
+        forward: Fonction (entrées numpy) -> logits de la tranche
+        model_type: Étiquette des métriques (bert, onnx)
+
+    Returns:
+        Logits dans l'ordre des textes
+    """
+    # Tokenisation de tout le batch en un seul appel
+    with stage_timer("tokenization", model_type, len(texts)):
+        encoding = bert_tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+        lengths = [len(ids) for ids in encoding["input_ids"]]
+        pad_values = {"input_ids": int(bert_tokenizer.pad_token_id or 0)}
+        buckets = [
+            (indices, pad_bucket(encoding, indices, pad_values))
+            for indices in length_buckets(lengths, BERT_LENGTH_BUCKETS)
+        ]
+
+    observe_tokenization(
+        model_type, len(texts), sum(lengths),
+        sum(features["input_ids"].size for _, features in buckets)
+    )
+
+    logits = np.empty((len(texts), 2))
+    with stage_timer("model_forward", model_type, len(texts)):
+        for indices, features in buckets:
+            logits[indices] = np.asarray(forward(features))
+    return logits
+
+
+def predict_bert_batch(texts: List[str], bundle: Optional[ModelBundle] = None) -> List[tuple]:
+    """
+    Prédiction batch avec BERT (une passe forward par tranche de longueur)
+
+    Args:
+        bundle: Modèle à utiliser (défaut: modèle par défaut)
+
+    Returns:
+        Liste de (predicted_class, confidence, probabilities), dans l'ordre des textes
+    """
+    if not texts:
+        return []
+    bundle = bundle or current_bundle()
+
+    logits = _bert_bucketed_logits(
+        texts, bundle.tokenizer, lambda features: bundle.model(features).logits, "bert"
+    )
+    return [_format_prediction(row) for row in _softmax(logits)]
+
+
+def predict_bert(text: str) -> tuple:
+    """
+    Prédiction avec BERT
+
+    Returns:
+        (predicted_class, confidence, probabilities)
+    """
+    return predict_bert_batch([text])[0]
+
+
+def predict_dl_batch(texts: List[str], bundle: Optional[ModelBundle] = None) -> List[tuple]:
+    """
+    Prédiction batch avec modèle Deep Learning (LSTM/CNN)
+
+    Args:
+        bundle: Modèle à utiliser (défaut: modèle par défaut)
+
+    Returns:
+        Liste de (predicted_class, confidence, probabilities), dans l'ordre des textes
+    """
+    if not texts:
+        return []
+    bundle = bundle or current_bundle()
+
+    # Tokenisation et prédiction dans le même graphe: un seul appel, sans model.predict()
+    with stage_timer("model_forward", bundle.model_type, len(texts)):
+        predictions = np.asarray(bundle.model.predict(texts))
+
+    return [_format_prediction(row) for row in _keras_probabilities(predictions)]
+
+
+def _keras_probabilities(predictions: np.ndarray) -> np.ndarray:
+    """Probabilités [négatif, positif] à partir de la sortie softmax ou sigmoïde d'un modèle Keras"""
+    if predictions.shape[1] == 2:
+        return predictions
+
+    # Si sortie unique (sigmoid)
+    prob_positive = predictions[:, 0]
+    return np.column_stack([1 - prob_positive, prob_positive])
+
+
 def predict_dl(text: str) -> tuple:
     """
     Prédiction avec modèle Deep Learning (LSTM/CNN)
@@ -243,31 +690,63 @@ def predict_dl(text: str) -> tuple:
     Returns:
         (predicted_class, confidence, probabilities)
     """
-    # Tokenisation avec Keras Tokenizer
-    sequence = tokenizer.texts_to_sequences([text])
-    padded = tf.keras.preprocessing.sequence.pad_sequences(
-        sequence,
-        maxlen=MAX_LENGTH,
-        padding='post'
-    )
+    return predict_dl_batch([text])[0]
 
-    # Prédiction
-    prediction = model.predict(padded, verbose=0)[0]
 
-    if len(prediction) == 2:
-        probabilities = prediction
-    else:
-        # Si sortie unique (sigmoid)
-        prob_positive = float(prediction[0])
-        probabilities = [1 - prob_positive, prob_positive]
+def predict_onnx_batch(texts: List[str], bundle: Optional[ModelBundle] = None) -> List[tuple]:
+    """
+    Prédiction batch avec un modèle exporté au format ONNX (onnxruntime, sans TensorFlow)
 
-    predicted_class = int(np.argmax(probabilities))
-    confidence = float(probabilities[predicted_class])
+    Args:
+        bundle: Modèle à utiliser (défaut: modèle par défaut)
 
-    return predicted_class, confidence, {
-        "negative": float(probabilities[0]),
-        "positive": float(probabilities[1])
-    }
+    Returns:
+        Liste de (predicted_class, confidence, probabilities), dans l'ordre des textes
+    """
+    if not texts:
+        return []
+    bundle = bundle or current_bundle()
+
+    if bundle.model.source_type == "bert":
+        logits = _bert_bucketed_logits(texts, bundle.tokenizer, bundle.model.run, "onnx")
+        return [_format_prediction(row) for row in _softmax(logits)]
+
+    with stage_timer("tokenization", "onnx", len(texts)):
+        features = bundle.tokenizer.encode(texts, MAX_LENGTH)
+
+    with stage_timer("model_forward", "onnx", len(texts)):
+        probabilities = _keras_probabilities(bundle.model.run(features))
+
+    return [_format_prediction(row) for row in probabilities]
+
+
+def predict_logistic_batch(texts: List[str], bundle: Optional[ModelBundle] = None) -> List[tuple]:
+    """
+    Prédiction batch avec régression logistique
+
+    Args:
+        bundle: Modèle à utiliser (défaut: modèle par défaut)
+
+    Returns:
+        Liste de (predicted_class, confidence, probabilities), dans l'ordre des textes
+    """
+    if not texts:
+        return []
+    bundle = bundle or current_bundle()
+
+    # Scoreur compilé: pas de matrice creuse, un seul calcul des logits
+    # (la vectorisation est fusionnée dans la passe forward)
+    if bundle.logistic_scorer is not None:
+        with stage_timer("model_forward", "logistic", len(texts)):
+            probabilities = bundle.logistic_scorer.predict_proba(texts)
+    else:
+        # Vectorisation TF-IDF
+        with stage_timer("vectorization", "logistic", len(texts)):
+            texts_vectorized = bundle.vectorizer.transform(texts)
+        with stage_timer("model_forward", "logistic", len(texts)):
+            probabilities = bundle.model.predict_proba(texts_vectorized)
+
+    return [_format_prediction(row) for row in probabilities]
 
 
 def predict_logistic(text: str) -> tuple:
@@ -277,40 +756,592 @@ def predict_logistic(text: str) -> tuple:
     Returns:
         (predicted_class, confidence, probabilities)
     """
-    # Vectorisation TF-IDF
-    text_vectorized = vectorizer.transform([text])
+    return predict_logistic_batch([text])[0]
 
-    # Prédiction
-    predicted_class = int(model.predict(text_vectorized)[0])
-    probabilities = model.predict_proba(text_vectorized)[0]
-    confidence = float(probabilities[predicted_class])
 
-    return predicted_class, confidence, {
-        "negative": float(probabilities[0]),
-        "positive": float(probabilities[1])
+def predict_texts(texts: List[str], model_name: Optional[str] = None) -> List[tuple]:
+    """
+    Prédit le sentiment d'une liste de textes
+
+    Args:
+        model_name: Modèle du registre à utiliser (défaut: modèle par défaut)
+
+    Returns:
+        Liste de (predicted_class, confidence, probabilities), dans l'ordre des textes
+
+    Raises:
+        ValueError: Si le type de modèle n'est pas supporté
+        ModelUnavailableError: Si le modèle demandé ne peut pas être chargé
+    """
+    return predict_with_bundle(texts, get_bundle(model_name))
+
+
+def predict_texts_versioned(texts: List[str], model_name: Optional[str] = None) -> List[tuple]:
+    """
+    Prédit une liste de textes en indiquant la version des artefacts utilisés
+
+    Returns:
+        Liste de (model_version, (predicted_class, confidence, probabilities))
+    """
+    bundle = get_bundle(model_name)
+    return [(bundle.version, prediction) for prediction in predict_with_bundle(texts, bundle)]
+
+
+def load_text_preprocessor() -> bool:
+    """
+    Construit le prétraitement TEXT_PREPROCESSING (une fois par processus)
+
+    Returns:
+        False si nltk ou ses corpus manquent (aucun prétraitement construit)
+    """
+    global text_preprocessor, preprocessing_loaded, preprocessing_error
+    if preprocessing_loaded:
+        return preprocessing_error is None
+
+    try:
+        if TEXT_PREPROCESSING != "none":
+            backends.import_backend("nltk")
+        text_preprocessor = build_preprocessor(TEXT_PREPROCESSING, PREPROCESSING_CACHE_SIZE)
+        preprocessing_error = None
+    except ImportError as e:
+        text_preprocessor, preprocessing_error = None, str(e)
+    except LookupError:
+        text_preprocessor = None
+        preprocessing_error = "corpus NLTK manquants (python -m nltk.downloader stopwords wordnet omw-1.4)"
+    preprocessing_loaded = True
+
+    if preprocessing_error is None:
+        return True
+    if PREPROCESSING_FALLBACK:
+        logger.warning(f"Prétraitement {TEXT_PREPROCESSING} désactivé (PREPROCESSING_FALLBACK): {preprocessing_error}")
+    else:
+        logger.error(
+            f"Prétraitement {TEXT_PREPROCESSING} impossible: {preprocessing_error}. "
+            "Worker non prêt (PREPROCESSING_FALLBACK=true pour servir les textes bruts)"
+        )
+    return False
+
+
+def preprocessing_ready() -> bool:
+    """Prétraitement disponible, ou textes bruts acceptés par PREPROCESSING_FALLBACK"""
+    return load_text_preprocessor() or PREPROCESSING_FALLBACK
+
+
+def preprocess_texts(texts: List[str], model_type: str) -> List[str]:
+    """Nettoie les textes comme à l'entraînement (inchangés si TEXT_PREPROCESSING=none)"""
+    if text_preprocessor is None or not texts:
+        return texts
+    with stage_timer("preprocessing", model_type, len(texts)):
+        return text_preprocessor.clean_batch(texts)
+
+
+def preprocessing_info() -> Dict:
+    """Prétraitement appliqué et état du cache des tokens"""
+    if text_preprocessor is None:
+        return {"mode": "none", "requested": TEXT_PREPROCESSING, "error": preprocessing_error}
+    cache = text_preprocessor.cache_info()
+    return {
+        "mode": text_preprocessor.mode,
+        "requested": TEXT_PREPROCESSING,
+        "token_cache": {"size": cache.currsize, "max_size": cache.maxsize, "hits": cache.hits, "misses": cache.misses},
+    }
+
+
+def predict_with_bundle(texts: List[str], bundle: ModelBundle) -> List[tuple]:
+    """
+    Prédit une liste de textes bruts avec un modèle chargé (prétraités comme à l'entraînement)
+
+    Raises:
+        ValueError: Si le type de modèle n'est pas supporté
+    """
+    texts = preprocess_texts(texts, bundle.model_type)
+    if bundle.model_type == "bert":
+        return predict_bert_batch(texts, bundle)
+    elif bundle.model_type in ["lstm", "cnn"]:
+        return predict_dl_batch(texts, bundle)
+    elif bundle.model_type == "logistic":
+        return predict_logistic_batch(texts, bundle)
+    elif bundle.model_type == "onnx":
+        return predict_onnx_batch(texts, bundle)
+    else:
+        raise ValueError(f"Type de modèle non supporté: {bundle.model_type}")
+
+
+CASCADE_ANSWERS = metrics.REGISTRY.counter(
+    "airparadis_cascade_answers_total", "Tweets de la cascade par modèle qui a répondu", ["model_type"]
+)
+
+
+def cascade_bundle(model_name: str) -> ModelBundle:
+    """
+    Modèle d'une étape de la cascade
+
+    Raises:
+        ModelUnavailableError: Si le modèle n'est pas chargé (modèle par défaut absent)
+            ou ne peut pas l'être
+    """
+    bundle = get_bundle(model_name)
+    if bundle.model is None:
+        raise ModelUnavailableError(f"Modèle {model_name} de la cascade non chargé")
+    return bundle
+
+
+def cascade_unavailable_stages() -> List[str]:
+    """
+    Étapes de la cascade qui ne pourront pas répondre: modèle par défaut non chargé, ou
+    modèle du registre ni résident ni présent sur disque
+    """
+    unavailable = []
+    for stage in (CASCADE_FIRST_STAGE, CASCADE_SECOND_STAGE):
+        if stage == MODEL_TYPE:
+            available = model_is_loaded()
+        else:
+            available = model_registry.peek(stage) is not None or os.path.exists(MODEL_PATHS[stage])
+        if not available:
+            unavailable.append(stage)
+    return unavailable
+
+
+def predict_cascade(texts: List[str], threshold: Optional[float] = None) -> List[tuple]:
+    """
+    Prédit avec la cascade: le premier modèle (logistique) score tous les textes, seuls
+    ceux dont la confiance est inférieure au seuil sont confiés au second (BERT, LSTM...)
+
+    Args:
+        threshold: Confiance minimale du premier modèle (défaut: CASCADE_THRESHOLD)
+
+    Returns:
+        Liste de (modèle qui a répondu, model_version, prédiction), dans l'ordre des textes
+
+    Raises:
+        ModelUnavailableError: Si un des modèles ne peut pas être chargé
+    """
+    threshold = CASCADE_THRESHOLD if threshold is None else threshold
+
+    first = cascade_bundle(CASCADE_FIRST_STAGE)
+    results = [
+        (CASCADE_FIRST_STAGE, first.version, prediction)
+        for prediction in predict_with_bundle(texts, first)
+    ]
+
+    uncertain = [i for i, (_, _, (_, confidence, _)) in enumerate(results) if confidence < threshold]
+    if uncertain:
+        second = cascade_bundle(CASCADE_SECOND_STAGE)
+        predictions = predict_with_bundle([texts[i] for i in uncertain], second)
+        for i, prediction in zip(uncertain, predictions):
+            results[i] = (CASCADE_SECOND_STAGE, second.version, prediction)
+
+    CASCADE_ANSWERS.inc(len(texts) - len(uncertain), model_type=CASCADE_FIRST_STAGE)
+    CASCADE_ANSWERS.inc(len(uncertain), model_type=CASCADE_SECOND_STAGE)
+    return results
+
+
+def load_model() -> bool:
+    """
+    Charge le modèle correspondant à MODEL_TYPE (et le prétraitement des textes)
+
+    Returns:
+        False si le modèle ne peut pas être chargé, ou si le prétraitement est impossible
+        sans PREPROCESSING_FALLBACK (les modèles sont entraînés sur des textes nettoyés)
+    """
+    if not preprocessing_ready():
+        return False
+    if MODEL_TYPE == "bert":
+        return load_bert_model()
+    elif MODEL_TYPE in ["lstm", "cnn"]:
+        return load_dl_model(MODEL_PATH)
+    elif MODEL_TYPE == "logistic":
+        return load_logistic_model(MODEL_PATH)
+    elif MODEL_TYPE == "onnx":
+        return load_onnx_serving_model(MODEL_PATH)
+
+    logger.error(f"Type de modèle non reconnu: {MODEL_TYPE}")
+    return False
+
+
+def init_inference_worker(model_type: str, model_path: str):
+    """
+    Initialise un processus du pool d'inférence (charge le modèle s'il est absent)
+
+    Raises:
+        RuntimeError: Si le modèle ne peut pas être chargé (le pool est alors cassé:
+            les tâches échouent avec BrokenProcessPool au lieu de s'exécuter sans modèle)
+    """
+    global MODEL_TYPE, MODEL_PATH
+    MODEL_TYPE, MODEL_PATH = model_type, model_path
+
+    if model is not None:
+        return
+    if not load_model():
+        logger.error(f"Worker d'inférence {os.getpid()}: impossible de charger le modèle")
+        raise RuntimeError(f"Impossible de charger le modèle {model_type} depuis {model_path}")
+    if WARMUP_ENABLED:
+        warm_up_bundle(current_bundle())
+
+
+inference_executor = InferenceExecutor(
+    kind=INFERENCE_EXECUTOR,
+    max_workers=INFERENCE_POOL_SIZE,
+    max_queue=INFERENCE_MAX_QUEUE,
+    initializer=init_inference_worker,
+    initargs=(MODEL_TYPE, MODEL_PATH)
+)
+
+
+def begin_request_metrics(request: Request, endpoint: str, model_type: str, batch_size: int):
+    """
+    Enregistre la durée de validation (réception -> début du handler) et les
+    étiquettes utilisées pour les étapes suivantes de la requête
+    """
+    metrics.current_endpoint.set(endpoint)
+    labels = {"model_type": model_type, "batch_size": batch_size}
+    request.state.metrics_labels = labels
+
+    received_at = getattr(request.state, "metrics_received_at", None)
+    if received_at is not None:
+        observe_stage("validation", time.perf_counter() - received_at, endpoint=endpoint, **labels)
+
+
+def end_request_metrics(request: Request):
+    """Marque la fin de l'inférence: la suite est comptée comme sérialisation"""
+    request.state.metrics_handler_done = time.perf_counter()
+
+
+def resolve_model_name(model_name: Optional[str], allow_cascade: bool = False) -> Optional[str]:
+    """
+    Valide le paramètre ?model= (None pour le modèle par défaut)
+
+    Args:
+        allow_cascade: L'endpoint accepte la cascade (?model=cascade ou CASCADE_DEFAULT)
+
+    Raises:
+        HTTPException 400: Si le modèle est inconnu
+        HTTPException 503: Si le modèle par défaut (ou un modèle de la cascade) n'est pas chargé
+    """
+    if allow_cascade and (model_name == CASCADE_MODEL or (model_name is None and CASCADE_DEFAULT)):
+        unavailable = cascade_unavailable_stages()
+        if unavailable:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Cascade indisponible, modèles non chargés: {', '.join(unavailable)}"
+            )
+        return CASCADE_MODEL
+
+    if model_name is not None and model_name != MODEL_TYPE:
+        if model_name not in AVAILABLE_MODELS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Modèle inconnu: {model_name} (disponibles: {AVAILABLE_MODELS})"
+            )
+        return model_name
+
+    # Vérifier que le modèle par défaut est chargé
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Modèle non chargé. Veuillez contacter l'administrateur."
+        )
+    return None
+
+
+def cache_version(endpoint: str, model_name: Optional[str] = None) -> Optional[str]:
+    """
+    Version du modèle à utiliser dans les clés du cache, ou None si l'endpoint ne
+    consulte pas le cache (endpoint non configuré, modèle non versionné ou pas encore chargé)
+    """
+    if endpoint not in PREDICTION_CACHE_ENDPOINTS:
+        return None
+    if model_name is None:
+        return model_version
+    bundle = model_registry.peek(model_name)
+    return bundle.version if bundle is not None else None
+
+
+async def predict_texts_cached(texts: List[str], version: str,
+                               model_name: Optional[str] = None) -> List[tuple]:
+    """
+    Prédit une liste de textes en consultant le cache tweet par tweet
+
+    Seuls les textes absents du cache (dédoublonnés) passent par l'inférence batch,
+    puis les résultats sont replacés dans l'ordre des textes.
+
+    Returns:
+        Liste de (model_version, (predicted_class, confidence, probabilities))
+    """
+    model_type = model_name or MODEL_TYPE
+    keys = [PredictionCache.make_key(text, model_type, version) for text in texts]
+    results = [prediction_cache.get(key) for key in keys]
+    results = [(version, result) if result is not None else None for result in results]
+
+    missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+    if missing:
+        predicted = dict(zip(
+            missing, await inference_executor.run(predict_texts_versioned, missing, model_name)
+        ))
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                results[i] = predicted[text]
+                # Clé de la version qui a réellement servi (le modèle a pu être rechargé)
+                served_version, prediction = results[i]
+                if served_version is not None:
+                    prediction_cache.put(PredictionCache.make_key(text, model_type, served_version), prediction)
+
+    return results
+
+
+def get_micro_batcher(model_type: str) -> MicroBatcher:
+    """Retourne le micro-batcher du modèle (créé au premier appel)"""
+    if model_type not in micro_batchers:
+        default_size, default_wait = MICROBATCH_DEFAULTS.get(model_type, (32, 5.0))
+        suffix = model_type.upper()
+        max_batch_size = int(os.getenv(f"MICROBATCH_MAX_SIZE_{suffix}", default_size))
+        max_wait_ms = float(os.getenv(f"MICROBATCH_MAX_WAIT_MS_{suffix}", default_wait))
+
+        if model_type == CASCADE_MODEL:
+            predict_fn = predict_cascade
+        else:
+            predict_fn = functools.partial(predict_texts_versioned, model_name=model_type)
+
+        micro_batchers[model_type] = MicroBatcher(
+            predict_fn,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            executor=inference_executor
+        )
+        logger.info(
+            f"Micro-batching {model_type}: max {max_batch_size} tweets / {max_wait_ms:.1f} ms"
+        )
+    return micro_batchers[model_type]
+
+
+def warm_up_bundle(bundle: ModelBundle, batch_sizes=None) -> float:
+    """
+    Passe un batch représentatif de chaque taille dans le modèle (trace des graphes
+    TensorFlow, matérialisation des poids, caches), avant le premier client
+
+    Returns:
+        Durée du préchauffage (secondes)
+    """
+    start = time.perf_counter()
+    for size in batch_sizes or WARMUP_BATCH_SIZES:
+        texts = [WARMUP_TEXTS[i % len(WARMUP_TEXTS)] for i in range(size)]
+        predict_with_bundle(texts, bundle)
+    return time.perf_counter() - start
+
+
+def warm_up_models() -> Dict[str, float]:
+    """
+    Préchauffe le modèle par défaut et les modèles de WARMUP_MODELS (chargés dans le registre)
+
+    Returns:
+        Durée du préchauffage par modèle (secondes)
+    """
+    seconds = {MODEL_TYPE: round(warm_up_bundle(current_bundle()), 3)}
+    for model_name in WARMUP_MODELS:
+        if model_name != MODEL_TYPE:
+            seconds[model_name] = round(warm_up_bundle(get_bundle(model_name)), 3)
+    return seconds
+
+
+async def run_warm_up():
+    """Préchauffe les modèles dans un thread: /health/live répond pendant ce temps"""
+    warmup_report.update(status="running", error=None)
+    try:
+        seconds = await asyncio.to_thread(warm_up_models)
+    except Exception as e:
+        logger.warning(f"Échec du préchauffage du modèle: {e}")
+        warmup_report.update(status="failed", error=str(e))
+        return
+
+    warmup_report.update(status="done", seconds=seconds)
+    startup_report["warm_up_seconds"] = round(sum(seconds.values()), 3)
+    logger.info(f"Worker {os.getpid()}: préchauffage terminé {seconds}, prêt à servir")
+
+
+def model_is_loaded() -> bool:
+    """
+    Indique si le modèle par défaut est chargé avec tous ses composants
+
+    Le vectorizer (ou le scoreur compilé) n'existe que pour le modèle logistique;
+    BERT, LSTM/CNN et ONNX ont un tokenizer.
+    """
+    if model is None:
+        return False
+    if MODEL_TYPE == "logistic":
+        return vectorizer is not None or logistic_scorer is not None
+    return tokenizer is not None
+
+
+def readiness_checks() -> Dict[str, bool]:
+    """Conditions pour recevoir du trafic (GET /health/ready)"""
+    return {
+        "model_loaded": model_is_loaded(),
+        "warmed_up": warmup_report["status"] in ("done", "disabled"),
+        "not_recycling": not memory_watchdog.triggered,
+        "preprocessing": preprocessing_error is None or PREPROCESSING_FALLBACK,
+    }
+
+
+def build_warm_bundle(model_type: str, model_path: str) -> ModelBundle:
+    """Charge un modèle et le préchauffe (graphe TensorFlow, caches)"""
+    bundle = build_bundle(model_type, model_path)
+    warm_up_bundle(bundle)
+    return bundle
+
+
+async def reload_model() -> Dict:
+    """
+    Recharge le modèle par défaut depuis MODEL_PATH sans interrompre le service
+
+    Le nouveau jeu d'artefacts est chargé et préchauffé dans un thread pendant que
+    l'ancien continue de servir, puis échangé atomiquement. Les requêtes en cours
+    se terminent avec l'ancienne version.
+
+    Raises:
+        ReloadInProgressError: Si un rechargement est déjà en cours
+        Exception: Si le chargement échoue (l'ancien modèle reste en service)
+    """
+    if not reload_lock.acquire(blocking=False):
+        raise ReloadInProgressError("Un rechargement du modèle est déjà en cours")
+
+    try:
+        previous_version = model_version
+        start = time.perf_counter()
+        logger.info(f"Rechargement du modèle {MODEL_TYPE} depuis {MODEL_PATH}")
+
+        bundle = await asyncio.to_thread(build_warm_bundle, MODEL_TYPE, MODEL_PATH)
+        install_bundle(bundle)
+
+        # Les processus du pool ont chargé l'ancien modèle: on les remplace
+        if inference_executor.kind == "process":
+            inference_executor.restart(initargs=(MODEL_TYPE, MODEL_PATH))
+
+        seconds = time.perf_counter() - start
+        logger.info(f"Modèle rechargé en {seconds:.1f}s (version: {previous_version} -> {bundle.version})")
+        return {
+            "model_type": MODEL_TYPE,
+            "model_path": MODEL_PATH,
+            "previous_version": previous_version,
+            "model_version": bundle.version,
+            "seconds": round(seconds, 2),
+        }
+    finally:
+        reload_lock.release()
+
+
+model_watcher = ArtifactWatcher(lambda: model_artifacts, reload_model, interval=MODEL_WATCH_INTERVAL or 10.0)
+memory_watchdog = MemoryWatchdog(int(WORKER_MAX_MEMORY_MB * 1024 * 1024), interval=WORKER_MEMORY_CHECK_INTERVAL)
+
+
+def preload_model() -> bool:
+    """
+    Charge le modèle dans le processus maître gunicorn, avant le fork des workers
+
+    Les workers héritent du modèle en copie sur écriture et ne le rechargent pas.
+    TensorFlow et onnxruntime ne supportent pas le fork une fois leurs pools de threads
+    créés: les modèles BERT, Keras et ONNX ne sont pas préchargés, chaque worker les
+    charge au démarrage.
+    """
+    global model_preload
+
+    if MODEL_TYPE != "logistic":
+        logger.info(f"Modèle {MODEL_TYPE}: pas de préchargement, chargé par chaque worker")
+        return False
+
+    start = time.perf_counter()
+    success = load_model()
+    if not success:
+        logger.warning("Préchargement du modèle impossible, chaque worker le chargera")
+        return False
+
+    # Préchauffage: caches remplis avant le fork, donc partagés
+    warm_up_bundle(current_bundle())
+    model_preload = {
+        "pid": os.getpid(),
+        "seconds": round(time.perf_counter() - start, 3),
+        "model_version": model_version,
+    }
+    logger.info(f"Modèle {MODEL_TYPE} préchargé dans le maître en {model_preload['seconds']:.2f}s")
+    return True
+
+
+# Rapport de démarrage (GET /startup), pour suivre les régressions de démarrage à froid
+startup_report: Dict = {}
+
+
+def build_startup_report(import_seconds: Dict[str, float], artifact_load_seconds: float,
+                         warm_up_seconds: Optional[float], model_loaded: bool) -> Dict:
+    """Rassemble les durées des phases de démarrage et la mémoire du worker"""
+    return {
+        "pid": os.getpid(),
+        "model_type": MODEL_TYPE,
+        "model_loaded": model_loaded,
+        "model_version": model_version,
+        "app_import_seconds": round(APP_IMPORT_SECONDS, 3),
+        "framework_import_seconds": import_seconds,
+        "artifact_load_seconds": round(artifact_load_seconds, 3),
+        "warm_up_seconds": round(warm_up_seconds, 3) if warm_up_seconds is not None else None,
+        "total_seconds": round(time.perf_counter() - APP_IMPORT_START, 3),
+        "loaded_backends": backends.loaded_backends(),
+        "rss_mb": round(process_rss_bytes() / (1024 * 1024), 1),
+        "preloaded": model_preload is not None,
+        "timestamp": datetime.now().isoformat(),
     }
 
 
 @app.on_event("startup")
 async def startup_event():
     """Charge le modèle au démarrage de l'API"""
+    global startup_report
     logger.info("Démarrage de l'API Air Paradis Sentiment Analysis")
 
-    # Chargement du modèle selon le type
-    if MODEL_TYPE == "bert":
-        success = load_bert_model()
-    elif MODEL_TYPE in ["lstm", "cnn"]:
-        success = load_dl_model(MODEL_PATH)
-    elif MODEL_TYPE == "logistic":
-        success = load_logistic_model(MODEL_PATH)
-    else:
-        logger.error(f"Type de modèle non reconnu: {MODEL_TYPE}")
-        success = False
+    # Chargement du modèle selon le type (les frameworks lourds sont importés ici),
+    # sauf s'il a été préchargé par le maître gunicorn avant le fork
+    imports_before = dict(backends.IMPORT_SECONDS)
+    start = time.perf_counter()
+    success = model_preload is not None or load_model()
+    load_seconds = time.perf_counter() - start
+    import_seconds = {
+        name: seconds for name, seconds in backends.IMPORT_SECONDS.items() if name not in imports_before
+    }
 
     if not success:
         logger.warning("Impossible de charger le modèle au démarrage")
+    elif model_preload is not None:
+        logger.info(f"Worker {os.getpid()}: modèle {MODEL_TYPE} hérité du maître (version {model_version})")
     else:
-        logger.info(f"Modèle {MODEL_TYPE} chargé et prêt")
+        logger.info(f"Modèle {MODEL_TYPE} chargé")
+
+    startup_report = build_startup_report(
+        import_seconds, load_seconds - sum(import_seconds.values()), None, success
+    )
+    logger.info(
+        f"Démarrage: import de l'API {startup_report['app_import_seconds']:.2f}s, "
+        f"frameworks {import_seconds or 'aucun'}, "
+        f"artefacts {startup_report['artifact_load_seconds']:.2f}s, "
+        f"mémoire {startup_report['rss_mb']:.0f} Mo"
+    )
+
+    # Préchauffage en tâche de fond: le worker n'est déclaré prêt qu'ensuite
+    if success and WARMUP_ENABLED:
+        asyncio.create_task(run_warm_up())
+    elif success:
+        warmup_report["status"] = "disabled"
+
+    if MODEL_WATCH_INTERVAL > 0:
+        model_watcher.start()
+
+    if worker_recycling_enabled and WORKER_MAX_MEMORY_MB > 0:
+        memory_watchdog.start()
+        logger.info(f"Worker {os.getpid()}: recyclage au-delà de {WORKER_MAX_MEMORY_MB:.0f} Mo")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrête proprement l'exécuteur d'inférence"""
+    model_watcher.stop()
+    memory_watchdog.stop()
+    inference_executor.shutdown()
 
 
 @app.get("/", response_model=Dict)
@@ -324,9 +1355,18 @@ async def root():
         "description": "API de prédiction de sentiments pour la détection de bad buzz",
         "endpoints": {
             "health": "/health",
+            "live": "/health/live",
+            "ready": "/health/ready",
             "predict": "/predict (POST)",
             "predict_batch": "/predict/batch (POST)",
+            "predict_stream": "/predict/stream (POST, NDJSON)",
             "models": "/models (GET)",
+            "executor": "/executor (GET)",
+            "cache": "/cache (GET)",
+            "metrics": "/metrics (GET, Prometheus)",
+            "reload": "/admin/reload (POST)",
+            "startup": "/startup (GET)",
+            "worker": "/worker (GET)",
             "documentation": "/docs"
         },
         "model_type": MODEL_TYPE,
@@ -339,28 +1379,193 @@ async def health_check():
     """
     Health check pour vérifier que l'API fonctionne
     """
-    model_loaded = model is not None and vectorizer is not None
+    model_loaded = model_is_loaded()
 
     return HealthResponse(
         status="healthy" if model_loaded else "degraded",
         model_loaded=model_loaded,
+        ready=all(readiness_checks().values()),
         model_type=MODEL_TYPE,
         timestamp=datetime.now().isoformat()
     )
 
 
+@app.get("/health/live", response_model=Dict)
+async def liveness():
+    """
+    Sonde de vie: le processus et sa boucle d'événements répondent
+
+    Ne dépend pas du modèle: un worker qui charge ou préchauffe son modèle est vivant.
+    """
+    return {
+        "status": "alive",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - worker_started_at, 1),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/health/ready", response_model=Dict)
+async def readiness(response: Response):
+    """
+    Sonde de disponibilité pour le répartiteur de charge
+
+    200 seulement si le modèle est chargé, préchauffé (la première requête tiendra la
+    latence attendue) et que le worker n'est pas en cours de recyclage; 503 sinon.
+    """
+    checks = readiness_checks()
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "warm_up": warmup_report,
+        "model_type": MODEL_TYPE,
+        "model_version": model_version,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.get("/models", response_model=ModelInfo)
 async def get_models():
     """
     Retourne les informations sur les modèles disponibles
     """
+    resident_models = [{**current_bundle().describe(), "default": True}] if model is not None else []
+    resident_models += [{**info, "default": False} for info in model_registry.resident()]
+
     return ModelInfo(
-        available_models=["bert", "lstm", "cnn", "logistic"],
+        available_models=AVAILABLE_MODELS,
         current_model=MODEL_TYPE,
-        model_path=MODEL_PATH
+        model_path=MODEL_PATH,
+        resident_models=resident_models,
+        registry=model_registry.stats(),
+        cascade={
+            "first_stage": CASCADE_FIRST_STAGE,
+            "second_stage": CASCADE_SECOND_STAGE,
+            "threshold": CASCADE_THRESHOLD,
+            "default": CASCADE_DEFAULT,
+        },
+        preprocessing=preprocessing_info()
     )
 
 
+@app.get("/executor")
+async def executor_stats():
+    """
+    Retourne l'état de l'exécuteur d'inférence (occupation, file d'attente, saturation)
+    """
+    return inference_executor.stats()
+
+
+@app.get("/cache")
+async def cache_stats():
+    """
+    Retourne les compteurs du cache des prédictions (hits, misses, évictions)
+    """
+    return {
+        **prediction_cache.stats(),
+        "endpoints": sorted(PREDICTION_CACHE_ENDPOINTS),
+        "model_version": model_version,
+    }
+
+
+EXECUTOR_IN_FLIGHT = metrics.REGISTRY.gauge(
+    "airparadis_executor_tasks", "Tâches de l'exécuteur d'inférence (active, queued)", ["state"]
+)
+CACHE_LOOKUPS = metrics.REGISTRY.counter(
+    "airparadis_cache_lookups_total", "Consultations du cache des prédictions (hit, miss)", ["result"]
+)
+CACHE_EVICTIONS = metrics.REGISTRY.counter(
+    "airparadis_cache_evictions_total", "Entrées du cache des prédictions évincées (taille maximale)"
+)
+WORKER_MEMORY = metrics.REGISTRY.gauge(
+    "airparadis_worker_memory_bytes", "Mémoire du worker (rss, pss, shared, private)", ["kind"]
+)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Métriques au format texte Prometheus (latence par étape, requêtes, saturation)
+    """
+    executor_state = inference_executor.stats()
+    EXECUTOR_IN_FLIGHT.set(executor_state["active"], state="active")
+    EXECUTOR_IN_FLIGHT.set(executor_state["queued"], state="queued")
+    cache_state = prediction_cache.stats()
+    CACHE_LOOKUPS.set_total(cache_state["hits"], result="hit")
+    CACHE_LOOKUPS.set_total(cache_state["misses"], result="miss")
+    CACHE_EVICTIONS.set_total(cache_state["evictions"])
+    for kind, value in process_memory().items():
+        if value is not None:
+            WORKER_MEMORY.set(value, kind=kind)
+
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/startup")
+async def get_startup_report():
+    """
+    Retourne le rapport de démarrage du worker (import, chargement, préchauffage, mémoire)
+    """
+    return startup_report
+
+
+@app.get("/worker")
+async def get_worker():
+    """
+    Retourne l'état du worker: mémoire (partagée avec le maître et propre), durée de vie,
+    préchargement du modèle et seuil de recyclage
+    """
+    memory = process_memory()
+    return {
+        "pid": os.getpid(),
+        "ppid": os.getppid(),
+        "uptime_seconds": round(time.time() - worker_started_at, 1),
+        "preloaded": model_preload is not None,
+        "preload": model_preload,
+        "memory_mb": {
+            kind: round(value / (1024 * 1024), 1) if value is not None else None
+            for kind, value in memory.items()
+        },
+        "recycling": {
+            "enabled": worker_recycling_enabled and WORKER_MAX_MEMORY_MB > 0,
+            "max_memory_mb": WORKER_MAX_MEMORY_MB,
+            "triggered": memory_watchdog.triggered,
+        },
+    }
+
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request):
+    """
+    Recharge le modèle par défaut sans interruption (après mise à jour de models/)
+
+    Returns:
+        Ancienne et nouvelle version des artefacts, durée du rechargement
+
+    Raises:
+        HTTPException 403: Si ADMIN_TOKEN est défini et l'en-tête X-Admin-Token invalide
+        HTTPException 409: Si un rechargement est déjà en cours
+        HTTPException 500: Si le chargement échoue (l'ancien modèle reste en service)
+    """
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Jeton d'administration invalide")
+
+    try:
+        return await reload_model()
+    except ReloadInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Échec du rechargement du modèle: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Échec du rechargement, le modèle actuel reste en service: {str(e)}"
+        )
+
+
 @app.get("/debug/files")
 async def debug_files():
     """
@@ -394,43 +1599,69 @@ async def debug_files():
 
 
 @app.post("/predict", response_model=PredictionOutput, status_code=status.HTTP_200_OK)
-async def predict_sentiment(tweet: TweetInput):
+async def predict_sentiment(tweet: TweetInput, request: Request,
+                            model_name: Optional[str] = Query(None, alias="model", description="Modèle à utiliser (défaut: MODEL_TYPE)")):
     """
     Prédit le sentiment d'un tweet unique
 
     Args:
         tweet: Objet contenant le texte du tweet
+        model_name: Paramètre ?model= (bert, lstm, cnn, logistic, onnx), chargé au
+            premier appel, ou cascade
 
     Returns:
-        Prédiction avec sentiment, confiance et probabilités
+        Prédiction avec sentiment, confiance et probabilités (et modèle qui a répondu
+        pour la cascade)
 
     Raises:
-        HTTPException 503: Si le modèle n'est pas chargé
+        HTTPException 400: Si le modèle demandé est inconnu
+        HTTPException 503: Si le modèle n'est pas chargé ou l'exécuteur saturé
         HTTPException 500: Si erreur lors de la prédiction
     """
-    # Vérifier que le modèle est chargé
-    if model is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Modèle non chargé. Veuillez contacter l'administrateur."
-        )
+    model_name = resolve_model_name(model_name, allow_cascade=True)
+    model_type = model_name or MODEL_TYPE
 
     try:
-        logger.info(f"Prédiction pour: {tweet.text[:50]}...")
-
-        # Prédiction selon le type de modèle
-        if MODEL_TYPE == "bert":
-            predicted_class, confidence, probabilities = predict_bert(tweet.text)
-        elif MODEL_TYPE in ["lstm", "cnn"]:
-            predicted_class, confidence, probabilities = predict_dl(tweet.text)
-        elif MODEL_TYPE == "logistic":
-            predicted_class, confidence, probabilities = predict_logistic(tweet.text)
+        begin_request_metrics(request, "predict", model_type, 1)
+        log_prediction = should_sample(PREDICTION_LOG_SAMPLE_RATE) and logger.isEnabledFor(logging.INFO)
+        if log_prediction:
+            logger.info("Prédiction pour: %s...", tweet.text[:50])
+
+        stage = None
+        if model_type == CASCADE_MODEL:
+            # Pas de cache: la réponse dépend du seuil et des deux modèles
+            if MICROBATCH_ENABLED:
+                stage, served_version, prediction = await get_micro_batcher(CASCADE_MODEL).submit(tweet.text)
+            else:
+                stage, served_version, prediction = (await inference_executor.run(
+                    predict_cascade, [tweet.text]
+                ))[0]
         else:
-            raise ValueError(f"Type de modèle non supporté: {MODEL_TYPE}")
+            served_version = cache_version("predict", model_name)
+            cache_key = PredictionCache.make_key(tweet.text, model_type, served_version) if served_version else None
+            prediction = prediction_cache.get(cache_key) if cache_key else None
+
+            if prediction is None:
+                # Les appels concurrents sont regroupés en une seule inférence batch
+                if MICROBATCH_ENABLED:
+                    served_version, prediction = await get_micro_batcher(model_type).submit(tweet.text)
+                else:
+                    served_version, prediction = (await inference_executor.run(
+                        predict_texts_versioned, [tweet.text], model_name
+                    ))[0]
+                if cache_key and served_version is not None:
+                    prediction_cache.put(
+                        PredictionCache.make_key(tweet.text, model_type, served_version), prediction
+                    )
+        predicted_class, confidence, probabilities = prediction
+        end_request_metrics(request)
 
         sentiment_label = SENTIMENT_LABELS[predicted_class]
 
-        logger.info(f"Prédiction: {sentiment_label} (confiance: {confidence:.2%})")
+        if log_prediction:
+            logger.info("Prédiction: %s (confiance: %.2f%%)", sentiment_label, confidence * 100,
+                        extra={"event": "prediction", "model_type": model_type, "sentiment": sentiment_label,
+                               "confidence": round(float(confidence), 4), "stage": stage})
 
         return PredictionOutput(
             text=tweet.text,
@@ -439,9 +1670,17 @@ async def predict_sentiment(tweet: TweetInput):
             confidence=confidence,
             probabilities=probabilities,
             timestamp=datetime.now().isoformat(),
-            model_type=MODEL_TYPE
+            model_type=model_type,
+            model_version=served_version,
+            stage=stage
         )
 
+    except (ExecutorSaturatedError, ModelUnavailableError) as e:
+        logger.warning(f"Prédiction refusée: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erreur lors de la prédiction: {e}")
         raise HTTPException(
@@ -450,43 +1689,85 @@ async def predict_sentiment(tweet: TweetInput):
         )
 
 
-@app.post("/predict/batch", response_model=BatchPredictionOutput, status_code=status.HTTP_200_OK)
-async def predict_batch(batch: TweetBatchInput):
+def compact_batch_response(request: Request, results: List[tuple], model_type: str) -> Response:
+    """
+    Réponse batch au format compact (colonnes), compressée selon Accept-Encoding
+
+    Args:
+        results: (stage, version, prédiction) par tweet, dans l'ordre des tweets
+    """
+    payload = compact_payload(
+        results, model_type, datetime.now().isoformat(),
+        [SENTIMENT_LABELS[label] for label in sorted(SENTIMENT_LABELS)]
+    )
+    body, encoding = compress(
+        encode_json(payload), request.headers.get("accept-encoding"),
+        RESPONSE_COMPRESSION_MIN_BYTES, RESPONSE_COMPRESSION
+    )
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=COMPACT_MEDIA_TYPE, headers=headers)
+
+
+@app.post("/predict/batch", response_model=BatchPredictionOutput, status_code=status.HTTP_200_OK,
+          responses={200: {"content": {COMPACT_MEDIA_TYPE: {}}}})
+async def predict_batch(batch: TweetBatchInput, request: Request,
+                        model_name: Optional[str] = Query(None, alias="model", description="Modèle à utiliser (défaut: MODEL_TYPE)"),
+                        response_format: Optional[str] = Query(None, alias="format", description="standard (défaut) ou compact")):
     """
     Prédit le sentiment de plusieurs tweets
 
     Args:
         batch: Objet contenant une liste de tweets
+        model_name: Paramètre ?model= (bert, lstm, cnn, logistic, onnx), chargé au
+            premier appel, ou cascade
+        response_format: Paramètre ?format=compact (ou Accept: application/vnd.airparadis.compact+json)
+            pour une réponse en colonnes, voir compact_response.py
 
     Returns:
         Liste de prédictions
 
     Raises:
-        HTTPException 503: Si le modèle n'est pas chargé
+        HTTPException 400: Si le modèle ou le format demandé est inconnu
+        HTTPException 503: Si le modèle n'est pas chargé ou l'exécuteur saturé
         HTTPException 500: Si erreur lors de la prédiction
     """
-    # Vérifier que le modèle est chargé
-    if model is None:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Modèle non chargé. Veuillez contacter l'administrateur."
-        )
-
     try:
-        logger.info(f"Prédiction batch de {len(batch.tweets)} tweets")
+        compact = wants_compact(response_format, request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    model_name = resolve_model_name(model_name, allow_cascade=True)
+    model_type = model_name or MODEL_TYPE
 
-        predictions = []
-        for tweet_text in batch.tweets:
-            # Prédiction selon le type de modèle
-            if MODEL_TYPE == "bert":
-                predicted_class, confidence, probabilities = predict_bert(tweet_text)
-            elif MODEL_TYPE in ["lstm", "cnn"]:
-                predicted_class, confidence, probabilities = predict_dl(tweet_text)
-            elif MODEL_TYPE == "logistic":
-                predicted_class, confidence, probabilities = predict_logistic(tweet_text)
+    try:
+        begin_request_metrics(request, "batch", model_type, len(batch.tweets))
+        log_prediction = should_sample(PREDICTION_LOG_SAMPLE_RATE) and logger.isEnabledFor(logging.INFO)
+        if log_prediction:
+            logger.info("Prédiction batch de %d tweets", len(batch.tweets))
+
+        # Une seule inférence pour tout le batch, résultats dans l'ordre des tweets
+        if model_type == CASCADE_MODEL:
+            results = await inference_executor.run(predict_cascade, batch.tweets)
+        else:
+            version = cache_version("batch", model_name)
+            if version:
+                results = await predict_texts_cached(batch.tweets, version, model_name)
             else:
-                raise ValueError(f"Type de modèle non supporté: {MODEL_TYPE}")
+                results = await inference_executor.run(predict_texts_versioned, batch.tweets, model_name)
+            results = [(None, served_version, prediction) for served_version, prediction in results]
+        end_request_metrics(request)
+
+        if log_prediction:
+            logger.info("Prédictions batch terminées: %d résultats", len(results),
+                        extra={"event": "batch_prediction", "model_type": model_type, "count": len(results),
+                               "format": "compact" if compact else "standard"})
+        if compact:
+            return compact_batch_response(request, results, model_type)
 
+        predictions = []
+        for tweet_text, (stage, served_version, prediction) in zip(batch.tweets, results):
+            predicted_class, confidence, probabilities = prediction
             sentiment_label = SENTIMENT_LABELS[predicted_class]
 
             predictions.append(PredictionOutput(
@@ -496,18 +1777,24 @@ async def predict_batch(batch: TweetBatchInput):
                 confidence=confidence,
                 probabilities=probabilities,
                 timestamp=datetime.now().isoformat(),
-                model_type=MODEL_TYPE
+                model_type=model_type,
+                model_version=served_version,
+                stage=stage
             ))
 
-        logger.info(f"Prédictions batch terminées: {len(predictions)} résultats")
-
         return BatchPredictionOutput(
             predictions=predictions,
             count=len(predictions),
-            model_type=MODEL_TYPE,
+            model_type=model_type,
             timestamp=datetime.now().isoformat()
         )
 
+    except (ExecutorSaturatedError, ModelUnavailableError) as e:
+        logger.warning(f"Prédiction batch refusée: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erreur lors de la prédiction batch: {e}")
         raise HTTPException(
@@ -516,6 +1803,105 @@ async def predict_batch(batch: TweetBatchInput):
         )
 
 
+async def _score_stream_chunk(items: List[tuple], model_name: Optional[str] = None) -> bytes:
+    """Prédit un paquet de tweets du flux et le sérialise en lignes NDJSON"""
+    texts = [text for _, _, text in items]
+    while True:
+        try:
+            version = cache_version("stream", model_name)
+            if version:
+                results = await predict_texts_cached(texts, version, model_name)
+            else:
+                results = await inference_executor.run(predict_texts_versioned, texts, model_name)
+            break
+        except ExecutorSaturatedError:
+            # Contre-pression: on attend qu'un worker se libère plutôt que d'échouer
+            await asyncio.sleep(0.05)
+
+    timestamp = datetime.now().isoformat()
+    lines = []
+    for (line_no, item_id, text), (served_version, prediction) in zip(items, results):
+        predicted_class, confidence, probabilities = prediction
+        record = {
+            "line": line_no,
+            "text": text,
+            "sentiment": str(predicted_class),
+            "sentiment_label": SENTIMENT_LABELS[predicted_class],
+            "confidence": confidence,
+            "probabilities": probabilities,
+            "timestamp": timestamp,
+            "model_type": model_name or MODEL_TYPE,
+            "model_version": served_version
+        }
+        if item_id is not None:
+            record["id"] = item_id
+        lines.append(json.dumps(record, ensure_ascii=False))
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def _score_ndjson_stream(request: Request, model_name: Optional[str] = None) -> AsyncIterator[bytes]:
+    """Lit le corps NDJSON au fil de l'eau et renvoie les prédictions par paquets"""
+    pending = []
+    scored = 0
+
+    try:
+        async for line_no, line, error in iter_ndjson_lines(request.stream()):
+            if error is None:
+                try:
+                    text, item_id = parse_tweet_line(line)
+                    text = TweetInput(text=text).text
+                except ValueError as e:
+                    error = e.errors()[0]["msg"] if hasattr(e, "errors") else str(e)
+
+            if error is not None:
+                yield (json.dumps({"line": line_no, "error": error}, ensure_ascii=False) + "\n").encode("utf-8")
+                continue
+
+            pending.append((line_no, item_id, text))
+            if len(pending) >= STREAM_CHUNK_SIZE:
+                yield await _score_stream_chunk(pending, model_name)
+                scored += len(pending)
+                pending = []
+
+        if pending:
+            yield await _score_stream_chunk(pending, model_name)
+            scored += len(pending)
+
+        logger.info(f"Scoring en flux terminé: {scored} tweets")
+
+    except Exception as e:
+        logger.error(f"Erreur lors du scoring en flux après {scored} tweets: {e}")
+        yield (json.dumps({"error": f"Erreur lors de la prédiction: {str(e)}"}) + "\n").encode("utf-8")
+
+
+@app.post("/predict/stream", response_class=NDJSONStreamingResponse, status_code=status.HTTP_200_OK)
+async def predict_stream(request: Request,
+                         model_name: Optional[str] = Query(None, alias="model", description="Modèle à utiliser (défaut: MODEL_TYPE)")):
+    """
+    Prédit le sentiment d'un flux NDJSON de tweets, sans limite de taille
+
+    Le corps de la requête contient un tweet par ligne ("texte" ou {"text": ..., "id": ...}).
+    Les tweets sont inférés par paquets de STREAM_CHUNK_SIZE et chaque prédiction est
+    renvoyée en NDJSON dès que son paquet est prêt, avec le numéro de ligne (et l'id)
+    d'origine. Les lignes invalides produisent une ligne {"line": ..., "error": ...}.
+    Le paramètre ?model= choisit le modèle, comme pour /predict.
+
+    Raises:
+        HTTPException 400: Si le modèle demandé est inconnu
+        HTTPException 503: Si le modèle n'est pas chargé
+    """
+    model_name = resolve_model_name(model_name)
+
+    metrics.current_endpoint.set("stream")
+    logger.info(f"Scoring en flux NDJSON (paquets de {STREAM_CHUNK_SIZE} tweets)")
+    return NDJSONStreamingResponse(_score_ndjson_stream(request, model_name))
+
+
+# Durée de l'import du module (rapport de démarrage)
+APP_IMPORT_SECONDS = time.perf_counter() - APP_IMPORT_START
+
+
 if __name__ == "__main__":
     import uvicorn
 
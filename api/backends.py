@@ -0,0 +1,63 @@
+"""
+Import différé des frameworks lourds - Air Paradis
+
+TensorFlow et Transformers ne sont importés qu'au chargement d'un modèle BERT ou
+Keras: un worker qui sert le modèle logistique ne paie ni leur temps d'import ni
+leur mémoire. La durée de chaque import est conservée pour le rapport de démarrage.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Frameworks suivis dans le rapport de démarrage
+HEAVY_BACKENDS = ["tensorflow", "transformers", "torch", "onnxruntime", "nltk"]
+
+# Durée d'import de chaque framework (secondes)
+IMPORT_SECONDS: Dict[str, float] = {}
+
+_lock = threading.Lock()
+
+
+def import_backend(module_name: str):
+    """
+    Importe un framework au premier appel, en mesurant la durée de l'import
+
+    Raises:
+        ImportError: Si le framework n'est pas installé
+    """
+    with _lock:
+        if module_name not in IMPORT_SECONDS:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                raise ImportError(f"{module_name} non installé: {e}") from e
+            IMPORT_SECONDS[module_name] = round(time.perf_counter() - start, 3)
+            logger.info(f"{module_name} importé en {IMPORT_SECONDS[module_name]:.2f}s")
+    return sys.modules[module_name]
+
+
+def tensorflow():
+    """Module tensorflow (importé au premier appel)"""
+    return import_backend("tensorflow")
+
+
+def transformers():
+    """Module transformers (importé au premier appel)"""
+    return import_backend("transformers")
+
+
+def onnxruntime():
+    """Module onnxruntime (importé au premier appel)"""
+    return import_backend("onnxruntime")
+
+
+def loaded_backends() -> List[str]:
+    """Frameworks lourds présents dans le processus"""
+    return [name for name in HEAVY_BACKENDS if name in sys.modules]
@@ -0,0 +1,109 @@
+"""
+Micro-batching des prédictions unitaires - Air Paradis
+
+Regroupe les appels concurrents à POST /predict en un seul batch d'inférence.
+Un batch part dès qu'il atteint sa taille maximale, ou au plus tard après un
+délai d'attente maximal (en millisecondes) compté depuis le premier tweet reçu.
+Chaque appelant récupère ensuite son propre résultat via une future asyncio.
+"""
+
+import asyncio
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Regroupe les textes soumis de façon concurrente en batchs d'inférence
+
+    Args:
+        predict_fn: Fonction batch (liste de textes -> liste de prédictions, même ordre)
+        max_batch_size: Nombre maximal de textes par batch
+        max_wait_ms: Délai maximal d'attente avant d'envoyer un batch incomplet
+        executor: Exécuteur d'inférence (par défaut, inférence dans la boucle d'événements)
+    """
+
+    def __init__(self, predict_fn: Callable[[List[str]], List[tuple]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 executor: Optional[InferenceExecutor] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms doit être >= 0")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, text: str) -> tuple:
+        """
+        Soumet un texte et attend sa prédiction
+
+        Returns:
+            (predicted_class, confidence, probabilities)
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Nouvelle boucle d'événements (redémarrage, tests): on repart d'un état vide
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Envoie les textes en attente comme un batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Exécute l'inférence du batch et résout la future de chaque appelant"""
+        # Les appelants déjà partis (client déconnecté) ne sont pas prédits
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        try:
+            results = await self._predict([text for text, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Le batch a renvoyé {len(results)} résultats pour {len(batch)} textes"
+                )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'inférence du micro-batch ({len(batch)} tweets): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _predict(self, texts: List[str]) -> List[tuple]:
+        """Appelle la fonction de prédiction batch, via l'exécuteur s'il est configuré"""
+        if self.executor is not None:
+            return await self.executor.run(self.predict_fn, texts)
+        return self.predict_fn(texts)
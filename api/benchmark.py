@@ -0,0 +1,396 @@
+"""
+Microbenchmarks des fonctions critiques de l'API - Air Paradis
+
+Mesure, sur les vrais artefacts de models/ et pour plusieurs tailles de batch:
+    - l'inférence: predict_logistic_batch, predict_bert_batch, predict_dl_batch,
+      predict_onnx_batch (sous le cache des prédictions);
+    - la validation des entrées: TweetInput, TweetBatchInput;
+    - le prétraitement des tweets (preprocessing.py, lemmatisation et racinisation,
+      cache des tokens rempli par le préchauffage);
+    - le scoreur logistique compilé, depuis les pickles ([dict]) et depuis le format
+      compact ([compact], models/logistic_compact, lu dans les tableaux mappés en mémoire);
+    - la construction des PredictionOutput et la sérialisation JSON de la réponse
+      batch (jsonable_encoder + json.dumps, comme la JSONResponse de FastAPI), et
+      celle du format compact (compact_response.py, colonnes + orjson).
+
+Chronométrage à la manière de timeit: appels de préchauffage, nombre de boucles
+calibré pour qu'une mesure dure au moins --min-time, ramasse-miettes désactivé pendant
+la mesure, --repeat mesures dont on garde la médiane (et le minimum, l'écart
+interquartile). Les modèles absents ou dont le framework n'est pas installé sont
+ignorés, avec la raison dans le rapport.
+
+Les résultats sont enregistrés en JSON (--output) avec l'environnement (versions,
+processeurs, version des modèles). --compare compare la médiane de chaque mesure à
+une référence enregistrée: le code de sortie est 1 si une fonction ralentit au-delà
+de --threshold.
+
+Usage:
+    python benchmark.py --output baseline.json
+    python benchmark.py --model-types logistic --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+import app as api
+from compact_artifacts import is_compact_artifact, load_logistic_artifacts
+from compact_response import compact_payload, encode_json
+from logistic_scorer import build_logistic_scorer
+from metrics import BATCH_SIZE_BUCKETS
+from preprocessing import build_preprocessor
+
+DEFAULT_BATCH_SIZES = tuple(upper for upper, _ in BATCH_SIZE_BUCKETS)
+DEFAULT_THRESHOLD = 0.10
+# TweetBatchInput accepte au plus 100 tweets
+MAX_BATCH_INPUT = 100
+SAMPLE_TWEETS = [
+    "Amazing flight experience! The crew was incredibly friendly and helpful.",
+    "Terrible experience, 5-hour delay with no explanation. Never flying with them again!",
+    "Air Paradis = worst",
+    "Just landed after a smooth flight. Comfortable seats and delicious meals, thank you!",
+    "Lost my luggage for the third time this year. Incompetent staff, no compensation offered.",
+    "Oh great, another delay. Just what I needed today. Thanks for nothing!",
+    "Prices are reasonable but don't expect luxury. It's basic air travel, nothing more.",
+    "Love love LOVE Air Paradis! Best crew ever!",
+]
+
+PREDICT_FUNCTIONS = {
+    "logistic": api.predict_logistic_batch,
+    "bert": api.predict_bert_batch,
+    "lstm": api.predict_dl_batch,
+    "cnn": api.predict_dl_batch,
+    "onnx": api.predict_onnx_batch,
+}
+
+
+def _time_loops(fn: Callable[[], Any], number: int) -> float:
+    """Durée de number appels, ramasse-miettes désactivé (comme timeit)"""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _loop_counts():
+    """1, 2, 5, 10, 20, 50, 100..."""
+    for exponent in itertools.count():
+        for factor in (1, 2, 5):
+            yield factor * 10 ** exponent
+
+
+def time_function(fn: Callable[[], Any], min_time: float = 0.2, repeat: int = 7,
+                  warmup: int = 3) -> Dict[str, Any]:
+    """
+    Chronomètre une fonction sans argument
+
+    Args:
+        min_time: Durée minimale d'une mesure (le nombre de boucles est calibré en conséquence)
+        repeat: Nombre de mesures
+        warmup: Appels non mesurés (graphes TensorFlow, caches, allocations)
+
+    Returns:
+        Nombre de boucles et durées par appel en secondes (médiane, minimum, écart interquartile)
+    """
+    for _ in range(warmup):
+        fn()
+
+    # Calibrage: 1, 2, 5, 10, 20, 50... boucles jusqu'à atteindre min_time
+    for number in _loop_counts():
+        if _time_loops(fn, number) >= min_time:
+            break
+
+    timings = [_time_loops(fn, number) / number for _ in range(repeat)]
+    q1, q3 = np.percentile(timings, [25, 75])
+    return {
+        "loops": number,
+        "repeat": repeat,
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "iqr": float(q3 - q1),
+    }
+
+
+def _sample_texts(size: int) -> List[str]:
+    return [SAMPLE_TWEETS[i % len(SAMPLE_TWEETS)] for i in range(size)]
+
+
+def _prediction_outputs(texts: List[str], model_type: str) -> List[Any]:
+    """PredictionOutput construits comme dans /predict/batch"""
+    timestamp = datetime.now().isoformat()
+    return [
+        api.PredictionOutput(
+            text=text,
+            sentiment="1",
+            sentiment_label=api.SENTIMENT_LABELS[1],
+            confidence=0.87,
+            probabilities={"negative": 0.13, "positive": 0.87},
+            timestamp=timestamp,
+            model_type=model_type,
+            model_version="0123456789ab",
+        )
+        for text in texts
+    ]
+
+
+def _logistic_scorers(skipped: Dict[str, str]) -> List[tuple]:
+    """Scoreurs compilés depuis les pickles et depuis le format compact, s'ils sont présents"""
+    import joblib
+
+    scorers = []
+    model_path = api.MODEL_PATHS["logistic"]
+    vectorizer_path = os.path.join(os.path.dirname(model_path), "tfidf_vectorizer.pkl")
+    if os.path.exists(model_path) and os.path.exists(vectorizer_path):
+        scorer = build_logistic_scorer(joblib.load(vectorizer_path), joblib.load(model_path))
+        if scorer is not None:
+            scorers.append(("logistic_scorer[dict]", scorer))
+        else:
+            skipped["logistic_scorer[dict]"] = "pipeline non compilable"
+    else:
+        skipped["logistic_scorer[dict]"] = f"artefacts absents: {model_path}"
+
+    compact_dir = os.path.join(os.path.dirname(model_path), "logistic_compact")
+    if is_compact_artifact(compact_dir):
+        scorers.append(("logistic_scorer[compact]", load_logistic_artifacts(compact_dir)[0]))
+    else:
+        skipped["logistic_scorer[compact]"] = f"artefacts absents: {compact_dir}"
+    return scorers
+
+
+def collect_benchmarks(model_types: Sequence[str], batch_sizes: Sequence[int]) -> tuple:
+    """
+    Prépare les fonctions à mesurer
+
+    Returns:
+        ([(nom, taille de batch, fonction)], {nom: raison} des benchmarks ignorés,
+        {type de modèle: version des artefacts})
+    """
+    benchmarks = []
+    skipped: Dict[str, str] = {}
+    versions: Dict[str, str] = {}
+
+    benchmarks.append(("TweetInput", 1, lambda: api.TweetInput(text=SAMPLE_TWEETS[0])))
+    for size in batch_sizes:
+        texts = _sample_texts(size)
+        if size <= MAX_BATCH_INPUT:
+            benchmarks.append(("TweetBatchInput", size, lambda texts=texts: api.TweetBatchInput(tweets=texts)))
+        benchmarks.append(("PredictionOutput", size, lambda texts=texts: _prediction_outputs(texts, "logistic")))
+
+        response = api.BatchPredictionOutput(
+            predictions=_prediction_outputs(texts, "logistic"), count=size,
+            model_type="logistic", timestamp=datetime.now().isoformat()
+        )
+        benchmarks.append(("serialize_batch_response", size,
+                           lambda response=response: json.dumps(jsonable_encoder(response))))
+
+        results = [(None, "0123456789ab", (1, 0.87, {"negative": 0.13, "positive": 0.87}))] * size
+        benchmarks.append(("serialize_compact_response", size, lambda results=results: encode_json(
+            compact_payload(results, "logistic", datetime.now().isoformat(), ["Négatif", "Positif"])
+        )))
+
+    for mode in ("lemmatize", "stem"):
+        name = f"clean_batch[{mode}]"
+        try:
+            preprocessor = build_preprocessor(mode)
+        except ImportError as e:
+            skipped[name] = str(e)
+            continue
+        except LookupError:
+            skipped[name] = "corpus NLTK absents (python -m nltk.downloader stopwords wordnet)"
+            continue
+        for size in batch_sizes:
+            benchmarks.append((name, size, lambda texts=_sample_texts(size), preprocessor=preprocessor:
+                               preprocessor.clean_batch(texts)))
+
+    if "logistic" in model_types:
+        for name, scorer in _logistic_scorers(skipped):
+            for size in batch_sizes:
+                benchmarks.append((name, size, lambda texts=_sample_texts(size), scorer=scorer:
+                                   scorer.predict_proba(texts)))
+
+    for model_type in model_types:
+        function = PREDICT_FUNCTIONS[model_type]
+        name = f"{function.__name__}[{model_type}]"
+        path = api.MODEL_PATHS[model_type]
+        if not os.path.exists(path):
+            skipped[name] = f"artefacts absents: {path}"
+            continue
+        try:
+            bundle = api.build_bundle(model_type, path)
+        except (ImportError, OSError, ValueError) as e:
+            skipped[name] = str(e)
+            continue
+
+        versions[model_type] = bundle.version
+        for size in batch_sizes:
+            texts = _sample_texts(size)
+            benchmarks.append((name, size, lambda texts=texts, bundle=bundle, function=function: function(texts, bundle)))
+
+    return benchmarks, skipped, versions
+
+
+def environment() -> Dict[str, Any]:
+    """Environnement de mesure (à comparer avant d'interpréter un écart)"""
+    import sklearn
+
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+    for module in ("tensorflow", "transformers", "onnxruntime"):
+        if module in sys.modules:
+            info[module] = getattr(sys.modules[module], "__version__", None)
+    return info
+
+
+def run_benchmarks(model_types: Sequence[str], batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                   min_time: float = 0.2, repeat: int = 7, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Exécute la suite
+
+    Returns:
+        Rapport: environnement, versions des modèles, mesures par clé "nom@taille", benchmarks ignorés
+    """
+    benchmarks, skipped, versions = collect_benchmarks(model_types, batch_sizes)
+
+    results = {}
+    for name, size, fn in benchmarks:
+        key = f"{name}@{size}"
+        if name_filter and name_filter not in key:
+            continue
+        print(f"{key}...", file=sys.stderr)
+        timing = time_function(fn, min_time=min_time, repeat=repeat)
+        results[key] = {"name": name, "batch_size": size, **timing, "per_tweet": timing["median"] / size}
+
+    return {
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "model_versions": versions,
+        "benchmarks": results,
+        "skipped": skipped,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare les médianes à une référence
+
+    Returns:
+        Une ligne par mesure: ratio (actuel / référence) et statut (regression au-delà
+        de 1 + threshold, improvement en deçà de 1 / (1 + threshold), ok, new, missing)
+    """
+    rows = []
+    for key in sorted(set(current["benchmarks"]) | set(baseline["benchmarks"])):
+        now = current["benchmarks"].get(key)
+        before = baseline["benchmarks"].get(key)
+        if now is None or before is None:
+            rows.append({"benchmark": key, "baseline": before and before["median"],
+                         "current": now and now["median"], "ratio": None,
+                         "status": "new" if before is None else "missing"})
+            continue
+
+        ratio = now["median"] / before["median"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"benchmark": key, "baseline": before["median"], "current": now["median"],
+                     "ratio": round(ratio, 3), "status": status})
+    return rows
+
+
+def results_table(report: Dict[str, Any]) -> pd.DataFrame:
+    """Tableau des mesures (durées en microsecondes)"""
+    return pd.DataFrame([{
+        "benchmark": result["name"],
+        "batch": result["batch_size"],
+        "median us": round(result["median"] * 1e6, 1),
+        "min us": round(result["min"] * 1e6, 1),
+        "iqr us": round(result["iqr"] * 1e6, 1),
+        "us/tweet": round(result["per_tweet"] * 1e6, 1),
+        "loops": result["loops"],
+    } for result in report["benchmarks"].values()])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks des fonctions critiques de l'API")
+    parser.add_argument("--model-types", default=",".join(PREDICT_FUNCTIONS),
+                        help="Modèles à mesurer, séparés par des virgules")
+    parser.add_argument("--batch-sizes", default=",".join(str(size) for size in DEFAULT_BATCH_SIZES))
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durée minimale d'une mesure (secondes)")
+    parser.add_argument("--repeat", type=int, default=7, help="Nombre de mesures par benchmark")
+    parser.add_argument("--filter", help="Ne mesurer que les benchmarks dont la clé contient ce texte")
+    parser.add_argument("--output", help="Rapport JSON (réutilisable comme référence)")
+    parser.add_argument("--compare", help="Rapport de référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Ralentissement toléré (0.10 = +10%% sur la médiane)")
+    args = parser.parse_args(argv)
+
+    try:
+        model_types = [m.strip() for m in args.model_types.split(",") if m.strip()]
+        unknown = set(model_types) - set(PREDICT_FUNCTIONS)
+        if unknown:
+            raise ValueError(f"Types de modèle inconnus: {sorted(unknown)}")
+        batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+        baseline = None
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+
+        report = run_benchmarks(model_types, batch_sizes, args.min_time, args.repeat, args.filter)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(results_table(report).to_string(index=False))
+    for name, reason in report["skipped"].items():
+        print(f"Ignoré: {name} ({reason})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if baseline is None:
+        return 0
+
+    if baseline.get("environment") != report["environment"]:
+        print("Attention: environnement différent de la référence", file=sys.stderr)
+    rows = compare_results(report, baseline, args.threshold)
+    table = pd.DataFrame(rows)
+    for column in ("baseline", "current"):
+        table[column] = (table[column] * 1e6).round(1)
+    print(table.rename(columns={"baseline": "baseline us", "current": "current us"}).to_string(index=False))
+    regressions = [row["benchmark"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"Régressions (> +{args.threshold:.0%}): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
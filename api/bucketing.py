@@ -0,0 +1,68 @@
+"""
+Regroupement des séquences par longueur - Air Paradis
+
+Au lieu de compléter chaque tweet jusqu'à MAX_LENGTH (128 jetons, alors que la plupart
+en font moins de 40), les séquences d'un batch sont réparties en tranches de longueur
+(16, 32, 64, 128 jetons), et chaque tranche n'est complétée que jusqu'à sa plus longue
+séquence: une passe forward par tranche, sans calcul sur du remplissage inutile.
+"""
+
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+DEFAULT_BOUNDARIES = (16, 32, 64, 128)
+
+
+def parse_boundaries(value: str) -> tuple:
+    """Lit les bornes des tranches ("16,32,64,128"), triées et sans doublon"""
+    boundaries = sorted({int(part) for part in value.split(",") if part.strip()})
+    if not boundaries or boundaries[0] <= 0:
+        raise ValueError(f"Bornes de tranches invalides: {value}")
+    return tuple(boundaries)
+
+
+def bucket_boundary(length: int, boundaries: Sequence[int]) -> int:
+    """Plus petite borne >= length (la longueur elle-même au-delà de la dernière borne)"""
+    for boundary in boundaries:
+        if length <= boundary:
+            return boundary
+    return length
+
+
+def length_buckets(lengths: Sequence[int], boundaries: Sequence[int] = DEFAULT_BOUNDARIES) -> List[List[int]]:
+    """
+    Répartit les indices des séquences par tranche de longueur
+
+    Returns:
+        Indices de chaque tranche non vide, de la plus courte à la plus longue
+    """
+    groups: Dict[int, List[int]] = {}
+    for index, length in enumerate(lengths):
+        groups.setdefault(bucket_boundary(length, boundaries), []).append(index)
+    return [groups[boundary] for boundary in sorted(groups)]
+
+
+def pad_bucket(encoding: Mapping[str, Sequence], indices: Sequence[int],
+               pad_values: Mapping[str, int]) -> Dict[str, np.ndarray]:
+    """
+    Complète les séquences d'une tranche jusqu'à la plus longue d'entre elles
+
+    Args:
+        encoding: Sortie du tokenizer sans remplissage (input_ids, attention_mask, ...)
+        indices: Séquences de la tranche
+        pad_values: Valeur de remplissage par entrée (0 par défaut)
+
+    Returns:
+        Tableaux int32 (taille de la tranche x longueur maximale) par entrée
+    """
+    length = max(len(encoding["input_ids"][index]) for index in indices)
+
+    features = {}
+    for key, rows in encoding.items():
+        batch = np.full((len(indices), length), pad_values.get(key, 0), dtype=np.int32)
+        for row, index in enumerate(indices):
+            values = np.asarray(rows[index])
+            batch[row, :len(values)] = values
+        features[key] = batch
+    return features
@@ -0,0 +1,124 @@
+"""
+Cache des prédictions - Air Paradis
+
+Pendant une vague de bad buzz, les retweets et copier-coller font qu'un même texte
+est évalué des milliers de fois. Ce cache LRU borné, avec expiration (TTL), évite de
+refaire l'inférence pour un texte déjà vu par la même version du modèle.
+
+La clé combine le texte normalisé (même .strip() que la validation des entrées),
+le type de modèle et l'empreinte des artefacts chargés.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CacheKey = Tuple[str, str, str]
+
+
+def compute_artifact_hash(paths: Iterable[str]) -> str:
+    """
+    Calcule l'empreinte SHA-256 (tronquée) d'un ensemble d'artefacts
+
+    Les répertoires (ex: modèle BERT sauvegardé) sont parcourus récursivement,
+    dans un ordre stable.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        else:
+            files = [path]
+
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, os.path.dirname(path)).encode("utf-8"))
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+
+    return digest.hexdigest()[:12]
+
+
+class PredictionCache:
+    """
+    Cache LRU avec expiration pour les prédictions
+
+    Args:
+        max_size: Nombre maximal d'entrées (la moins récemment utilisée est évincée)
+        ttl_seconds: Durée de vie d'une entrée (0 = pas d'expiration)
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        if max_size < 1:
+            raise ValueError("max_size doit être >= 1")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(text: str, model_type: str, artifact_hash: str) -> CacheKey:
+        """Construit la clé de cache d'un texte pour une version de modèle"""
+        return (model_type, artifact_hash, text.strip())
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Retourne la prédiction en cache, ou None si absente ou expirée"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Any):
+        """Ajoute une prédiction au cache (évince l'entrée la plus ancienne si plein)"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retourne la taille du cache et ses compteurs"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,141 @@
+"""
+Calibration du seuil de la cascade - Air Paradis
+
+Score un échantillon étiqueté du jeu de validation (ou de test) avec les deux modèles
+de la cascade, en mesurant la latence de chacun, puis simule chaque seuil de confiance:
+part des tweets transmis au second modèle, exactitude et débit estimé. Le seuil retenu
+est ensuite passé à l'API par CASCADE_THRESHOLD.
+
+Les fichiers d'entraînement sont refusés: le modèle logistique y a été ajusté, sa
+confiance y est surestimée et le seuil choisi serait trop élevé.
+
+Usage:
+    python calibrate_cascade.py ../data/processed/val_lemmatized.csv \\
+        --size 5000 --second-stage bert --output calibration.csv
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+import app as api
+from score_csv import load_labeled_sample, require_held_out
+
+logger = logging.getLogger("calibrate_cascade")
+
+DEFAULT_THRESHOLDS = [0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.99]
+
+
+def score_stage(model_type: str, model_path: str, texts: List[str], batch_size: int) -> tuple:
+    """
+    Score l'échantillon avec un modèle
+
+    Returns:
+        (probabilités [négatif, positif], secondes par tweet)
+    """
+    bundle = api.build_bundle(model_type, model_path)
+    # Premier appel hors chronométrage (graphe TensorFlow, allocations)
+    api.predict_with_bundle(texts[:batch_size], bundle)
+
+    start = time.perf_counter()
+    probabilities = []
+    for i in range(0, len(texts), batch_size):
+        probabilities.extend(
+            [p["negative"], p["positive"]] for _, _, p in api.predict_with_bundle(texts[i:i + batch_size], bundle)
+        )
+    return np.array(probabilities), (time.perf_counter() - start) / max(len(texts), 1)
+
+
+def calibration_table(first: np.ndarray, second: np.ndarray, labels: np.ndarray,
+                      first_seconds: float, second_seconds: float,
+                      thresholds: Sequence[float] = DEFAULT_THRESHOLDS) -> List[Dict]:
+    """
+    Simule la cascade pour chaque seuil
+
+    Args:
+        first: Probabilités du premier modèle
+        second: Probabilités du second modèle
+        labels: Sentiments réels (0/1)
+        first_seconds: Latence par tweet du premier modèle
+        second_seconds: Latence par tweet du second modèle
+
+    Returns:
+        Une ligne par seuil: part transmise au second modèle, exactitude, latence et débit
+        (le premier modèle score tous les tweets, le second seulement les incertains)
+    """
+    confidence = first.max(axis=1)
+    first_classes = first.argmax(axis=1)
+    second_classes = second.argmax(axis=1)
+
+    rows = []
+    for threshold in thresholds:
+        escalated = confidence < threshold
+        predictions = np.where(escalated, second_classes, first_classes)
+        seconds = first_seconds + escalated.mean() * second_seconds
+        rows.append({
+            "threshold": threshold,
+            "escalation_rate": round(float(escalated.mean()), 4),
+            "accuracy": round(float(np.mean(predictions == labels)), 4),
+            "ms_per_tweet": round(1000 * seconds, 3),
+            "tweets_per_second": round(1 / seconds, 1) if seconds else None,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compromis débit / exactitude de la cascade par seuil")
+    parser.add_argument("input", help="CSV étiqueté hors entraînement (val_*.csv, test_*.csv)")
+    parser.add_argument("--size", type=int, default=5000, help="Nombre de tweets tirés")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--first-stage", default=api.CASCADE_FIRST_STAGE, choices=api.AVAILABLE_MODELS)
+    parser.add_argument("--second-stage", default=api.CASCADE_SECOND_STAGE, choices=api.AVAILABLE_MODELS)
+    parser.add_argument("--thresholds", default=",".join(str(t) for t in DEFAULT_THRESHOLDS),
+                        help="Seuils à simuler, séparés par des virgules")
+    parser.add_argument("--batch-size", type=int, default=64, help="Tweets par inférence")
+    parser.add_argument("--output", help="Fichier de sortie (.csv ou .json)")
+    args = parser.parse_args(argv)
+
+    try:
+        thresholds = [float(t) for t in args.thresholds.split(",") if t.strip()]
+        require_held_out(args.input)
+        if not api.preprocessing_ready():
+            raise ValueError(f"Prétraitement {api.TEXT_PREPROCESSING} impossible: {api.preprocessing_error}")
+        texts, labels = load_labeled_sample(args.input, args.size, args.seed)
+        logger.info(f"Échantillon: {len(texts)} tweets")
+
+        first, first_seconds = score_stage(
+            args.first_stage, api.MODEL_PATHS[args.first_stage], texts, args.batch_size
+        )
+        second, second_seconds = score_stage(
+            args.second_stage, api.MODEL_PATHS[args.second_stage], texts, args.batch_size
+        )
+    except (ImportError, OSError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    table = pd.DataFrame(
+        calibration_table(first, second, labels, first_seconds, second_seconds, thresholds)
+    )
+    print(f"{args.first_stage} seul: exactitude {np.mean(first.argmax(axis=1) == labels):.2%}, "
+          f"{1000 * first_seconds:.3f} ms/tweet")
+    print(f"{args.second_stage} seul: exactitude {np.mean(second.argmax(axis=1) == labels):.2%}, "
+          f"{1000 * second_seconds:.3f} ms/tweet")
+    print(table.to_string(index=False))
+
+    if args.output:
+        if args.output.endswith(".json"):
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(table.to_dict(orient="records"), f, indent=2)
+        else:
+            table.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
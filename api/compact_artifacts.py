@@ -0,0 +1,368 @@
+"""
+Format compact des artefacts logistiques - Air Paradis
+
+Remplace les pickles joblib (tfidf_vectorizer.pkl + logistic_regression_model.pkl) par
+un répertoire versionné, chargé par numpy.memmap: le démarrage est quasi instantané et
+les pages sont partagées entre tous les workers uvicorn (cache de pages du système).
+
+Contenu du répertoire:
+    manifest.json   format, version, configuration d'analyse, biais, fichiers et SHA-256
+    terms.npy       n-grammes UTF-8 (largeur fixe), rangés dans l'ordre du vocabulaire
+    slots.npy       table de hachage à adressage ouvert (crc32) -> indice du terme, -1 si vide
+    idf.npy         idf_ du vectorizer (float32)
+    coef.npy        coef_ de la régression logistique (float32)
+
+La prédiction lit directement les tableaux mappés en mémoire (MemmapLogisticScorer):
+les n-grammes distincts d'un batch sont cherchés ensemble dans slots.npy, par un
+sondage vectorisé numpy, au lieu d'une recherche Python par n-gramme. Aucune copie du
+vocabulaire n'est faite dans le tas du worker. Les poids étant stockés en float32, les
+probabilités diffèrent de scikit-learn d'environ 1e-7.
+
+Usage:
+    python compact_artifacts.py export ./models/logistic_regression_model.pkl \\
+        ./models/tfidf_vectorizer.pkl --output ./models/logistic_compact
+    python compact_artifacts.py verify ./models/logistic_compact
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from logistic_scorer import CompiledLogisticScorer, scorer_config_from_vectorizer
+
+FORMAT_NAME = "airparadis-logistic-compact"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+ARRAY_FILES = ["terms.npy", "slots.npy", "idf.npy", "coef.npy"]
+
+
+def is_compact_artifact(path: str) -> bool:
+    """Indique si le chemin est un répertoire au format compact"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def _term_hash(term: bytes) -> int:
+    """Hachage stable entre processus et versions de Python (contrairement à hash())"""
+    return zlib.crc32(term)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_hash_slots(terms: np.ndarray) -> np.ndarray:
+    """
+    Construit la table de hachage (sondage linéaire, taux de remplissage <= 50%)
+
+    Returns:
+        Tableau int32 de taille puissance de 2: indice du terme, ou -1 pour une case vide
+    """
+    size = 1
+    while size < 2 * max(len(terms), 1):
+        size *= 2
+    mask = size - 1
+
+    slots = np.full(size, -1, dtype=np.int32)
+    for index, term in enumerate(terms):
+        slot = _term_hash(bytes(term)) & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+    return slots
+
+
+class MemmapVocabularyTable:
+    """
+    Table n-gramme -> (idf, idf * coef) lue dans des tableaux mappés en mémoire
+
+    Même interface .get() que le dictionnaire utilisé par CompiledLogisticScorer, mais
+    chaque recherche lit des scalaires numpy: pour un batch, utiliser lookup().
+    """
+
+    def __init__(self, terms: np.ndarray, slots: np.ndarray, idf: np.ndarray, coef: np.ndarray):
+        self.terms = terms
+        self.slots = slots
+        self.idf = idf
+        self.coef = coef
+        self.mask = len(slots) - 1
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def get(self, term: str) -> Optional[Tuple[float, float]]:
+        key = term.encode("utf-8")
+        slots, terms = self.slots, self.terms
+        slot = _term_hash(key) & self.mask
+        while True:
+            index = slots[slot]
+            if index < 0:
+                return None
+            if terms[index] == key:
+                idf = float(self.idf[index])
+                return idf, idf * float(self.coef[index])
+            slot = (slot + 1) & self.mask
+
+    def lookup(self, grams: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cherche plusieurs n-grammes à la fois (sondage linéaire vectorisé)
+
+        Returns:
+            (idf, idf * coef) en float64, à 0 pour les n-grammes absents du vocabulaire
+        """
+        count = len(grams)
+        idf = np.zeros(count)
+        weights = np.zeros(count)
+        if not count:
+            return idf, weights
+
+        encoded = [gram.encode("utf-8") for gram in grams]
+        # Largeur propre aux clés: un n-gramme plus long que les termes n'est pas tronqué
+        keys = np.array(encoded)
+        positions = np.fromiter(map(zlib.crc32, encoded), dtype=np.int64, count=count) & self.mask  # _term_hash
+        indices = np.full(count, -1, dtype=np.int64)
+
+        # Taux de remplissage <= 50%: quelques tours suffisent à trouver le terme ou une case vide
+        pending = np.arange(count)
+        while pending.size:
+            candidates = np.asarray(self.slots[positions[pending]], dtype=np.int64)
+            occupied = candidates >= 0
+            pending, candidates = pending[occupied], candidates[occupied]
+            found = self.terms[candidates] == keys[pending]
+            indices[pending[found]] = candidates[found]
+            pending = pending[~found]
+            positions[pending] = (positions[pending] + 1) & self.mask
+
+        known = indices >= 0
+        idf[known] = self.idf[indices[known]]
+        weights[known] = idf[known] * self.coef[indices[known]]
+        return idf, weights
+
+
+class MemmapLogisticScorer(CompiledLogisticScorer):
+    """
+    Scoreur compilé dont la table reste dans les tableaux mappés en mémoire
+
+    Les pages de terms.npy, slots.npy, idf.npy et coef.npy viennent du cache de pages du
+    système: elles sont partagées entre tous les processus qui chargent le même export.
+    """
+
+    def decision_one(self, text: str) -> float:
+        return float(self.decision_function([text])[0])
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """Logits d'une liste de textes (une seule recherche pour tout le batch)"""
+        if not texts:
+            return np.zeros(0)
+        counters = [Counter(self.analyze(text)) for text in texts]
+        grams = [gram for counter in counters for gram in counter]
+        positions = {gram: position for position, gram in enumerate(dict.fromkeys(grams))}
+
+        idf, weights = self.table.lookup(list(positions))
+        rows = np.repeat(np.arange(len(texts)), [len(counter) for counter in counters])
+        columns = np.fromiter(map(positions.__getitem__, grams), dtype=np.int64, count=len(grams))
+        tf = np.array([count for counter in counters for count in counter.values()], dtype=np.float64)
+        if self.binary:
+            tf = np.ones_like(tf)
+        elif self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+
+        dot = np.bincount(rows, weights=tf * weights[columns], minlength=len(texts))
+        if self.l2_norm:
+            norm = np.sqrt(np.bincount(rows, weights=(tf * idf[columns]) ** 2, minlength=len(texts)))
+            # Norme nulle: aucun n-gramme connu, le produit scalaire est déjà nul
+            dot = dot / np.where(norm > 0.0, norm, 1.0)
+        return dot + self.intercept
+
+
+def export_logistic_artifacts(vectorizer, model, output_dir: str,
+                              sources: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Exporte un TfidfVectorizer et une LogisticRegression binaire au format compact
+
+    Le manifeste est écrit en dernier: un répertoire sans manifeste est incomplet.
+
+    Args:
+        sources: Fichiers d'origine (nom -> chemin), dont l'empreinte est notée dans le manifeste
+
+    Raises:
+        ValueError: Si le pipeline ne peut pas être compilé
+    """
+    config = scorer_config_from_vectorizer(vectorizer)
+    classes = [int(c) for c in model.classes_]
+    if classes != [0, 1]:
+        raise ValueError(f"Classes non supportées: {classes} (attendu: [0, 1])")
+
+    vocabulary = vectorizer.vocabulary_
+    by_index = sorted(vocabulary.items(), key=lambda item: item[1])
+    if [index for _, index in by_index] != list(range(len(by_index))):
+        raise ValueError("vocabulary_ n'est pas indexé de 0 à n-1")
+
+    encoded = [term.encode("utf-8") for term, _ in by_index]
+    width = max((len(term) for term in encoded), default=1)
+    terms = np.array(encoded, dtype=f"S{width}")
+    coef = np.asarray(model.coef_, dtype=np.float32).ravel()
+    idf = np.asarray(vectorizer.idf_, dtype=np.float32) if vectorizer.use_idf \
+        else np.ones_like(coef)
+    if len(coef) != len(terms):
+        raise ValueError("coef_ et vocabulary_ n'ont pas la même taille")
+
+    # Un terme se terminant par un octet nul serait tronqué par le type numpy S
+    if any(term.endswith(b"\0") for term in encoded):
+        raise ValueError("Terme du vocabulaire non représentable (octet nul final)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    arrays = {
+        "terms.npy": terms,
+        "slots.npy": build_hash_slots(terms),
+        "idf.npy": idf,
+        "coef.npy": coef,
+    }
+    files = {}
+    for name, array in arrays.items():
+        path = os.path.join(output_dir, name)
+        np.save(path, array, allow_pickle=False)
+        files[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": _file_sha256(path),
+        }
+
+    manifest = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "vocabulary_size": len(terms),
+        "intercept": float(np.ravel(model.intercept_)[0]),
+        "config": config,
+        "files": files,
+        "sources": {
+            name: _file_sha256(path) for name, path in (sources or {}).items()
+        },
+    }
+    # Version du modèle: empreinte des fichiers et de la configuration
+    manifest["version"] = hashlib.sha256(
+        json.dumps({k: manifest[k] for k in ("intercept", "config", "files")}, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def read_manifest(artifact_dir: str) -> Dict[str, Any]:
+    """
+    Lit et valide le manifeste
+
+    Raises:
+        ValueError: Si le format ou sa version ne sont pas supportés
+    """
+    with open(os.path.join(artifact_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"Format non reconnu: {manifest.get('format')}")
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Version de format non supportée: {manifest.get('format_version')} (attendu: {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def verify_artifacts(artifact_dir: str, manifest: Optional[Dict[str, Any]] = None):
+    """
+    Vérifie les empreintes SHA-256 des fichiers
+
+    Raises:
+        ValueError: Si un fichier est absent ou modifié
+    """
+    manifest = manifest or read_manifest(artifact_dir)
+    for name, info in manifest["files"].items():
+        path = os.path.join(artifact_dir, name)
+        if not os.path.exists(path):
+            raise ValueError(f"Fichier manquant: {path}")
+        if _file_sha256(path) != info["sha256"]:
+            raise ValueError(f"Empreinte invalide: {path} (fichier modifié ou corrompu)")
+
+
+def load_logistic_artifacts(artifact_dir: str,
+                            verify: bool = True) -> Tuple[MemmapLogisticScorer, Dict[str, Any]]:
+    """
+    Charge le scoreur depuis un répertoire au format compact (tableaux mappés en mémoire)
+
+    Raises:
+        ValueError: Si le format, les empreintes ou les dimensions sont invalides
+    """
+    manifest = read_manifest(artifact_dir)
+    if verify:
+        verify_artifacts(artifact_dir, manifest)
+
+    arrays = {}
+    for name in ARRAY_FILES:
+        info = manifest["files"][name]
+        array = np.load(os.path.join(artifact_dir, name), mmap_mode="r", allow_pickle=False)
+        if array.dtype.str != info["dtype"] or list(array.shape) != info["shape"]:
+            raise ValueError(f"{name}: dimensions ou type inattendus")
+        arrays[name] = array
+
+    table = MemmapVocabularyTable(
+        arrays["terms.npy"], arrays["slots.npy"], arrays["idf.npy"], arrays["coef.npy"]
+    )
+    if len(table) != manifest["vocabulary_size"]:
+        raise ValueError("Taille du vocabulaire incohérente avec le manifeste")
+
+    return MemmapLogisticScorer(table, manifest["intercept"], manifest["config"]), manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Format compact des artefacts logistiques")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Convertit les pickles joblib")
+    export_parser.add_argument("model", help="logistic_regression_model.pkl")
+    export_parser.add_argument("vectorizer", help="tfidf_vectorizer.pkl")
+    export_parser.add_argument("--output", required=True, help="Répertoire de sortie")
+
+    verify_parser = subparsers.add_parser("verify", help="Vérifie les empreintes d'un export")
+    verify_parser.add_argument("artifact_dir")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            import joblib
+
+            manifest = export_logistic_artifacts(
+                joblib.load(args.vectorizer), joblib.load(args.model), args.output,
+                sources={"model": args.model, "vectorizer": args.vectorizer}
+            )
+            size = sum(os.path.getsize(os.path.join(args.output, name)) for name in ARRAY_FILES)
+            print(f"Export {manifest['version']}: {manifest['vocabulary_size']} termes, "
+                  f"{size / 1024:.0f} Ko -> {args.output}")
+        else:
+            verify_artifacts(args.artifact_dir)
+            print(f"{args.artifact_dir}: empreintes valides")
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
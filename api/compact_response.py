@@ -0,0 +1,169 @@
+"""
+Format de réponse compact pour les grands batchs - Air Paradis
+
+Le format standard de /predict/batch répète pour chaque tweet le texte, le libellé,
+un dictionnaire de probabilités, un horodatage et le type de modèle: pour des
+centaines de tweets, la construction des objets pydantic et la sérialisation JSON
+dominent la latence. Le format compact (?format=compact ou
+Accept: application/vnd.airparadis.compact+json) renvoie des colonnes, dans l'ordre
+des tweets envoyés:
+
+    {
+      "format": "compact",
+      "count": 3,
+      "model_type": "logistic",
+      "timestamp": "2024-01-15T10:30:00",
+      "labels": ["Négatif", "Positif"],
+      "model_versions": ["ce98370ce616"],
+      "columns": {
+        "sentiment": [1, 0, 1],
+        "confidence": [0.92, 0.81, 0.64],
+        "positive": [0.92, 0.19, 0.64]
+      }
+    }
+
+Les probabilités sont en float32 (probabilité négative = 1 - positive). Les colonnes
+version (indice dans model_versions) et stage (cascade) n'apparaissent que si elles
+varient d'un tweet à l'autre. La réponse est encodée par orjson s'il est installé
+(json sinon), puis compressée en zstd (zstandard) ou gzip selon Accept-Encoding,
+au-delà d'une taille minimale.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Repli sur json, plus lent
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Compression gzip uniquement
+    zstandard = None
+
+COMPACT_MEDIA_TYPE = "application/vnd.airparadis.compact+json"
+RESPONSE_FORMATS = ["standard", "compact"]
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+def wants_compact(response_format: Optional[str], accept: Optional[str]) -> bool:
+    """
+    Format compact demandé par ?format=compact ou par l'en-tête Accept
+
+    Raises:
+        ValueError: Si le format demandé est inconnu
+    """
+    if response_format is not None:
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Format inconnu: {response_format} (disponibles: {RESPONSE_FORMATS})")
+        return response_format == "compact"
+    return bool(accept) and COMPACT_MEDIA_TYPE in accept
+
+
+def compact_payload(results: Sequence[tuple], model_type: str, timestamp: str,
+                    labels: Sequence[str]) -> Dict[str, Any]:
+    """
+    Met les prédictions en colonnes
+
+    Args:
+        results: (stage, version, (classe, confiance, probabilités)) par tweet
+        labels: Libellé de chaque classe
+
+    Returns:
+        Réponse compacte (tableaux numpy pour les colonnes numériques)
+    """
+    count = len(results)
+    sentiment = np.empty(count, dtype=np.int8)
+    confidence = np.empty(count, dtype=np.float32)
+    positive = np.empty(count, dtype=np.float32)
+    versions: List[Optional[str]] = []
+    version_index = np.empty(count, dtype=np.int16)
+    stages = []
+
+    for row, (stage, version, (predicted_class, class_confidence, probabilities)) in enumerate(results):
+        sentiment[row] = predicted_class
+        confidence[row] = class_confidence
+        positive[row] = probabilities["positive"]
+        if version not in versions:
+            versions.append(version)
+        version_index[row] = versions.index(version)
+        stages.append(stage)
+
+    columns: Dict[str, Any] = {"sentiment": sentiment, "confidence": confidence, "positive": positive}
+    if len(versions) > 1:
+        columns["version"] = version_index
+    if any(stage is not None for stage in stages):
+        columns["stage"] = stages
+
+    return {
+        "format": "compact",
+        "count": count,
+        "model_type": model_type,
+        "timestamp": timestamp,
+        "labels": list(labels),
+        "model_versions": versions,
+        "columns": columns,
+    }
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        # Précision float32: ~7 chiffres significatifs suffisent
+        return np.round(value.astype(np.float64), 7).tolist() if value.dtype.kind == "f" else value.tolist()
+    raise TypeError(f"Type non sérialisable: {type(value)}")
+
+
+def encode_json(payload: Dict[str, Any]) -> bytes:
+    """JSON compact (orjson si installé: tableaux numpy sérialisés nativement)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False,
+                      default=_json_default).encode("utf-8")
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """Encodages acceptés par le client (en-tête Accept-Encoding, q=0 exclus)"""
+    encodings = []
+    for part in (accept_encoding or "").split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name and quality > 0:
+            encodings.append(name.lower())
+    return encodings
+
+
+def compress(body: bytes, accept_encoding: Optional[str], min_bytes: int,
+             algorithms: Sequence[str] = ("zstd", "gzip")) -> Tuple[bytes, Optional[str]]:
+    """
+    Compresse le corps s'il dépasse min_bytes et que le client l'accepte
+
+    Args:
+        algorithms: Algorithmes autorisés, par ordre de préférence
+
+    Returns:
+        (corps, Content-Encoding ou None si non compressé)
+    """
+    if len(body) < min_bytes:
+        return body, None
+
+    accepted = accepted_encodings(accept_encoding)
+    for algorithm in algorithms:
+        if algorithm not in accepted:
+            continue
+        if algorithm == "zstd" and zstandard is not None:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+        if algorithm == "gzip":
+            return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    return body, None
@@ -0,0 +1,271 @@
+"""
+Cache typé des jeux de données - Air Paradis
+
+Les notebooks (02, 03, 04) et fix_vectorizer.py relisaient à chaque exécution les CSV
+du corpus avec pd.read_csv: décodage latin-1, inférence des types et conversion du
+sentiment refaits à chaque fois, plusieurs dizaines de secondes pour le corpus complet.
+
+Ici chaque CSV est converti une seule fois en fichier Arrow IPC typé, non compressé,
+dont le nom contient l'empreinte (SHA-256) du fichier source: un CSV modifié produit
+un nouveau cache, l'ancien est supprimé. Les lectures suivantes projettent le fichier
+en mémoire (memory map) et ne copient que les colonnes et les lignes demandées.
+
+Formats reconnus:
+- Sentiment140 brut (sans en-tête, latin-1): sentiment (int8, 0/4 -> 0/1), id (int64),
+  date, query (catégorie), user, text
+- CSV avec en-tête (train_lemmatized.csv, val_stemmed.csv...): sentiment en int8, id en
+  int64, toutes les autres colonnes en texte. Un texte vide reste une chaîne vide et
+  un tweet "NA" ou "null" reste un texte (pas de valeur manquante).
+- Parquet (sortie de preprocess_corpus.py): déjà typé, lu directement.
+
+Usage:
+    from dataset_cache import load_dataset
+
+    train_df = load_dataset('../data/processed/train_lemmatized.csv')
+    sample = load_dataset('../data/processed/train_stemmed.csv', columns=['text', 'sentiment'],
+                          sample=50_000)  # échantillon stratifié sur le sentiment
+
+    python dataset_cache.py ../data/processed/*.csv  # construit les caches à l'avance
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+logger = logging.getLogger("dataset_cache")
+
+SENTIMENT140_COLUMNS = ["sentiment", "id", "date", "query", "user", "text"]
+SENTIMENT_MAPPING = {0: 0, 4: 1}
+# Incrémenter quand le format du cache change: les caches existants sont reconstruits
+CACHE_VERSION = 1
+CACHE_DIR = os.getenv("DATASET_CACHE_DIR")
+BLOCK_SIZE = 16 << 20
+
+# Empreintes déjà calculées: (chemin, taille, date de modification) -> SHA-256
+_digests: Dict[tuple, str] = {}
+
+
+def file_digest(path: str) -> str:
+    """Empreinte SHA-256 du fichier (recalculée seulement s'il a changé)"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+
+def cache_path(source: str, cache_dir: Optional[str] = None) -> str:
+    """Chemin du cache d'un CSV (défaut: DATASET_CACHE_DIR ou .cache à côté du CSV)"""
+    cache_dir = cache_dir or CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(source)), ".cache")
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f"{stem}-v{CACHE_VERSION}-{file_digest(source)[:16]}.arrow")
+
+
+def _read_header(source: str) -> Optional[list]:
+    # Sentiment140 n'a pas d'en-tête: sa première ligne commence par le sentiment
+    with open(source, "r", encoding="latin-1", newline="") as f:
+        first = next(csv.reader(f), [])
+    if not first or first[0].strip().isdigit():
+        return None
+    return first
+
+
+def _csv_options(source: str):
+    header = _read_header(source)
+    if header is None:
+        names = SENTIMENT140_COLUMNS
+        read_options = pa_csv.ReadOptions(column_names=names, encoding="latin1", block_size=BLOCK_SIZE)
+    else:
+        names = header
+        read_options = pa_csv.ReadOptions(encoding="utf8", block_size=BLOCK_SIZE)
+
+    column_types = {name: pa.string() for name in names}
+    column_types.update({name: pa.int64() for name in ("sentiment", "id") if name in names})
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=False)
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    return header is None, read_options, parse_options, convert_options
+
+
+def _typed_batch(batch: pa.RecordBatch, raw: bool) -> pa.RecordBatch:
+    columns = dict(zip(batch.schema.names, batch.columns))
+    if "sentiment" in columns:
+        sentiment = columns["sentiment"].to_numpy(zero_copy_only=False)
+        if raw:
+            unknown = set(np.unique(sentiment).tolist()) - set(SENTIMENT_MAPPING)
+            if unknown:
+                raise ValueError(f"Sentiments inattendus: {sorted(unknown)} (attendus: {list(SENTIMENT_MAPPING)})")
+            sentiment = sentiment // 4
+        columns["sentiment"] = pa.array(sentiment.astype(np.int8))
+    if raw:
+        # Une seule valeur (NO_QUERY) sur tout le corpus
+        columns["query"] = pc.dictionary_encode(columns["query"])
+    return pa.RecordBatch.from_arrays(list(columns.values()), names=list(columns))
+
+
+def build_cache(source: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Convertit un CSV en cache Arrow typé, sauf s'il existe déjà pour ce contenu
+
+    Returns:
+        Chemin du fichier Arrow
+
+    Raises:
+        ValueError: Si un sentiment Sentiment140 n'est ni 0 ni 4
+    """
+    path = cache_path(source, cache_dir)
+    if os.path.exists(path):
+        return path
+
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    raw, read_options, parse_options, convert_options = _csv_options(source)
+    reader = pa_csv.open_csv(source, read_options=read_options, parse_options=parse_options,
+                             convert_options=convert_options)
+
+    rows = 0
+    writer = None
+    try:
+        for batch in reader:
+            batch = _typed_batch(batch, raw)
+            if writer is None:
+                writer = ipc.new_file(path + ".tmp", batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError(f"Fichier vide: {source}")
+
+    # Écriture atomique, puis suppression des caches d'une version précédente du CSV
+    os.replace(path + ".tmp", path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    for stale in glob.glob(os.path.join(os.path.dirname(path), f"{glob.escape(stem)}-v*-*.arrow")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    logger.info(f"Cache construit: {path} ({rows} lignes en {time.perf_counter() - start:.1f}s)")
+    return path
+
+
+def _stratified_indices(labels: np.ndarray, size: int, random_state: int) -> np.ndarray:
+    # Même répartition que le notebook 04: size // n par classe, le reste de la division
+    # allant aux premières classes (size lignes au total), moins si une classe est petite
+    rng = np.random.default_rng(random_state)
+    classes = np.unique(labels)
+    per_class, remainder = divmod(size, max(len(classes), 1))
+    indices = [
+        rng.choice(members, size=min(len(members), per_class + (i < remainder)), replace=False)
+        for i, members in enumerate(np.flatnonzero(labels == value) for value in classes)
+    ]
+    return np.sort(np.concatenate(indices)) if indices else np.array([], dtype=np.int64)
+
+
+def load_table(source: str, columns: Optional[Sequence[str]] = None, sample: Optional[int] = None,
+               stratify: Optional[str] = "sentiment", random_state: int = 42, memory_map: bool = True,
+               cache_dir: Optional[str] = None) -> pa.Table:
+    """
+    Table Arrow d'un CSV (via son cache) ou d'un fichier/répertoire Parquet
+
+    Args:
+        columns: Colonnes à garder (défaut: toutes)
+        sample: Nombre de lignes à tirer au hasard (défaut: toutes)
+        stratify: Colonne dont la répartition est conservée par l'échantillon (None: tirage simple)
+        memory_map: Projette le cache en mémoire au lieu de le lire
+    """
+    if os.path.isdir(source) or source.endswith(".parquet"):
+        table = pq.read_table(source, memory_map=memory_map)
+    else:
+        path = build_cache(source, cache_dir)
+        stream = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+        table = ipc.open_file(stream).read_all()
+
+    if sample is not None and sample < table.num_rows:
+        if stratify and stratify in table.column_names:
+            labels = table.column(stratify).to_numpy()
+            indices = _stratified_indices(labels, sample, random_state)
+        else:
+            rng = np.random.default_rng(random_state)
+            indices = np.sort(rng.choice(table.num_rows, size=sample, replace=False))
+        table = table.take(pa.array(indices))
+
+    if columns is not None:
+        missing = set(columns) - set(table.column_names)
+        if missing:
+            raise ValueError(f"Colonnes inconnues: {sorted(missing)} (disponibles: {table.column_names})")
+        table = table.select(list(columns))
+    return table
+
+
+def load_dataset(source: str, columns: Optional[Sequence[str]] = None, sample: Optional[int] = None,
+                 stratify: Optional[str] = "sentiment", random_state: int = 42, memory_map: bool = True,
+                 cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Charge un jeu de données en DataFrame typé (remplace pd.read_csv dans les notebooks)
+
+    Le cache est construit au premier appel pour un contenu donné; les appels suivants
+    ne relisent pas le CSV. Mêmes arguments que load_table.
+
+    Raises:
+        ValueError: Si une colonne demandée n'existe pas
+    """
+    table = load_table(source, columns=columns, sample=sample, stratify=stratify,
+                       random_state=random_state, memory_map=memory_map, cache_dir=cache_dir)
+    return table.to_pandas()
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Construction des caches Arrow des jeux de données")
+    parser.add_argument("sources", nargs="+", help="Fichiers CSV (Sentiment140 brut ou avec en-tête)")
+    parser.add_argument("--cache-dir", default=None, help="Répertoire des caches (défaut: .cache à côté du CSV)")
+    args = parser.parse_args(argv)
+
+    report = []
+    for source in args.sources:
+        try:
+            start = time.perf_counter()
+            path = build_cache(source, args.cache_dir)
+            built = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rows = len(load_dataset(source, cache_dir=args.cache_dir))
+            report.append({
+                "source": source,
+                "cache": path,
+                "rows": rows,
+                "build_seconds": round(built, 2),
+                "load_seconds": round(time.perf_counter() - start, 2),
+            })
+        except (OSError, ValueError, pa.ArrowInvalid) as e:
+            logger.error(f"{source}: {e}")
+            return 1
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
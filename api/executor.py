@@ -0,0 +1,138 @@
+"""
+Exécuteur d'inférence - Air Paradis
+
+Sort l'inférence (TF-IDF, Keras, BERT) de la boucle d'événements asyncio pour que
+/health et les requêtes légères restent rapides pendant les prédictions lourdes.
+
+Types d'exécuteur:
+    - thread: pool de threads, pour les backends qui relâchent le GIL (TensorFlow, numpy)
+    - process: pool de processus, pour les backends qui gardent le GIL
+    - inline: exécution directe dans la boucle d'événements (comportement historique)
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ["thread", "process", "inline"]
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Levée quand la file d'attente de l'exécuteur est pleine"""
+
+
+class InferenceExecutor:
+    """
+    Exécute les fonctions d'inférence dans un pool de threads ou de processus
+
+    Args:
+        kind: Type d'exécuteur (thread, process, inline)
+        max_workers: Taille du pool
+        max_queue: Nombre maximal de tâches en attente au-delà des workers occupés
+        initializer: Fonction appelée au démarrage de chaque processus (pool de processus)
+        initargs: Arguments de l'initializer
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None,
+                 max_queue: int = 64, initializer: Optional[Callable] = None,
+                 initargs: tuple = ()):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Type d'exécuteur non reconnu: {kind} (attendu: {EXECUTOR_KINDS})")
+
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_pool(self) -> Optional[Executor]:
+        """Crée le pool au premier usage (après un éventuel fork des workers uvicorn)"""
+        if self._pool is None and self.kind != "inline":
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference"
+                )
+            else:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=self.initializer,
+                    initargs=self.initargs
+                )
+            logger.info(f"Exécuteur d'inférence '{self.kind}' démarré ({self.max_workers} workers)")
+        return self._pool
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Exécute fn(*args) dans le pool et attend le résultat
+
+        Raises:
+            ExecutorSaturatedError: Si les workers et la file d'attente sont pleins
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise ExecutorSaturatedError(
+                f"Exécuteur d'inférence saturé ({self._in_flight} tâches en cours)"
+            )
+
+        self._in_flight += 1
+        try:
+            pool = self._get_pool()
+            if pool is None:
+                result = fn(*args)
+            else:
+                call = functools.partial(fn, *args)
+                if self.kind == "thread":
+                    # Propage le contexte (endpoint, identifiant de requête) au thread
+                    call = functools.partial(contextvars.copy_context().run, fn, *args)
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(pool, call)
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Retourne l'état de l'exécuteur (occupation, file d'attente, saturation)"""
+        capacity = self.max_workers + self.max_queue
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "active": min(self._in_flight, self.max_workers),
+            "queued": max(0, self._in_flight - self.max_workers),
+            "saturation": round(self._in_flight / capacity, 4) if capacity else 1.0,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def restart(self, initargs: Optional[tuple] = None):
+        """
+        Remplace le pool (ex: après rechargement du modèle dans un pool de processus)
+
+        Les tâches en cours se terminent dans l'ancien pool; les suivantes partent
+        dans un nouveau pool initialisé avec initargs.
+        """
+        if initargs is not None:
+            self.initargs = initargs
+        old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        """Arrête le pool (les tâches en cours se terminent)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
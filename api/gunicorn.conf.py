@@ -0,0 +1,68 @@
+"""
+Configuration gunicorn - Air Paradis
+
+Le processus maître importe l'API et charge le modèle une seule fois (preload_app),
+puis forke les workers uvicorn: les poids du modèle sont partagés en copie sur
+écriture au lieu d'être chargés dans chaque worker. Le nombre de workers peut alors
+suivre le nombre de coeurs plutôt que la mémoire disponible.
+
+Les workers sont recyclés après MAX_REQUESTS requêtes (avec une part aléatoire pour
+ne pas tous redémarrer en même temps), ou quand leur mémoire propre dépasse
+WORKER_MAX_MEMORY_MB.
+
+Usage:
+    gunicorn app:app -c gunicorn.conf.py
+"""
+
+import gc
+import logging
+import multiprocessing
+import os
+import time
+
+logger = logging.getLogger("gunicorn.error")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# WEB_CONCURRENCY est renseignée par Heroku selon la taille du dyno
+workers = int(os.getenv("WEB_CONCURRENCY") or os.getenv("WORKERS") or multiprocessing.cpu_count())
+
+# Chargement du modèle dans le maître avant le fork (PRELOAD_MODEL=false pour désactiver)
+preload_app = os.getenv("PRELOAD_MODEL", "true").lower() == "true"
+
+# Recyclage des workers
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", str(max_requests // 10)))
+
+# Laisse le temps à BERT de finir les requêtes en cours lors d'un recyclage
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+
+def when_ready(server):
+    """Maître prêt (API importée si preload_app): chargement unique du modèle"""
+    if not preload_app:
+        return
+
+    import app as api
+
+    api.preload_model()
+
+    # Les objets du maître ne seront plus parcourus par le ramasse-miettes dans les
+    # workers: leurs pages ne sont pas recopiées (copie sur écriture préservée)
+    gc.freeze()
+    logger.info(f"Modèle préchargé, {gc.get_freeze_count()} objets gelés avant le fork")
+
+
+def post_fork(server, worker):
+    """Dans le worker, juste après le fork: active le recyclage sur seuil mémoire"""
+    import app as api
+
+    api.worker_recycling_enabled = True
+    api.worker_started_at = time.time()
+
+
+def child_exit(server, worker):
+    """Maître: un worker s'est arrêté (recyclage, seuil mémoire ou erreur)"""
+    logger.info(f"Worker {worker.pid} arrêté")
@@ -0,0 +1,131 @@
+"""
+Rechargement à chaud du modèle - Air Paradis
+
+Surveillance par scrutation des artefacts du modèle (models/): quand un fichier change
+(par exemple après fix_vectorizer.py), le rechargement est déclenché une fois les
+fichiers stables, sans redémarrer l'API.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class ReloadInProgressError(RuntimeError):
+    """Levée quand un rechargement est déjà en cours"""
+
+
+def artifact_signature(paths: Iterable[str]) -> Signature:
+    """
+    Signature (chemin, taille, date de modification) des artefacts
+
+    Plus légère qu'une empreinte SHA-256: aucun fichier n'est lu.
+    Un artefact absent a une taille et une date de -1.
+    """
+    entries = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        else:
+            files = [path]
+
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+                entries.append((file_path, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                entries.append((file_path, -1, -1))
+    return tuple(entries)
+
+
+class ArtifactWatcher:
+    """
+    Surveille les artefacts du modèle et appelle on_change quand ils sont modifiés
+
+    Le rechargement n'est déclenché qu'après un intervalle sans nouvelle modification,
+    pour ne pas charger un fichier en cours de copie.
+
+    Args:
+        get_paths: Fonction retournant les artefacts à surveiller (ceux du modèle en service)
+        on_change: Coroutine de rechargement
+        interval: Période de scrutation en secondes
+    """
+
+    def __init__(self, get_paths: Callable[[], List[str]], on_change: Callable[[], Awaitable],
+                 interval: float = 10.0):
+        self.get_paths = get_paths
+        self.on_change = on_change
+        self.interval = interval
+
+        self._signature: Optional[Signature] = None
+        self._pending: Optional[Signature] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def reset(self):
+        """Prend la signature actuelle comme référence"""
+        self._signature = artifact_signature(self.get_paths())
+        self._pending = None
+
+    async def poll(self) -> bool:
+        """
+        Compare les artefacts à la référence
+
+        Returns:
+            True si un rechargement a été déclenché
+        """
+        if self._signature is None:
+            self.reset()
+            return False
+
+        current = await asyncio.to_thread(artifact_signature, self.get_paths())
+        if current == self._signature:
+            self._pending = None
+            return False
+        if current != self._pending:
+            # Modification détectée: on attend qu'elle soit terminée
+            self._pending = current
+            return False
+
+        logger.info("Artefacts du modèle modifiés, rechargement")
+        try:
+            await self.on_change()
+        except ReloadInProgressError:
+            return False
+        except Exception as e:
+            logger.error(f"Échec du rechargement automatique (le modèle actuel reste en service): {e}")
+            # Pas de nouvelle tentative tant que les artefacts ne changent pas à nouveau
+            self._signature = current
+            self._pending = None
+            return True
+
+        self.reset()
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Erreur de surveillance des artefacts: {e}")
+
+    def start(self):
+        """Démarre la surveillance dans la boucle d'événements courante"""
+        self.reset()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Surveillance des artefacts du modèle toutes les {self.interval:.0f}s")
+
+    def stop(self):
+        """Arrête la surveillance"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,103 @@
+"""
+Inférence Keras compilée en graphe - Air Paradis
+
+model.predict() reconstruit un adaptateur de données et une boucle de prédiction à
+chaque appel (plusieurs millisecondes avant tout calcul), et la tokenisation Keras
+(texts_to_sequences + pad_sequences) tourne en Python. Ici, la tokenisation est
+recompilée en opérations TensorFlow à partir du tokenizer Keras sauvegardé, et le
+modèle est appelé dans une tf.function à signature fixe (vecteur de chaînes): une
+seule trace, quelle que soit la taille du batch, puis un appel de graphe par batch.
+
+La tokenisation rejoue exactement celle de Keras: minuscules, filtres remplacés par
+le séparateur, vocabulaire limité à num_words, jeton OOV, remplissage en fin de
+séquence et troncature par le début (les derniers mots sont conservés).
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+import backends
+
+
+def _filters_pattern(filters: str) -> str:
+    """Classe de caractères RE2 des filtres du tokenizer (échappés en \\x{...})"""
+    return "[" + "".join(f"\\x{{{ord(c):x}}}" for c in filters) + "]"
+
+
+class KerasGraphModel:
+    """
+    Modèle Keras (LSTM/CNN) et son tokenizer, compilés en un seul graphe TensorFlow
+
+    Args:
+        keras_model: Modèle Keras chargé
+        tokenizer_config: Configuration du tokenizer Keras (onnx_backend.keras_tokenizer_config)
+        max_length: Longueur des séquences en entrée du modèle
+    """
+
+    def __init__(self, keras_model, tokenizer_config: Dict[str, Any], max_length: int):
+        tf = backends.tensorflow()
+
+        self.keras_model = keras_model
+        self.max_length = max_length
+        self.lower = tokenizer_config.get("lower", True)
+        self.split = tokenizer_config.get("split", " ")
+        self.char_level = tokenizer_config.get("char_level", False)
+        self.num_words = tokenizer_config.get("num_words")
+        self.filters = _filters_pattern(tokenizer_config.get("filters", ""))
+
+        word_index = tokenizer_config["word_index"]
+        oov_token = tokenizer_config.get("oov_token")
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+
+        # Mot -> indice Keras, -1 pour un mot inconnu
+        self.table = tf.lookup.StaticHashTable(
+            tf.lookup.KeyValueTensorInitializer(
+                tf.constant(list(word_index.keys()), dtype=tf.string),
+                tf.constant(list(word_index.values()), dtype=tf.int64),
+            ),
+            default_value=-1,
+        )
+
+        signature = [tf.TensorSpec(shape=[None], dtype=tf.string)]
+        self.vectorize = tf.function(self._vectorize, input_signature=signature)
+        self.serve = tf.function(self._serve, input_signature=signature)
+
+    def _vectorize(self, texts):
+        """Chaînes -> séquences int32 (batch x max_length), comme pad_sequences(padding='post')"""
+        tf = backends.tensorflow()
+
+        if self.lower:
+            texts = tf.strings.lower(texts, encoding="utf-8")
+        if self.char_level:
+            words = tf.strings.unicode_split(texts, "UTF-8")
+        else:
+            if self.filters != "[]":
+                texts = tf.strings.regex_replace(texts, self.filters, self.split)
+            words = tf.strings.split(texts, sep=self.split)
+            words = tf.ragged.boolean_mask(words, tf.not_equal(words, ""))
+
+        ids = tf.ragged.map_flat_values(self.table.lookup, words)
+        known = ids >= 0
+        if self.num_words:
+            in_vocabulary = known & (ids < self.num_words)
+        else:
+            in_vocabulary = known
+        if self.oov_index is not None:
+            # Mot inconnu ou hors des num_words les plus fréquents -> jeton OOV
+            ids = tf.ragged.map_flat_values(
+                tf.where, in_vocabulary, ids, tf.constant(self.oov_index, dtype=tf.int64)
+            )
+        else:
+            ids = tf.ragged.boolean_mask(ids, in_vocabulary)
+
+        ids = ids[:, -self.max_length:]
+        return tf.cast(ids.to_tensor(default_value=0, shape=[None, self.max_length]), tf.int32)
+
+    def _serve(self, texts):
+        return self.keras_model(self._vectorize(texts), training=False)
+
+    def predict(self, texts) -> np.ndarray:
+        """Sortie du modèle (softmax ou sigmoïde) pour une liste de textes"""
+        tf = backends.tensorflow()
+        return self.serve(tf.constant(texts, dtype=tf.string)).numpy()
@@ -0,0 +1,508 @@
+"""
+Test de charge de l'API - Air Paradis
+
+Envoie des requêtes /predict et /predict/batch avec des tweets réels
+(livrables/TWEETS_DEMO.md ou un CSV, Sentiment140 ou avec une colonne text), puis
+rapporte pour chaque type de modèle et chaque endpoint: débit, percentiles de
+latence (p50/p95/p99), taux d'erreur, CPU et mémoire résidente du serveur.
+
+Deux modes de charge:
+    - boucle fermée (--concurrency N): N clients envoient chacun une requête dès la
+      réponse précédente reçue;
+    - boucle ouverte (--rate R): R requêtes par seconde, arrivées de Poisson (ou
+      régulières), que le serveur suive ou non. La latence est mesurée depuis l'instant
+      d'arrivée prévu: l'attente due à un serveur saturé est comptée.
+
+Serveur testé:
+    - par défaut, un processus uvicorn lancé par type de modèle (MODEL_TYPE), attendu
+      sur /health/ready;
+    - --in-process: l'application ASGI dans ce processus (sans réseau, le CPU et la
+      mémoire rapportés incluent le générateur de charge);
+    - --url: un serveur déjà démarré (CPU et mémoire non mesurés).
+    Avec --in-process et --url, le type de modèle est choisi par ?model=.
+
+Le cache des prédictions est désactivé dans les serveurs lancés ici (--keep-cache
+pour le garder): les tweets de démonstration, peu nombreux, seraient sinon tous servis
+depuis le cache.
+
+Usage:
+    python load_test.py --model-types logistic,bert --concurrency 16 --duration 30
+    python load_test.py --rate 200 --endpoints batch --batch-size 16 --output load.json
+    python load_test.py --url http://localhost:8000 --tweets ../data/training.1600000.processed.noemoticon.csv
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+import pandas as pd
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TWEETS = os.path.join(API_DIR, "..", "livrables", "TWEETS_DEMO.md")
+ENDPOINTS = {"predict": "/predict", "batch": "/predict/batch"}
+
+
+def load_tweets(path: str, size: int = 1000, seed: int = 42) -> List[str]:
+    """
+    Charge les tweets à envoyer
+
+    Args:
+        path: Fichier Markdown (un tweet par bloc ```), ou CSV avec une colonne
+            text, ou au format Sentiment140 (latin-1, sans en-tête, texte en dernière colonne)
+        size: Nombre maximal de tweets tirés d'un CSV
+
+    Raises:
+        ValueError: Si aucun tweet n'est trouvé
+    """
+    if path.endswith(".md"):
+        # Un tweet par bloc ``` sans langage (les blocs json, bash... sont ignorés)
+        tweets, block, language = [], None, None
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.startswith("```"):
+                    if block is None:
+                        block, language = [], line[3:].strip()
+                    else:
+                        if not language and len(block) == 1 and block[0].strip():
+                            tweets.append(block[0].strip())
+                        block = None
+                elif block is not None:
+                    block.append(line)
+    else:
+        frame = pd.read_csv(path, encoding="latin-1")
+        if "text" in frame.columns:
+            texts = frame["text"]
+        else:
+            texts = pd.read_csv(path, encoding="latin-1", header=None).iloc[:, -1]
+        texts = texts.dropna().astype(str)
+        tweets = texts.sample(n=min(size, len(texts)), random_state=seed).tolist()
+
+    if not tweets:
+        raise ValueError(f"Aucun tweet trouvé dans {path}")
+    return tweets
+
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Moyenne, percentiles et maximum des latences, en millisecondes"""
+    if not len(latencies):
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def summarize(records: List[tuple], duration: float, tweets_per_request: int) -> Dict[str, Any]:
+    """
+    Résume une série de requêtes
+
+    Args:
+        records: (latence en secondes, code HTTP ou 0 si la requête a échoué)
+        duration: Durée de la mesure (secondes)
+        tweets_per_request: Tweets envoyés par requête
+
+    Returns:
+        Débit, taux d'erreur, codes HTTP et latences des requêtes réussies
+    """
+    successes = [latency for latency, code in records if 200 <= code < 300]
+    errors = len(records) - len(successes)
+    status_codes: Dict[str, int] = {}
+    for _, code in records:
+        status_codes[str(code)] = status_codes.get(str(code), 0) + 1
+
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "status_codes": status_codes,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(len(successes) / duration, 2) if duration else 0.0,
+        "tweets_per_second": round(len(successes) * tweets_per_request / duration, 2) if duration else 0.0,
+        "latency_ms": latency_summary(successes),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Ressources du serveur
+# ---------------------------------------------------------------------------
+
+def _proc_cpu_seconds(pid: Optional[int]) -> Optional[float]:
+    """Temps CPU (utilisateur + système) d'un processus, None hors Linux"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _proc_rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Mémoire résidente d'un processus, None hors Linux"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ResourceSampler:
+    """
+    Mesure le CPU et la mémoire résidente du serveur pendant un scénario
+
+    Args:
+        pid: Processus du serveur (None: non mesuré, serveur distant)
+        interval: Période d'échantillonnage de la mémoire (secondes)
+    """
+
+    def __init__(self, pid: Optional[int], interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss: Optional[int] = None
+        self._cpu_start: Optional[float] = None
+        self._wall_start = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self):
+        rss = _proc_rss_bytes(self.pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._cpu_start = _proc_cpu_seconds(self.pid)
+        self._wall_start = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        """Arrête la mesure; CPU en % d'un cœur sur la durée du scénario"""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._sample()
+
+        wall = time.perf_counter() - self._wall_start
+        cpu_end = _proc_cpu_seconds(self.pid)
+        cpu_percent = None
+        if self._cpu_start is not None and cpu_end is not None and wall > 0:
+            cpu_percent = round(100 * (cpu_end - self._cpu_start) / wall, 1)
+        return {
+            "cpu_percent": cpu_percent,
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1) if self.peak_rss else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Générateurs de charge
+# ---------------------------------------------------------------------------
+
+class RequestFactory:
+    """Requêtes à envoyer: les tweets sont parcourus en boucle, dans un ordre aléatoire"""
+
+    def __init__(self, tweets: List[str], endpoint: str, batch_size: int,
+                 model_name: Optional[str], seed: int = 42, response_format: Optional[str] = None):
+        self.tweets = list(tweets)
+        random.Random(seed).shuffle(self.tweets)
+        self.path = ENDPOINTS[endpoint]
+        self.endpoint = endpoint
+        self.batch_size = batch_size if endpoint == "batch" else 1
+        self.params = {"model": model_name} if model_name else {}
+        if response_format and endpoint == "batch":
+            self.params["format"] = response_format
+        self._next = 0
+
+    def _take(self, count: int) -> List[str]:
+        texts = [self.tweets[(self._next + i) % len(self.tweets)] for i in range(count)]
+        self._next = (self._next + count) % len(self.tweets)
+        return texts
+
+    def payload(self) -> Dict[str, Any]:
+        if self.endpoint == "batch":
+            return {"tweets": self._take(self.batch_size)}
+        return {"text": self._take(1)[0]}
+
+
+async def send(client: httpx.AsyncClient, factory: RequestFactory, started: Optional[float] = None) -> tuple:
+    """
+    Envoie une requête
+
+    Args:
+        started: Instant de référence de la latence (arrivée prévue en boucle ouverte)
+
+    Returns:
+        (latence en secondes, code HTTP ou 0 si la requête a échoué)
+    """
+    payload = factory.payload()
+    started = started if started is not None else time.perf_counter()
+    try:
+        response = await client.post(factory.path, json=payload, params=factory.params)
+        code = response.status_code
+    except httpx.HTTPError:
+        code = 0
+    return time.perf_counter() - started, code
+
+
+async def closed_loop(client: httpx.AsyncClient, factory: RequestFactory, concurrency: int,
+                      duration: float, max_requests: Optional[int] = None) -> List[tuple]:
+    """N clients concurrents, chacun envoie une requête dès la réponse précédente reçue"""
+    records: List[tuple] = []
+    deadline = time.perf_counter() + duration
+    sent = 0
+
+    async def user():
+        nonlocal sent
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            records.append(await send(client, factory))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return records
+
+
+async def open_loop(client: httpx.AsyncClient, factory: RequestFactory, rate: float, duration: float,
+                    max_requests: Optional[int] = None, poisson: bool = True, seed: int = 42) -> List[tuple]:
+    """R requêtes par seconde, indépendamment des réponses (arrivées de Poisson ou régulières)"""
+    rng = random.Random(seed)
+    tasks = []
+    start = time.perf_counter()
+    scheduled = start
+
+    while scheduled - start < duration and (max_requests is None or len(tasks) < max_requests):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(client, factory, started=scheduled)))
+        scheduled += rng.expovariate(rate) if poisson else 1 / rate
+
+    return list(await asyncio.gather(*tasks))
+
+
+async def run_scenario(client: httpx.AsyncClient, tweets: List[str], endpoint: str,
+                       model_name: Optional[str] = None, batch_size: int = 16,
+                       concurrency: int = 8, rate: Optional[float] = None, poisson: bool = True,
+                       duration: float = 10.0, max_requests: Optional[int] = None,
+                       warmup_requests: int = 20, server_pid: Optional[int] = None,
+                       seed: int = 42, response_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Préchauffe le serveur puis mesure un scénario (un endpoint, un modèle)
+
+    Args:
+        rate: Requêtes par seconde (boucle ouverte); None: boucle fermée à concurrency clients
+        server_pid: Processus du serveur pour le CPU et la mémoire (None: non mesurés)
+        response_format: Format des réponses /predict/batch (?format=compact)
+
+    Returns:
+        Résumé du scénario (voir summarize), avec le CPU et la mémoire du serveur
+    """
+    factory = RequestFactory(tweets, endpoint, batch_size, model_name, seed, response_format)
+    for _ in range(warmup_requests):
+        await send(client, factory)
+
+    sampler = ResourceSampler(server_pid)
+    sampler.start()
+    start = time.perf_counter()
+    if rate:
+        records = await open_loop(client, factory, rate, duration, max_requests, poisson, seed)
+    else:
+        records = await closed_loop(client, factory, concurrency, duration, max_requests)
+    elapsed = time.perf_counter() - start
+    resources = await sampler.stop()
+
+    return {
+        "endpoint": endpoint,
+        "batch_size": factory.batch_size,
+        "mode": "open" if rate else "closed",
+        "concurrency": None if rate else concurrency,
+        "rate": rate,
+        **summarize(records, elapsed, factory.batch_size),
+        **resources,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Serveurs
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float,
+                           process: Optional[subprocess.Popen] = None) -> Dict[str, Any]:
+    """
+    Attend que le serveur réponde 200 sur /health/ready (modèle chargé et préchauffé)
+
+    Raises:
+        RuntimeError: Si le serveur s'arrête ou n'est pas prêt avant timeout
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté (code {process.returncode})")
+        try:
+            response = await client.get("/health/ready")
+            if response.status_code == 200:
+                return response.json()
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Serveur non prêt après {timeout:.0f}s")
+
+
+def start_uvicorn(model_type: Optional[str], keep_cache: bool) -> tuple:
+    """Lance l'API dans un processus uvicorn; retourne (processus, URL)"""
+    port = _free_port()
+    env = dict(os.environ)
+    if model_type:
+        env["MODEL_TYPE"] = model_type
+    if not keep_cache:
+        env["PREDICTION_CACHE_ENDPOINTS"] = ""
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=API_DIR, env=env
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def run_load_test(args, tweets: List[str]) -> List[Dict[str, Any]]:
+    """Exécute chaque scénario (type de modèle x endpoint) et retourne les résultats"""
+    model_types = [m.strip() for m in args.model_types.split(",") if m.strip()] if args.model_types else [None]
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    limits = httpx.Limits(max_connections=args.max_connections)
+    scenario = dict(
+        batch_size=args.batch_size, concurrency=args.concurrency, rate=args.rate,
+        poisson=args.arrival == "poisson", duration=args.duration, max_requests=args.requests,
+        warmup_requests=args.warmup, seed=args.seed, response_format=args.format,
+    )
+    results = []
+
+    async def measure(client, model_type, model_name, server_pid, process=None):
+        ready = await wait_until_ready(client, args.startup_timeout, process)
+        for endpoint in endpoints:
+            print(f"Scénario {model_type or ready['model_type']} / {endpoint}...", file=sys.stderr)
+            result = await run_scenario(client, tweets, endpoint, model_name=model_name,
+                                        server_pid=server_pid, **scenario)
+            results.append({"model_type": model_type or ready["model_type"],
+                            "model_version": ready.get("model_version"), **result})
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            for model_type in model_types:
+                await measure(client, model_type, model_type, server_pid=None)
+    elif args.in_process:
+        if not args.keep_cache:
+            os.environ["PREDICTION_CACHE_ENDPOINTS"] = ""
+        import app as api
+
+        await api.app.router.startup()
+        try:
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test",
+                                         timeout=args.timeout) as client:
+                for model_type in model_types:
+                    await measure(client, model_type, model_type, server_pid=os.getpid())
+        finally:
+            await api.app.router.shutdown()
+    else:
+        for model_type in model_types:
+            process, url = start_uvicorn(model_type, args.keep_cache)
+            try:
+                async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+                    await measure(client, model_type, None, server_pid=process.pid, process=process)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    return results
+
+
+def results_table(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Tableau de synthèse (une ligne par scénario)"""
+    return pd.DataFrame([{
+        "model": r["model_type"],
+        "endpoint": r["endpoint"],
+        "req/s": r["throughput_rps"],
+        "tweets/s": r["tweets_per_second"],
+        "p50 ms": r["latency_ms"]["p50"],
+        "p95 ms": r["latency_ms"]["p95"],
+        "p99 ms": r["latency_ms"]["p99"],
+        "errors %": round(100 * r["error_rate"], 2),
+        "cpu %": r["cpu_percent"],
+        "rss MB": r["peak_rss_mb"],
+    } for r in results])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge de l'API (débit, p50/p95/p99, CPU, mémoire)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Serveur déjà démarré (défaut: uvicorn lancé par type de modèle)")
+    target.add_argument("--in-process", action="store_true", help="Application ASGI dans ce processus")
+    parser.add_argument("--model-types", help="Types de modèle, séparés par des virgules (défaut: MODEL_TYPE)")
+    parser.add_argument("--endpoints", default="predict,batch", help="predict, batch ou les deux")
+    parser.add_argument("--tweets", default=DEFAULT_TWEETS, help="Fichier Markdown ou CSV de tweets")
+    parser.add_argument("--size", type=int, default=1000, help="Tweets tirés d'un CSV")
+    parser.add_argument("--batch-size", type=int, default=16, help="Tweets par requête /predict/batch")
+    parser.add_argument("--format", choices=["standard", "compact"], help="Format des réponses /predict/batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients concurrents (boucle fermée)")
+    parser.add_argument("--rate", type=float, help="Requêtes par seconde (boucle ouverte)")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson",
+                        help="Loi des arrivées en boucle ouverte")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque scénario (secondes)")
+    parser.add_argument("--requests", type=int, help="Nombre maximal de requêtes par scénario")
+    parser.add_argument("--warmup", type=int, default=20, help="Requêtes non mesurées avant chaque scénario")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Délai maximal d'une requête (secondes)")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--startup-timeout", type=float, default=300.0, help="Attente de /health/ready")
+    parser.add_argument("--keep-cache", action="store_true", help="Garder le cache des prédictions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Rapport JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        tweets = load_tweets(args.tweets, args.size, args.seed)
+        results = asyncio.run(run_load_test(args, tweets))
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(results_table(results).to_string(index=False))
+    if args.output:
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "tweets": len(tweets),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Logging non bloquant - Air Paradis
+
+logging.basicConfig écrit sur stderr de façon synchrone, dans la boucle d'événements:
+chaque ligne de log d'une requête retarde la réponse. Ici les handlers de l'API se
+contentent de déposer l'enregistrement dans une file en mémoire (QueueHandler); un
+thread dédié (QueueListener) le formate et l'écrit. Si la file est pleine,
+l'enregistrement est abandonné (compté dans airparadis_log_records_dropped_total)
+plutôt que de bloquer la requête.
+
+Chaque enregistrement porte l'identifiant de la requête en cours (en-tête
+X-Request-ID fourni par le client ou généré, renvoyé dans la réponse) et peut être
+écrit en JSON, une ligne par enregistrement:
+
+    {"timestamp": "2024-01-15T10:30:00.123+00:00", "level": "INFO", "logger": "app",
+     "message": "Prédiction: Positif (confiance: 92.00%)", "request_id": "3f2a...",
+     "process": 12, "event": "prediction", "sentiment": "Positif", "confidence": 0.92}
+
+Les champs passés par extra= (event, model_type, confidence...) sont ajoutés tels quels.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import REGISTRY
+
+REQUEST_ID_HEADER = "X-Request-ID"
+LOG_FORMATS = ["json", "text"]
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Identifiant fourni par le client: repris tel quel s'il est raisonnable
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Identifiant de la requête en cours (propagé aux threads d'inférence par l'exécuteur)
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "airparadis_log_records_dropped_total", "Enregistrements de log abandonnés (file pleine)"
+)
+
+# Attributs standard d'un LogRecord (et message coloré d'uvicorn): tout le reste vient de extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id",
+                                                            "color_message"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne: horodatage, niveau, logger, message, request_id et extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "process": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui n'attend jamais: l'enregistrement est abandonné si la file est pleine
+
+    Seuls l'identifiant de requête et le message (args interpolés) sont figés dans le
+    thread appelant; le formatage JSON et l'écriture ont lieu dans le thread d'écriture.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Copie: les autres handlers du logger reçoivent l'enregistrement intact
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # La trace est formatée tout de suite: les frames ne survivent pas à la requête
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class _RequestIdDefault(logging.Filter):
+    """request_id toujours présent (enregistrements qui ne sont pas passés par la file)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+def build_formatter(log_format: str) -> logging.Formatter:
+    """
+    Formateur de la sortie: json ou text
+
+    Raises:
+        ValueError: Si le format est inconnu
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Format de log inconnu: {log_format} (disponibles: {LOG_FORMATS})")
+    return JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+
+
+def setup_logging(level: str = "INFO", log_format: str = "json", queue_size: int = 10000,
+                  stream=None, captured_loggers: Sequence[str] = ()) -> logging.handlers.QueueListener:
+    """
+    Remplace les handlers du logger racine par une file et démarre le thread d'écriture
+
+    Args:
+        level: Niveau du logger racine (LOG_LEVEL)
+        log_format: json ou text (LOG_FORMAT)
+        queue_size: Nombre maximal d'enregistrements en attente (0: illimité)
+        stream: Flux de sortie (stderr par défaut)
+        captured_loggers: Loggers dont les handlers synchrones sont retirés au profit
+            de la file (ex: uvicorn.access)
+
+    Returns:
+        Le QueueListener démarré (arrêté par stop_logging ou à la sortie du processus)
+    """
+    global _listener, _queue_handler
+    stop_logging()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(build_formatter(log_format))
+    output.addFilter(_RequestIdDefault())
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    # Logs d'accès et d'erreur d'uvicorn: même file que ceux de l'API
+    for name in captured_loggers:
+        captured = logging.getLogger(name)
+        for handler in list(captured.handlers):
+            captured.removeHandler(handler)
+        captured.propagate = True
+
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Écrit les enregistrements en attente et arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
+
+
+def _restart_after_fork():
+    # Le thread d'écriture ne survit pas au fork (workers gunicorn): nouvelle file et
+    # nouveau thread dans l'enfant, les enregistrements en attente restent au parent
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = _listener.queue = queue.Queue(_queue_handler.queue.maxsize)
+    _listener._thread = None
+    _listener.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def should_sample(rate: float) -> bool:
+    """Tirage d'échantillonnage: vrai avec la probabilité rate (0: jamais, 1: toujours)"""
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def resolve_request_id(header_value: Optional[str]) -> str:
+    """Identifiant fourni par le client s'il est valide, sinon un nouvel identifiant"""
+    if header_value and _REQUEST_ID_PATTERN.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI: identifiant de requête (X-Request-ID) placé dans le contexte des
+    logs et renvoyé dans la réponse
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        provided = None
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                provided = value.decode("latin-1")
+                break
+        request_id = resolve_request_id(provided)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
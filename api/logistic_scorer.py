@@ -0,0 +1,194 @@
+"""
+Scoreur compilé TF-IDF + régression logistique - Air Paradis
+
+Le pipeline TF-IDF + régression logistique est linéaire: pour chaque terme du
+vocabulaire, on replie au chargement son idf_ et son poids coef_ dans une seule
+table de correspondance terme -> (idf, idf * coef). Une prédiction se résume alors à:
+
+    tokenisation -> recherche des n-grammes -> produit scalaire normalisé L2 -> sigmoïde
+
+sans construire de matrice creuse scipy ni calculer les logits deux fois
+(predict + predict_proba). Les résultats sont identiques à ceux de scikit-learn.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Paramètres du TfidfVectorizer reproduits par le scoreur
+SUPPORTED_NORMS = ("l2", None)
+SUPPORTED_ACCENTS = ("ascii", "unicode", None)
+
+
+def _strip_accents_unicode(text: str) -> str:
+    """Supprime les accents (équivalent de sklearn strip_accents='unicode')"""
+    try:
+        text.encode("ASCII", errors="strict")
+        return text
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize("NFKD", text)
+        return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(text: str) -> str:
+    """Supprime les accents (équivalent de sklearn strip_accents='ascii')"""
+    normalized = unicodedata.normalize("NFKD", text)
+    return normalized.encode("ASCII", "ignore").decode("ASCII")
+
+
+def scorer_config_from_vectorizer(vectorizer) -> Dict[str, Any]:
+    """
+    Extrait la configuration d'analyse d'un TfidfVectorizer scikit-learn
+
+    Raises:
+        ValueError: Si le vectorizer utilise une option non reproduite par le scoreur
+    """
+    if vectorizer.analyzer != "word":
+        raise ValueError(f"analyzer non supporté: {vectorizer.analyzer}")
+    if vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+        raise ValueError("preprocessor/tokenizer personnalisés non supportés")
+    if vectorizer.input != "content":
+        raise ValueError(f"input non supporté: {vectorizer.input}")
+    if vectorizer.norm not in SUPPORTED_NORMS:
+        raise ValueError(f"norm non supportée: {vectorizer.norm}")
+    if vectorizer.strip_accents not in SUPPORTED_ACCENTS:
+        raise ValueError(f"strip_accents non supporté: {vectorizer.strip_accents}")
+
+    stop_words = vectorizer.get_stop_words()
+    return {
+        "lowercase": bool(vectorizer.lowercase),
+        "strip_accents": vectorizer.strip_accents,
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "norm": vectorizer.norm,
+    }
+
+
+class CompiledLogisticScorer:
+    """
+    Scoreur TF-IDF + régression logistique binaire sans matrice creuse
+
+    Args:
+        table: Correspondance n-gramme -> (idf, idf * coef); tout objet exposant .get()
+        intercept: Biais de la régression logistique
+        config: Configuration d'analyse (voir scorer_config_from_vectorizer)
+    """
+
+    def __init__(self, table: Mapping[str, Tuple[float, float]], intercept: float,
+                 config: Dict[str, Any]):
+        self.table = table
+        self.intercept = float(intercept)
+        self.config = config
+
+        self.lowercase = config["lowercase"]
+        self.strip_accents = {
+            "ascii": _strip_accents_ascii,
+            "unicode": _strip_accents_unicode,
+        }.get(config["strip_accents"])
+        self.token_regex = re.compile(config["token_pattern"])
+        self.min_n, self.max_n = config["ngram_range"]
+        self.stop_words = frozenset(config["stop_words"]) if config["stop_words"] else None
+        self.binary = config["binary"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self.l2_norm = config["norm"] == "l2"
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model) -> "CompiledLogisticScorer":
+        """
+        Compile un TfidfVectorizer et une LogisticRegression binaire entraînés
+
+        Raises:
+            ValueError: Si le modèle ou le vectorizer ne peut pas être compilé
+        """
+        config = scorer_config_from_vectorizer(vectorizer)
+
+        classes = [int(c) for c in model.classes_]
+        if classes != [0, 1]:
+            raise ValueError(f"Classes non supportées: {classes} (attendu: [0, 1])")
+
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf \
+            else np.ones_like(coef)
+        if len(coef) != len(vectorizer.vocabulary_):
+            raise ValueError("coef_ et vocabulary_ n'ont pas la même taille")
+
+        weights = idf * coef
+        table = {
+            term: (float(idf[index]), float(weights[index]))
+            for term, index in vectorizer.vocabulary_.items()
+        }
+        return cls(table, float(np.ravel(model.intercept_)[0]), config)
+
+    def analyze(self, text: str) -> List[str]:
+        """Découpe un texte en n-grammes (équivalent de vectorizer.build_analyzer())"""
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents is not None:
+            text = self.strip_accents(text)
+
+        tokens = self.token_regex.findall(text)
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        if self.max_n == 1:
+            return tokens
+
+        min_n = self.min_n
+        grams = list(tokens) if min_n == 1 else []
+        if min_n == 1:
+            min_n = 2
+        n_tokens = len(tokens)
+        for n in range(min_n, min(self.max_n, n_tokens) + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(n_tokens - n + 1))
+        return grams
+
+    def decision_one(self, text: str) -> float:
+        """Logit d'un texte: produit scalaire TF-IDF normalisé L2 + biais"""
+        table = self.table
+        dot = 0.0
+        squared_norm = 0.0
+
+        for gram, count in Counter(self.analyze(text)).items():
+            entry = table.get(gram)
+            if entry is None:
+                continue
+            idf, weight = entry
+            if self.binary:
+                tf = 1.0
+            elif self.sublinear_tf:
+                tf = 1.0 + math.log(count)
+            else:
+                tf = float(count)
+            dot += tf * weight
+            value = tf * idf
+            squared_norm += value * value
+
+        if self.l2_norm and squared_norm > 0.0:
+            dot /= math.sqrt(squared_norm)
+        return dot + self.intercept
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """Logits d'une liste de textes"""
+        return np.fromiter((self.decision_one(text) for text in texts),
+                           dtype=np.float64, count=len(texts))
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Probabilités [négatif, positif] d'une liste de textes, shape (n, 2)"""
+        logits = self.decision_function(texts)
+        prob_positive = 1.0 / (1.0 + np.exp(-logits))
+        return np.column_stack([1.0 - prob_positive, prob_positive])
+
+
+def build_logistic_scorer(vectorizer, model) -> Optional[CompiledLogisticScorer]:
+    """Compile le scoreur, ou retourne None si le pipeline n'est pas compilable"""
+    try:
+        return CompiledLogisticScorer.from_sklearn(vectorizer, model)
+    except (AttributeError, ValueError, TypeError):
+        return None
@@ -0,0 +1,340 @@
+"""
+Métriques Prometheus - Air Paradis
+
+Compteurs, jauges et histogrammes exposés au format texte Prometheus sur /metrics,
+sans dépendance externe. Les durées de chaque étape du chemin de prédiction
+(validation, vectorisation/tokenisation, passe forward, sérialisation) sont
+étiquetées par endpoint, type de modèle et tranche de taille de batch.
+"""
+
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets de latence (secondes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tranches de taille de batch utilisées comme étiquette
+BATCH_SIZE_BUCKETS = ((1, "1"), (8, "2-8"), (32, "9-32"), (128, "33-128"))
+
+# Endpoint de la requête en cours (propagé aux threads d'inférence)
+current_endpoint: contextvars.ContextVar = contextvars.ContextVar("current_endpoint", default="other")
+
+
+def process_rss_bytes() -> int:
+    """Mémoire résidente du processus (Linux: /proc/self/statm, sinon pic via resource)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        try:
+            import resource
+        except ImportError:
+            return 0
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """
+    Mémoire du processus en octets: rss, pss (part proportionnelle des pages partagées),
+    shared et private (pages propres au processus)
+
+    Avec des workers forkés depuis un maître qui a chargé le modèle, private est le coût
+    réel d'un worker supplémentaire. Hors Linux, seule rss est disponible.
+    """
+    try:
+        fields = {}
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+        return {
+            "rss": fields["Rss"],
+            "pss": fields["Pss"],
+            "shared": fields["Shared_Clean"] + fields["Shared_Dirty"],
+            "private": fields["Private_Clean"] + fields["Private_Dirty"],
+        }
+    except (OSError, ValueError, KeyError):
+        return {"rss": process_rss_bytes(), "pss": None, "shared": None, "private": None}
+
+
+def batch_size_bucket(batch_size: int) -> str:
+    """Retourne la tranche de taille de batch ("1", "2-8", "9-32", "33-128", "129+")"""
+    for upper, label in BATCH_SIZE_BUCKETS:
+        if batch_size <= upper:
+            return label
+    return f"{BATCH_SIZE_BUCKETS[-1][0] + 1}+"
+
+
+def _escape(value: str) -> str:
+    """Échappe une valeur d'étiquette Prometheus"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Formate les étiquettes {nom="valeur",...}"""
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Formate une valeur numérique"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base commune: nom, aide, étiquettes et verrou (mise à jour depuis plusieurs threads)"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: étiquettes attendues {self.labelnames}, reçues {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    metric_type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels):
+        """Recopie un total cumulé tenu ailleurs (ex: compteurs du cache des prédictions)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Valeur qui monte et descend (ex: requêtes en cours)"""
+
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets, somme et nombre d'observations)"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # [compte par bucket..., compte +Inf, somme]
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+
+        lines = self.header()
+        for key, state in items:
+            cumulative = 0.0
+            for upper, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(upper)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées sur /metrics"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "airparadis_requests_total", "Requêtes de prédiction par endpoint et code HTTP",
+    ["endpoint", "status"]
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "airparadis_requests_in_flight", "Requêtes de prédiction en cours", ["endpoint"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "airparadis_request_duration_seconds", "Durée totale des requêtes de prédiction", ["endpoint"]
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "airparadis_stage_duration_seconds",
+    "Durée de chaque étape de prédiction (validation, preprocessing, vectorization, tokenization, "
+    "model_forward, serialization)",
+    ["endpoint", "stage", "model_type", "batch_size"]
+)
+TOKENIZED_TEXTS_TOTAL = REGISTRY.counter(
+    "airparadis_tokenized_texts_total", "Textes tokenisés par le tokenizer BERT", ["model_type"]
+)
+TOKENS_TOTAL = REGISTRY.counter(
+    "airparadis_tokens_total",
+    "Jetons passés au modèle: réels (real) ou de remplissage (padding)",
+    ["model_type", "kind"]
+)
+
+
+def observe_stage(stage: str, seconds: float, model_type: str, batch_size: int,
+                  endpoint: Optional[str] = None):
+    """Enregistre la durée d'une étape"""
+    STAGE_SECONDS.observe(
+        seconds,
+        endpoint=endpoint or current_endpoint.get(),
+        stage=stage,
+        model_type=model_type,
+        batch_size=batch_size_bucket(batch_size)
+    )
+
+
+def observe_tokenization(model_type: str, texts: int, real_tokens: int, padded_tokens: int):
+    """
+    Enregistre un batch tokenisé: débit du tokenizer (avec la durée de l'étape
+    tokenization) et part du remplissage dans les jetons calculés par le modèle
+    """
+    TOKENIZED_TEXTS_TOTAL.inc(texts, model_type=model_type)
+    TOKENS_TOTAL.inc(real_tokens, model_type=model_type, kind="real")
+    TOKENS_TOTAL.inc(padded_tokens - real_tokens, model_type=model_type, kind="padding")
+
+
+@contextmanager
+def stage_timer(stage: str, model_type: str, batch_size: int) -> Iterator[None]:
+    """Chronomètre une étape d'inférence (endpoint lu dans le contexte courant)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, model_type, batch_size)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: requêtes en cours, compteurs par code HTTP, durée totale et
+    durée de sérialisation de la réponse
+
+    Le handler renseigne request.state.metrics_labels (model_type, batch_size) et
+    request.state.metrics_handler_done; la sérialisation est le temps écoulé entre la
+    fin du handler et le début de l'envoi de la réponse.
+    """
+
+    def __init__(self, app: ASGIApp, tracked_paths: Dict[str, str]):
+        self.app = app
+        self.tracked_paths = tracked_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        endpoint = self.tracked_paths.get(scope.get("path")) if scope["type"] == "http" else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["metrics_received_at"] = start
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                handler_done = state.get("metrics_handler_done")
+                labels = state.get("metrics_labels")
+                if handler_done is not None and labels is not None:
+                    observe_stage("serialization", time.perf_counter() - handler_done,
+                                  endpoint=endpoint, **labels)
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+            REQUESTS_TOTAL.inc(endpoint=endpoint, status=str(status_code))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
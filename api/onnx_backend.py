@@ -0,0 +1,521 @@
+"""
+Backend ONNX Runtime - Air Paradis
+
+Exporte les modèles TensorFlow (BERT, LSTM/CNN .h5) au format ONNX, avec une version
+quantifiée int8 (quantification dynamique des poids), puis les sert avec onnxruntime
+sur CPU (MODEL_TYPE=onnx). Le service n'importe ni TensorFlow ni Keras: le tokenizer
+Keras est exporté en JSON et rejoué ici.
+
+Contenu du répertoire exporté:
+    manifest.json       format, modèle source, entrées, fichiers et SHA-256
+    model.onnx          modèle float32
+    model.int8.onnx     modèle quantifié (--quantize)
+    tokenizer/          tokenizer Hugging Face (BERT)
+    tokenizer.json      vocabulaire et configuration du tokenizer Keras (LSTM/CNN)
+    drift_report.json   écart avec le modèle TensorFlow (commande drift)
+
+onnxruntime est requis pour servir le modèle (requirements.txt); tf2onnx et onnx
+uniquement pour l'export (requirements-dev.txt). La commande drift tire son échantillon
+du jeu de validation ou de test: les fichiers d'entraînement sont refusés.
+
+Usage:
+    python onnx_backend.py export bert ./models/bert_sentiment_model \\
+        --output ./models/bert_sentiment_onnx --quantize
+    python onnx_backend.py drift ./models/bert_sentiment_onnx \\
+        --sample ../data/processed/test_lemmatized.csv --size 2000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import backends
+
+FORMAT_NAME = "airparadis-onnx"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+DRIFT_REPORT_FILE = "drift_report.json"
+MODEL_FILES = {"fp32": "model.onnx", "int8": "model.int8.onnx"}
+SOURCE_TYPES = ["bert", "lstm", "cnn"]
+DEFAULT_OPSET = 17
+
+# Entrées des modèles exportés (noms imposés à l'export)
+BERT_INPUTS = ["input_ids", "attention_mask", "token_type_ids"]
+KERAS_INPUT = "sequences"
+
+# Dtypes numpy des entrées déclarées par onnxruntime
+ORT_DTYPES = {
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+    "tensor(float)": np.float32,
+    "tensor(double)": np.float64,
+}
+
+
+def is_onnx_artifact(path: str) -> bool:
+    """Indique si le chemin est un répertoire exporté par ce module"""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.isdir(path) or not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("format") == FORMAT_NAME
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Tokenizers
+# ---------------------------------------------------------------------------
+
+def keras_tokenizer_config(tokenizer) -> Dict[str, Any]:
+    """Extrait la configuration et le vocabulaire d'un keras Tokenizer"""
+    return {
+        "word_index": tokenizer.word_index,
+        "num_words": tokenizer.num_words,
+        "filters": tokenizer.filters,
+        "lower": tokenizer.lower,
+        "split": tokenizer.split,
+        "char_level": tokenizer.char_level,
+        "oov_token": tokenizer.oov_token,
+    }
+
+
+class KerasSequenceTokenizer:
+    """
+    Rejoue keras Tokenizer.texts_to_sequences puis pad_sequences(padding='post'),
+    sans TensorFlow
+
+    Comme pad_sequences, les séquences trop longues gardent leurs derniers mots.
+    """
+
+    def __init__(self, config: Dict[str, Any], input_name: str = KERAS_INPUT):
+        self.word_index: Dict[str, int] = config["word_index"]
+        self.num_words: Optional[int] = config.get("num_words")
+        self.lower: bool = config.get("lower", True)
+        self.split: str = config.get("split", " ")
+        self.char_level: bool = config.get("char_level", False)
+        self.oov_index: Optional[int] = self.word_index.get(config.get("oov_token"))
+        self.has_oov = config.get("oov_token") is not None
+        self.input_name = input_name
+        self._translate = str.maketrans({c: self.split for c in config.get("filters", "")})
+
+    def _words(self, text: str) -> Sequence[str]:
+        if self.lower:
+            text = text.lower()
+        if self.char_level:
+            return text
+        return [word for word in text.translate(self._translate).split(self.split) if word]
+
+    def texts_to_sequences(self, texts: List[str]) -> List[List[int]]:
+        sequences = []
+        for text in texts:
+            sequence = []
+            for word in self._words(text):
+                index = self.word_index.get(word)
+                if index is not None and not (self.num_words and index >= self.num_words):
+                    sequence.append(index)
+                elif self.has_oov and self.oov_index is not None:
+                    sequence.append(self.oov_index)
+            sequences.append(sequence)
+        return sequences
+
+    def encode(self, texts: List[str], max_length: int) -> Dict[str, np.ndarray]:
+        padded = np.zeros((len(texts), max_length), dtype=np.int64)
+        for row, sequence in enumerate(self.texts_to_sequences(texts)):
+            sequence = sequence[-max_length:]
+            padded[row, :len(sequence)] = sequence
+        return {self.input_name: padded}
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class OnnxModel:
+    """
+    Session onnxruntime (CPU) d'un modèle exporté
+
+    Args:
+        session: onnxruntime.InferenceSession
+        source_type: Modèle d'origine (bert, lstm, cnn)
+        precision: fp32 ou int8
+    """
+
+    def __init__(self, session, source_type: str, precision: str):
+        self.session = session
+        self.source_type = source_type
+        self.precision = precision
+        self.inputs = {
+            node.name: ORT_DTYPES.get(node.type, np.float32) for node in session.get_inputs()
+        }
+        self.output_name = session.get_outputs()[0].name
+
+    def run(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Passe forward: logits (BERT) ou sorties du modèle Keras (sigmoïde ou softmax)
+
+        Raises:
+            KeyError: Si une entrée du modèle manque
+        """
+        feeds = {name: np.asarray(features[name], dtype=dtype) for name, dtype in self.inputs.items()}
+        return self.session.run([self.output_name], feeds)[0]
+
+
+def read_manifest(artifact_dir: str) -> Dict[str, Any]:
+    """
+    Lit et valide le manifeste
+
+    Raises:
+        ValueError: Si le format ou sa version ne sont pas supportés
+    """
+    with open(os.path.join(artifact_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"Format non reconnu: {manifest.get('format')}")
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Version de format non supportée: {manifest.get('format_version')} (attendu: {FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def select_precision(manifest: Dict[str, Any], precision: str = "int8") -> str:
+    """Précision servie: celle demandée si elle a été exportée, sinon fp32"""
+    if precision not in MODEL_FILES:
+        raise ValueError(f"Précision non supportée: {precision} (disponibles: {sorted(MODEL_FILES)})")
+    return precision if MODEL_FILES[precision] in manifest["files"] else "fp32"
+
+
+def load_tokenizer(artifact_dir: str, manifest: Dict[str, Any]):
+    """
+    Charge le tokenizer du modèle exporté: tokenizer rapide Transformers pour BERT
+    (remplissage par tranches de longueur dans app.py), JSON pour Keras
+    """
+    if manifest["source_type"] == "bert":
+        hf = backends.transformers()
+        return hf.BertTokenizerFast.from_pretrained(os.path.join(artifact_dir, "tokenizer"))
+
+    with open(os.path.join(artifact_dir, "tokenizer.json"), "r", encoding="utf-8") as f:
+        return KerasSequenceTokenizer(json.load(f))
+
+
+def load_onnx_model(artifact_dir: str, precision: str = "int8", threads: int = 0):
+    """
+    Charge un modèle exporté dans une session onnxruntime
+
+    Args:
+        precision: int8 (si exporté) ou fp32
+        threads: Threads intra-opération (0 = nombre de coeurs)
+
+    Returns:
+        (OnnxModel, tokenizer, manifest)
+
+    Raises:
+        ImportError: Si onnxruntime n'est pas installé
+        ValueError: Si le format est invalide
+    """
+    ort = backends.onnxruntime()
+    manifest = read_manifest(artifact_dir)
+    precision = select_precision(manifest, precision)
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+
+    session = ort.InferenceSession(
+        os.path.join(artifact_dir, MODEL_FILES[precision]),
+        sess_options=options,
+        providers=["CPUExecutionProvider"]
+    )
+    model = OnnxModel(session, manifest["source_type"], precision)
+    return model, load_tokenizer(artifact_dir, manifest), manifest
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def quantize_model(input_path: str, output_path: str):
+    """Quantification dynamique int8 des poids (activations quantifiées à l'exécution)"""
+    backends.onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(input_path, output_path, weight_type=QuantType.QInt8)
+
+
+def _convert_function(forward: Callable, input_signature, output_path: str, opset: int):
+    """
+    Convertit la passe forward avec tf2onnx
+
+    from_function plutôt que from_keras, qui ne gère pas les noms de sorties de Keras 3.
+    """
+    tf = backends.tensorflow()
+    tf2onnx = backends.import_backend("tf2onnx")
+    tf2onnx.convert.from_function(
+        tf.function(forward), input_signature=input_signature, opset=opset, output_path=output_path
+    )
+
+
+def export_onnx_model(source_type: str, model_path: str, output_dir: str,
+                      quantize: bool = False, max_length: int = 128,
+                      opset: int = DEFAULT_OPSET) -> Dict[str, Any]:
+    """
+    Exporte un modèle TensorFlow au format ONNX
+
+    Le manifeste est écrit en dernier: un répertoire sans manifeste est incomplet.
+
+    Args:
+        source_type: bert (répertoire Hugging Face) ou lstm/cnn (.h5 + _tokenizer.pkl)
+        quantize: Exporte aussi model.int8.onnx
+        max_length: Longueur des séquences Keras (entrée de taille fixe)
+
+    Raises:
+        ImportError: Si TensorFlow, tf2onnx ou onnxruntime ne sont pas installés
+        ValueError: Si le type de modèle n'est pas supporté
+    """
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f"Type de modèle non supporté: {source_type} (disponibles: {SOURCE_TYPES})")
+
+    tf = backends.tensorflow()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    fp32_path = os.path.join(output_dir, MODEL_FILES["fp32"])
+    sources = [model_path]
+    if source_type == "bert":
+        hf = backends.transformers()
+        model = hf.TFBertForSequenceClassification.from_pretrained(model_path)
+        hf.BertTokenizerFast.from_pretrained(model_path).save_pretrained(os.path.join(output_dir, "tokenizer"))
+        signature = [tf.TensorSpec((None, None), tf.int32, name=name) for name in BERT_INPUTS]
+
+        def forward(input_ids, attention_mask, token_type_ids):
+            return model(input_ids=input_ids, attention_mask=attention_mask,
+                         token_type_ids=token_type_ids, training=False).logits
+
+        output = "logits"
+    else:
+        import joblib
+
+        model = tf.keras.models.load_model(model_path)
+        tokenizer_path = model_path.replace('.h5', '_tokenizer.pkl')
+        with open(os.path.join(output_dir, "tokenizer.json"), "w", encoding="utf-8") as f:
+            json.dump(keras_tokenizer_config(joblib.load(tokenizer_path)), f, ensure_ascii=False)
+        sources.append(tokenizer_path)
+        signature = [tf.TensorSpec((None, max_length), tf.float32, name=KERAS_INPUT)]
+
+        def forward(sequences):
+            return model(sequences, training=False)
+
+        output = "probabilities"
+
+    _convert_function(forward, signature, fp32_path, opset)
+    if quantize:
+        quantize_model(fp32_path, os.path.join(output_dir, MODEL_FILES["int8"]))
+
+    files = {
+        name: _file_sha256(os.path.join(output_dir, name))
+        for name in MODEL_FILES.values() if os.path.exists(os.path.join(output_dir, name))
+    }
+    manifest = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "source_type": source_type,
+        "source_path": model_path,
+        "source_version": hashlib.sha256(
+            "".join(_file_sha256(p) for p in sources if os.path.isfile(p)).encode("utf-8")
+        ).hexdigest()[:12],
+        "opset": opset,
+        "max_length": max_length,
+        "output": output,
+        "files": files,
+    }
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Rapport d'écart avec TensorFlow
+# ---------------------------------------------------------------------------
+
+def drift_report(reference: np.ndarray, candidate: np.ndarray,
+                 labels: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Compare les probabilités [négatif, positif] de deux modèles sur le même échantillon
+
+    Args:
+        reference: Probabilités du modèle TensorFlow
+        candidate: Probabilités du modèle ONNX
+        labels: Sentiments réels (0/1), pour comparer les exactitudes
+
+    Returns:
+        Taux d'accord des classes, écarts de probabilité positive, exactitudes
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    if reference.shape != candidate.shape:
+        raise ValueError(f"Dimensions différentes: {reference.shape} et {candidate.shape}")
+
+    reference_classes = reference.argmax(axis=1)
+    candidate_classes = candidate.argmax(axis=1)
+    diff = np.abs(reference[:, 1] - candidate[:, 1])
+
+    report = {
+        "samples": len(reference),
+        "agreement": float(np.mean(reference_classes == candidate_classes)),
+        "flipped": int(np.sum(reference_classes != candidate_classes)),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "p99_abs_diff": float(np.percentile(diff, 99)) if len(diff) else 0.0,
+    }
+    if labels is not None:
+        labels = np.asarray(labels)
+        report["reference_accuracy"] = float(np.mean(reference_classes == labels))
+        report["candidate_accuracy"] = float(np.mean(candidate_classes == labels))
+        report["accuracy_delta"] = report["candidate_accuracy"] - report["reference_accuracy"]
+    return report
+
+
+def _time_predictions(predict: Callable[[List[str]], List[tuple]], texts: List[str],
+                      batch_size: int) -> tuple:
+    """Prédit l'échantillon par batchs; retourne (probabilités, secondes)"""
+    # Premier appel hors chronométrage (traçage du graphe TensorFlow, allocations)
+    predict(texts[:batch_size])
+
+    start = time.perf_counter()
+    probabilities = []
+    for i in range(0, len(texts), batch_size):
+        probabilities.extend(
+            [p["negative"], p["positive"]] for _, _, p in predict(texts[i:i + batch_size])
+        )
+    return np.array(probabilities), time.perf_counter() - start
+
+
+def run_drift_report(artifact_dir: str, sample_path: str, size: int = 2000,
+                     reference_path: Optional[str] = None, batch_size: int = 32,
+                     seed: int = 42, tolerance: float = 0.01) -> Dict[str, Any]:
+    """
+    Compare le modèle exporté (chaque précision) au modèle TensorFlow d'origine sur un
+    échantillon de tweets étiquetés hors entraînement (val_*.csv, test_*.csv), et écrit
+    drift_report.json
+
+    Le modèle est accepté si la baisse d'exactitude ne dépasse pas la tolérance.
+
+    Raises:
+        ValueError: Si l'échantillon est un fichier d'entraînement, n'a pas de colonne
+            sentiment, ou si le prétraitement est impossible
+    """
+    import app as api
+    from score_csv import load_labeled_sample, require_held_out
+
+    require_held_out(sample_path)
+    if not api.preprocessing_ready():
+        raise ValueError(f"Prétraitement {api.TEXT_PREPROCESSING} impossible: {api.preprocessing_error}")
+    manifest = read_manifest(artifact_dir)
+    texts, labels = load_labeled_sample(sample_path, size, seed)
+
+    reference_bundle = api.build_bundle(manifest["source_type"], reference_path or manifest["source_path"])
+    reference, reference_seconds = _time_predictions(
+        lambda batch: api.predict_with_bundle(batch, reference_bundle), texts, batch_size
+    )
+
+    result = {
+        "created_at": datetime.now().isoformat(),
+        "sample": {"path": sample_path, "size": len(texts), "seed": seed},
+        "source_type": manifest["source_type"],
+        "tolerance": tolerance,
+        "reference_ms_per_tweet": round(1000 * reference_seconds / max(len(texts), 1), 3),
+        "precisions": {},
+    }
+    for precision, file_name in MODEL_FILES.items():
+        if file_name not in manifest["files"]:
+            continue
+        bundle = api.build_onnx_bundle(artifact_dir, precision=precision)
+        candidate, seconds = _time_predictions(
+            lambda batch: api.predict_with_bundle(batch, bundle), texts, batch_size
+        )
+        report = drift_report(reference, candidate, labels)
+        report["ms_per_tweet"] = round(1000 * seconds / max(len(texts), 1), 3)
+        report["speedup"] = round(reference_seconds / seconds, 2) if seconds else None
+        report["accepted"] = -report["accuracy_delta"] <= tolerance
+        result["precisions"][precision] = report
+
+    with open(os.path.join(artifact_dir, DRIFT_REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export ONNX et rapport d'écart avec TensorFlow")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Exporte un modèle TensorFlow en ONNX")
+    export_parser.add_argument("source_type", choices=SOURCE_TYPES)
+    export_parser.add_argument("model_path", help="Répertoire BERT ou fichier .h5")
+    export_parser.add_argument("--output", required=True, help="Répertoire de sortie")
+    export_parser.add_argument("--quantize", action="store_true", help="Exporte aussi la version int8")
+    export_parser.add_argument("--opset", type=int, default=DEFAULT_OPSET)
+
+    drift_parser = subparsers.add_parser("drift", help="Compare le modèle ONNX au modèle TensorFlow")
+    drift_parser.add_argument("artifact_dir")
+    drift_parser.add_argument("--sample", required=True, help="CSV étiqueté hors entraînement (val_*.csv, test_*.csv)")
+    drift_parser.add_argument("--size", type=int, default=2000, help="Nombre de tweets tirés")
+    drift_parser.add_argument("--reference-path", help="Modèle TensorFlow (défaut: source de l'export)")
+    drift_parser.add_argument("--batch-size", type=int, default=32)
+    drift_parser.add_argument("--tolerance", type=float, default=0.01,
+                              help="Baisse d'exactitude acceptée (0.01 = 1 point)")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            manifest = export_onnx_model(
+                args.source_type, args.model_path, args.output,
+                quantize=args.quantize, opset=args.opset
+            )
+            sizes = ", ".join(
+                f"{name} {os.path.getsize(os.path.join(args.output, name)) / (1024 * 1024):.1f} Mo"
+                for name in manifest["files"]
+            )
+            print(f"Export {args.source_type} -> {args.output}: {sizes}")
+            return 0
+
+        result = run_drift_report(
+            args.artifact_dir, args.sample, size=args.size, reference_path=args.reference_path,
+            batch_size=args.batch_size, tolerance=args.tolerance
+        )
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(f"TensorFlow: {result['reference_ms_per_tweet']} ms/tweet")
+    for precision, report in result["precisions"].items():
+        print(
+            f"{precision}: {report['ms_per_tweet']} ms/tweet (x{report['speedup']}), "
+            f"accord {report['agreement']:.2%}, exactitude {report['candidate_accuracy']:.2%} "
+            f"({report['accuracy_delta']:+.2%}), {'accepté' if report['accepted'] else 'refusé'}"
+        )
+    return 0 if all(report["accepted"] for report in result["precisions"].values()) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Prétraitement parallèle du corpus Sentiment140 - Air Paradis
+
+Nettoie les 1,6 million de tweets de training.1600000.processed.noemoticon.csv
+(latin-1, sans en-tête, colonnes sentiment/id/date/query/user/text) avec le module
+partagé avec l'API (preprocessing.py), en version lemmatisée et racinisée.
+
+Le fichier est lu par paquets, chaque paquet est nettoyé dans un pool de processus
+(chaque processus garde son propre cache des tokens, qui se remplit au fil des
+paquets) et écrit en Parquet partitionné par variante:
+
+    data/processed/tweets/
+        variant=lemmatized/part-00000.parquet
+        variant=stemmed/part-00000.parquet
+        _checkpoint.json
+
+Colonnes: id (int64), sentiment (Int8, 0 = négatif, 1 = positif), text (tweet
+brut) et text_clean (tweet nettoyé). Toutes les lignes sont gardées: la suppression des
+doublons, des textes vides ou trop courts et le découpage train/validation/test restent
+dans notebooks/02_preprocessing.ipynb. Un checkpoint permet de reprendre après une
+interruption sans retraiter les paquets terminés.
+
+Le débit (tweets/seconde) est mesuré par étape: lecture du CSV, nettoyage de chaque
+variante et écriture (débit par coeur), ainsi que le débit global.
+
+Usage:
+    python preprocess_corpus.py ../data/training.1600000.processed.noemoticon.csv \\
+        --output ../data/processed/tweets --workers 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Optional, Sequence
+
+import pandas as pd
+
+from dataset_cache import SENTIMENT140_COLUMNS, SENTIMENT_MAPPING
+from preprocessing import DEFAULT_CACHE_SIZE, TweetPreprocessor
+
+logger = logging.getLogger("preprocess_corpus")
+
+# Variante -> racinisation (sinon lemmatisation)
+VARIANTS = {"lemmatized": False, "stemmed": True}
+CHECKPOINT_FILE = "_checkpoint.json"
+
+# Prétraitements du processus courant (un cache des tokens par processus)
+_preprocessors: Dict[str, TweetPreprocessor] = {}
+
+
+def init_worker(variants: Sequence[str], cache_size: Optional[int] = DEFAULT_CACHE_SIZE):
+    """Initialise un processus du pool: un TweetPreprocessor par variante"""
+    _preprocessors.clear()
+    for variant in variants:
+        _preprocessors[variant] = TweetPreprocessor(use_stemming=VARIANTS[variant], cache_size=cache_size)
+
+
+def part_path(output_dir: str, variant: str, index: int) -> str:
+    """Chemin du fichier Parquet d'un paquet pour une variante"""
+    return os.path.join(output_dir, f"variant={variant}", f"part-{index:05d}.parquet")
+
+
+def process_chunk(index: int, chunk: pd.DataFrame, output_dir: str) -> Dict[str, Any]:
+    """
+    Nettoie un paquet de tweets dans chaque variante et écrit un fichier par variante
+
+    Exécuté dans un processus du pool (ou dans le processus principal si workers=0).
+
+    Returns:
+        Index, nombre de lignes et durée de chaque étape (secondes)
+    """
+    texts = chunk["text"].fillna("").astype(str).tolist()
+    ids = chunk["id"].astype("int64").values
+    sentiments = chunk["sentiment"].map(SENTIMENT_MAPPING).astype("Int8").values
+
+    seconds: Dict[str, float] = {"write": 0.0}
+    for variant, preprocessor in _preprocessors.items():
+        start = time.perf_counter()
+        cleaned = preprocessor.clean_batch(texts)
+        seconds[variant] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = pd.DataFrame({"id": ids, "sentiment": sentiments, "text": texts, "text_clean": cleaned})
+        # Écriture atomique: un paquet présent sur disque est forcément complet
+        path = part_path(output_dir, variant, index)
+        result.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        seconds["write"] += time.perf_counter() - start
+
+    return {"index": index, "rows": len(texts), "seconds": seconds}
+
+
+def _load_checkpoint(output_dir: str, params: Dict[str, Any], resume: bool) -> set:
+    """Charge la liste des paquets terminés (vérifie que les paramètres n'ont pas changé)"""
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not resume or not os.path.exists(path):
+        return set()
+
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("params") != params:
+        raise ValueError(
+            f"Checkpoint incompatible ({path}): paramètres différents, "
+            "relancer avec --no-resume ou changer de répertoire de sortie"
+        )
+
+    return {
+        index for index in checkpoint.get("done", [])
+        if all(os.path.exists(part_path(output_dir, variant, index)) for variant in params["variants"])
+    }
+
+
+def _clear_parts(output_dir: str):
+    """Supprime les paquets d'une exécution précédente (toutes variantes confondues)"""
+    for variant in VARIANTS:
+        variant_dir = os.path.join(output_dir, f"variant={variant}")
+        if not os.path.isdir(variant_dir):
+            continue
+        for name in os.listdir(variant_dir):
+            if name.startswith("part-") and (name.endswith(".parquet") or name.endswith(".parquet.tmp")):
+                os.remove(os.path.join(variant_dir, name))
+
+
+def _save_checkpoint(output_dir: str, params: Dict[str, Any], done: set):
+    """Enregistre atomiquement la liste des paquets terminés"""
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"params": params, "done": sorted(done)}, f)
+    os.replace(path + ".tmp", path)
+
+
+def stage_throughput(rows: int, seconds: Dict[str, float]) -> Dict[str, float]:
+    """Débit de chaque étape en tweets/seconde (durées cumulées sur tous les processus)"""
+    return {stage: round(rows / total, 1) if total > 0 else 0.0 for stage, total in seconds.items()}
+
+
+def preprocess_file(input_path: str, output_dir: str, variants: Sequence[str] = tuple(VARIANTS),
+                    chunk_size: int = 100000, workers: Optional[int] = None, resume: bool = True,
+                    cache_size: Optional[int] = DEFAULT_CACHE_SIZE) -> Dict[str, Any]:
+    """
+    Nettoie un fichier Sentiment140 par paquets dans un pool de processus
+
+    Sans reprise (resume=False ou aucun paquet terminé), les fichiers part-*.parquet
+    déjà présents dans le répertoire de sortie sont supprimés.
+
+    Args:
+        variants: Variantes à produire (lemmatized, stemmed)
+        workers: Nombre de processus (défaut: tous les coeurs, 0 = processus courant)
+        cache_size: Taille du cache des tokens de chaque processus
+
+    Returns:
+        Résumé (lignes traitées, paquets, durée, débit global et par étape)
+
+    Raises:
+        ValueError: Si une variante est inconnue ou le checkpoint incompatible
+        ImportError, LookupError: Si nltk ou ses corpus manquent
+    """
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        raise ValueError(f"Variantes inconnues: {sorted(unknown)} (disponibles: {list(VARIANTS)})")
+    variants = [variant for variant in VARIANTS if variant in variants]
+
+    for variant in variants:
+        os.makedirs(os.path.join(output_dir, f"variant={variant}"), exist_ok=True)
+    params = {
+        "input": os.path.abspath(input_path),
+        "input_size": os.path.getsize(input_path),
+        "chunk_size": chunk_size,
+        "variants": variants,
+    }
+    done = _load_checkpoint(output_dir, params, resume)
+    if done:
+        logger.info(f"Reprise: {len(done)} paquets déjà traités")
+    else:
+        # Nouveau départ: les paquets d'une exécution précédente (autre taille de paquet,
+        # autre fichier) ne doivent pas se mêler aux nouveaux
+        _clear_parts(output_dir)
+
+    # Vérifie nltk et ses corpus avant de lancer le pool (utilisé tel quel si workers=0)
+    init_worker(variants, cache_size)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    reader = pd.read_csv(
+        input_path,
+        encoding="latin-1",
+        header=None,
+        names=SENTIMENT140_COLUMNS,
+        usecols=["sentiment", "id", "text"],
+        chunksize=chunk_size
+    )
+
+    start = time.perf_counter()
+    rows = 0
+    processed_chunks = 0
+    seconds = {"read": 0.0, **{variant: 0.0 for variant in variants}, "write": 0.0}
+
+    def chunks():
+        # Chronomètre la lecture (analyse du CSV dans le processus principal)
+        iterator = enumerate(reader)
+        while True:
+            read_start = time.perf_counter()
+            item = next(iterator, None)
+            seconds["read"] += time.perf_counter() - read_start
+            if item is None:
+                return
+            yield item
+
+    def record(result: Dict[str, Any]):
+        nonlocal rows, processed_chunks
+        done.add(result["index"])
+        _save_checkpoint(output_dir, params, done)
+        rows += result["rows"]
+        processed_chunks += 1
+        for stage, stage_seconds in result["seconds"].items():
+            seconds[stage] += stage_seconds
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Paquet {result['index']}: {result['rows']} tweets "
+            f"(cumul {rows} tweets, {rows / elapsed:,.0f} tweets/s)"
+        )
+
+    if workers == 0:
+        for index, chunk in chunks():
+            if index not in done:
+                record(process_chunk(index, chunk, output_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(variants, cache_size)) as pool:
+            pending = set()
+            for index, chunk in chunks():
+                if index in done:
+                    continue
+                # Nombre de paquets en vol borné pour garder une mémoire constante
+                if len(pending) >= 2 * workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(future.result())
+                pending.add(pool.submit(process_chunk, index, chunk, output_dir))
+
+            for future in pending:
+                record(future.result())
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": rows,
+        "chunks": processed_chunks,
+        "skipped_chunks": len(done) - processed_chunks,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "tweets_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        "stage_tweets_per_second": stage_throughput(rows, seconds),
+        "output_dir": output_dir,
+    }
+    logger.info(
+        f"Prétraitement terminé: {rows} tweets en {elapsed:.1f}s "
+        f"({summary['tweets_per_second']:,.0f} tweets/s)"
+    )
+    return summary
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Prétraitement parallèle d'un fichier Sentiment140")
+    parser.add_argument("input", help="Fichier CSV au format Sentiment140")
+    parser.add_argument("--output", required=True, help="Répertoire Parquet (partitionné par variante)")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Variantes, séparées par des virgules")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Tweets par paquet")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut: tous les coeurs)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Tokens mémorisés par processus et par variante")
+    parser.add_argument("--no-resume", action="store_true", help="Ignorer le checkpoint existant")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = preprocess_file(
+            args.input, args.output,
+            variants=[variant.strip() for variant in args.variants.split(",") if variant.strip()],
+            chunk_size=args.chunk_size, workers=args.workers, resume=not args.no_resume,
+            cache_size=args.cache_size
+        )
+    except LookupError:
+        logger.error("Corpus NLTK manquants: python -m nltk.downloader stopwords wordnet omw-1.4")
+        return 1
+    except (ImportError, OSError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    print(pd.DataFrame([
+        {"stage": stage, "tweets/s": throughput}
+        for stage, throughput in summary["stage_tweets_per_second"].items()
+    ]).to_string(index=False))
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Prétraitement des tweets - Air Paradis
+
+Nettoyage utilisé à l'entraînement (notebooks/02_preprocessing.ipynb) et au service
+(app.py): les modèles ont été entraînés sur des textes lemmatisés, l'API doit leur
+présenter les tweets sous la même forme.
+
+Étapes (identiques à la fonction clean_tweet d'origine du notebook):
+1. Minuscules
+2. Suppression des URLs, mentions (@user), dièses (#) et RT
+3. Remplacement des caractères non alphabétiques par des espaces
+4. Tokenisation ([A-Za-z']+)
+5. Suppression des stopwords anglais (optionnel)
+6. Filtrage des tokens de 2 caractères ou moins (ou sans lettre)
+7. Lemmatisation (WordNet) ou racinisation (Snowball)
+
+nltk (dont l'import charge scipy et pandas) n'est importé qu'à la construction d'un
+TweetPreprocessor sans stopwords ni normaliseur fournis. Les expressions régulières
+sont compilées une fois. Les étapes 5 à 7 ne dépendent que
+du token: leur résultat est mémorisé dans un cache borné (LRU), si bien qu'en régime
+établi un token coûte une recherche dans un dictionnaire. clean_batch applique les
+substitutions en une passe sur le batch entier.
+
+Usage:
+    from preprocessing import clean_tweet, TweetPreprocessor
+
+    clean_tweet("@user I love this flight! http://t.co/x")  # "love flight"
+    TweetPreprocessor(use_stemming=True).clean_batch(tweets)
+"""
+
+import functools
+import importlib
+import re
+from typing import Callable, Iterable, List, Optional, Sequence
+
+PREPROCESSING_MODES = ["lemmatize", "stem", "none"]
+DEFAULT_CACHE_SIZE = 100_000
+
+# Motif du RegexpTokenizer du notebook (apostrophes gardées pour les contractions)
+TOKEN_PATTERN = re.compile(r"[A-Za-z']+")
+
+_URL_PATTERN = re.compile(r"http\S+|www\S+|https\S+")
+_MENTION_PATTERN = re.compile(r"@\w+")
+_RETWEET_PATTERN = re.compile(r"\brt\b")
+_NON_ALPHA_PATTERN = re.compile(r"[^a-z\s']+")
+
+
+def _import_nltk(module_name: str, resource: str):
+    # Import différé: seuls des stopwords et un normaliseur fournis explicitement
+    # sont utilisables sans nltk
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"nltk est requis pour {resource} (pip install nltk)") from e
+
+
+def load_stopwords() -> frozenset:
+    """
+    Stopwords anglais de NLTK
+
+    Raises:
+        ImportError: Si nltk n'est pas installé
+        LookupError: Si le corpus stopwords n'est pas téléchargé
+    """
+    corpus = _import_nltk("nltk.corpus", "les stopwords")
+    return frozenset(corpus.stopwords.words("english"))
+
+
+def load_normalizer(use_stemming: bool) -> Callable[[str], str]:
+    """
+    Lemmatiseur WordNet ou racinisateur Snowball
+
+    Raises:
+        ImportError: Si nltk n'est pas installé
+        LookupError: Si le corpus wordnet n'est pas téléchargé (lemmatisation)
+    """
+    if use_stemming:
+        snowball = _import_nltk("nltk.stem.snowball", "la racinisation")
+        return snowball.SnowballStemmer("english").stem
+
+    stem = _import_nltk("nltk.stem", "la lemmatisation")
+    # Vérifie la présence du corpus sans le charger (chargé au premier token)
+    _import_nltk("nltk.data", "la lemmatisation").find("corpora/wordnet")
+    return stem.WordNetLemmatizer().lemmatize
+
+
+class TweetPreprocessor:
+    """
+    Nettoyage des tweets avec cache des tokens normalisés
+
+    Args:
+        use_stemming: Racinisation Snowball au lieu de la lemmatisation WordNet
+        remove_stopwords: Supprime les stopwords anglais
+        cache_size: Nombre maximal de tokens distincts mémorisés (None: illimité)
+        stopwords: Stopwords à utiliser (défaut: NLTK)
+        normalizer: Fonction token -> forme normalisée (défaut: NLTK)
+    """
+
+    def __init__(self, use_stemming: bool = False, remove_stopwords: bool = True,
+                 cache_size: Optional[int] = DEFAULT_CACHE_SIZE,
+                 stopwords: Optional[Iterable[str]] = None,
+                 normalizer: Optional[Callable[[str], str]] = None):
+        self.use_stemming = use_stemming
+        self.remove_stopwords = remove_stopwords
+        if not remove_stopwords:
+            self.stopwords = frozenset()
+        else:
+            self.stopwords = frozenset(stopwords) if stopwords is not None else load_stopwords()
+        self._normalizer = normalizer or load_normalizer(use_stemming)
+        self._normalize_token = functools.lru_cache(maxsize=cache_size)(self._normalize_token_uncached)
+
+    @property
+    def mode(self) -> str:
+        return "stem" if self.use_stemming else "lemmatize"
+
+    def _normalize_token_uncached(self, token: str) -> Optional[str]:
+        # None: token supprimé (stopword, trop court ou sans lettre)
+        if token in self.stopwords:
+            return None
+        if len(token) <= 2 or not any(c.isalpha() for c in token):
+            return None
+        return self._normalizer(token)
+
+    def _clean_substituted(self, text: str) -> str:
+        normalize = self._normalize_token
+        tokens = [normalize(token) for token in TOKEN_PATTERN.findall(text)]
+        return " ".join([token for token in tokens if token is not None])
+
+    def clean(self, text) -> str:
+        """Nettoie un tweet (chaîne vide si le texte n'est pas une chaîne)"""
+        if not isinstance(text, str):
+            return ""
+        return self._clean_substituted(_substitute(text.lower()))
+
+    def clean_batch(self, texts: Sequence) -> List[str]:
+        """
+        Nettoie une liste de tweets, dans l'ordre
+
+        Les substitutions sont faites une seule fois sur les tweets joints par des sauts de
+        ligne: les sauts de ligne internes, simples séparateurs de tokens, sont d'abord
+        remplacés par des espaces.
+        """
+        if not texts:
+            return []
+        valid = [isinstance(text, str) for text in texts]
+        joined = "\n".join([_single_line(text) if ok else "" for text, ok in zip(texts, valid)])
+        lines = _substitute(joined.lower()).split("\n")
+        clean = self._clean_substituted
+        return [clean(line) if ok else "" for line, ok in zip(lines, valid)]
+
+    def cache_info(self):
+        """Statistiques du cache des tokens (hits, misses, maxsize, currsize)"""
+        return self._normalize_token.cache_info()
+
+
+def _single_line(text: str) -> str:
+    if "\n" in text or "\r" in text:
+        return text.replace("\n", " ").replace("\r", " ")
+    return text
+
+
+def _substitute(text: str) -> str:
+    # Même ordre que le notebook: chaque motif s'applique au résultat du précédent
+    text = _URL_PATTERN.sub("", text)
+    text = _MENTION_PATTERN.sub("", text)
+    text = text.replace("#", "")
+    text = _RETWEET_PATTERN.sub("", text)
+    return _NON_ALPHA_PATTERN.sub(" ", text)
+
+
+def build_preprocessor(mode: str, cache_size: Optional[int] = DEFAULT_CACHE_SIZE) -> Optional[TweetPreprocessor]:
+    """
+    Prétraitement correspondant à un mode (lemmatize, stem ou none)
+
+    Returns:
+        TweetPreprocessor, ou None pour none (textes bruts)
+
+    Raises:
+        ValueError: Si le mode est inconnu
+        ImportError, LookupError: Si nltk ou ses corpus manquent
+    """
+    if mode not in PREPROCESSING_MODES:
+        raise ValueError(f"Prétraitement inconnu: {mode} (disponibles: {PREPROCESSING_MODES})")
+    if mode == "none":
+        return None
+    return TweetPreprocessor(use_stemming=mode == "stem", cache_size=cache_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_preprocessor(use_stemming: bool, remove_stopwords: bool) -> TweetPreprocessor:
+    return TweetPreprocessor(use_stemming=use_stemming, remove_stopwords=remove_stopwords)
+
+
+def clean_tweet(text, use_stemming: bool = False, remove_stopwords: bool = True) -> str:
+    """
+    Nettoyage complet d'un tweet (signature de la fonction d'origine du notebook)
+
+    Returns:
+        Tokens nettoyés et lemmatisés (ou racinisés), séparés par des espaces
+    """
+    return _shared_preprocessor(use_stemming, remove_stopwords).clean(text)
+
+
+def tokenize_text(text) -> List[str]:
+    """Tokenise un texte en mots individuels (minuscules)"""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
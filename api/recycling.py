@@ -0,0 +1,80 @@
+"""
+Recyclage des workers - Air Paradis
+
+Sous gunicorn (gunicorn.conf.py), un worker dont la mémoire propre dépasse un seuil
+s'arrête proprement (SIGTERM): il termine ses requêtes en cours et le processus maître
+le remplace par un worker neuf, forké depuis le modèle préchargé.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+from typing import Callable, Optional
+
+from metrics import process_memory
+
+logger = logging.getLogger(__name__)
+
+
+def worker_memory_bytes() -> int:
+    """Mémoire propre au worker (private), ou RSS si elle n'est pas disponible"""
+    memory = process_memory()
+    return memory["private"] if memory["private"] is not None else memory["rss"]
+
+
+class MemoryWatchdog:
+    """
+    Arrête le worker quand sa mémoire dépasse le seuil
+
+    Args:
+        limit_bytes: Seuil de mémoire
+        interval: Période de vérification en secondes
+        measure: Fonction de mesure de la mémoire (octets)
+    """
+
+    def __init__(self, limit_bytes: int, interval: float = 15.0,
+                 measure: Callable[[], int] = worker_memory_bytes):
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.measure = measure
+
+        self.triggered = False
+        self._task: Optional[asyncio.Task] = None
+
+    def check(self) -> bool:
+        """
+        Vérifie la mémoire et demande l'arrêt du worker si le seuil est dépassé
+
+        Returns:
+            True si l'arrêt a été demandé
+        """
+        if self.triggered:
+            return False
+
+        used = self.measure()
+        if used <= self.limit_bytes:
+            return False
+
+        self.triggered = True
+        logger.warning(
+            f"Worker {os.getpid()}: mémoire {used / (1024 * 1024):.0f} Mo > "
+            f"{self.limit_bytes / (1024 * 1024):.0f} Mo, recyclage"
+        )
+        os.kill(os.getpid(), signal.SIGTERM)
+        return True
+
+    async def _run(self):
+        while not self.triggered:
+            await asyncio.sleep(self.interval)
+            self.check()
+
+    def start(self):
+        """Démarre la surveillance dans la boucle d'événements courante"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """Arrête la surveillance"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,186 @@
+"""
+Registre multi-modèles - Air Paradis
+
+Permet de servir plusieurs modèles (logistic, lstm, cnn, bert) dans le même processus.
+Le modèle par défaut (MODEL_TYPE) reste chargé en permanence; les autres sont chargés
+au premier appel (paramètre ?model=...) puis évincés du moins récemment utilisé au plus
+récent lorsque le budget mémoire est dépassé.
+
+La taille d'un modèle est estimée à partir de la taille de ses artefacts sur disque.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelUnavailableError(RuntimeError):
+    """Le modèle demandé n'a pas pu être chargé"""
+
+
+def artifact_size(paths: Iterable[str]) -> int:
+    """Taille totale en octets des artefacts (les répertoires sont parcourus)"""
+    total = 0
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                total += sum(os.path.getsize(os.path.join(root, name)) for name in names)
+        elif os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+class ModelBundle:
+    """
+    Artefacts d'un modèle chargé (modèle, tokenizer ou vectorizer, scoreur compilé)
+
+    Args:
+        model_type: bert, lstm, cnn ou logistic
+        model_path: Chemin du modèle
+        version: Empreinte des artefacts (clé du cache des prédictions)
+        size_bytes: Taille estimée en mémoire
+        artifacts: Fichiers chargés (surveillés pour le rechargement à chaud)
+    """
+
+    def __init__(self, model_type: str, model_path: str, model: Any, tokenizer: Any = None,
+                 vectorizer: Any = None, logistic_scorer: Any = None,
+                 version: Optional[str] = None, size_bytes: int = 0,
+                 artifacts: Optional[List[str]] = None):
+        self.model_type = model_type
+        self.model_path = model_path
+        self.model = model
+        self.tokenizer = tokenizer
+        self.vectorizer = vectorizer
+        self.logistic_scorer = logistic_scorer
+        self.version = version
+        self.size_bytes = size_bytes
+        self.artifacts = artifacts or [model_path]
+
+    def describe(self) -> Dict[str, Any]:
+        """Description du modèle pour /models"""
+        return {
+            "model_type": self.model_type,
+            "model_path": self.model_path,
+            "version": self.version,
+            "size_mb": round(self.size_bytes / (1024 * 1024), 2),
+        }
+
+
+class ModelRegistry:
+    """
+    Modèles chargés à la demande, évincés selon un budget mémoire (LRU)
+
+    Un modèle évincé pendant une prédiction reste utilisable par celle-ci: il est
+    libéré quand plus aucune requête n'en détient de référence.
+
+    Args:
+        loader: Fonction (model_type, model_path) -> ModelBundle
+        model_paths: Chemin des artefacts par type de modèle
+        memory_budget_bytes: Budget mémoire total, modèle par défaut compris (0 = illimité)
+    """
+
+    def __init__(self, loader: Callable[[str, str], ModelBundle], model_paths: Dict[str, str],
+                 memory_budget_bytes: int = 0):
+        self.loader = loader
+        self.model_paths = model_paths
+        self.memory_budget_bytes = memory_budget_bytes
+        # Taille du modèle par défaut, toujours résident et jamais évincé
+        self.pinned_bytes = 0
+
+        self._entries: "OrderedDict[str, ModelBundle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in model_paths}
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, name: str) -> ModelBundle:
+        """
+        Retourne le modèle, en le chargeant s'il n'est pas résident
+
+        Raises:
+            ValueError: Si le modèle est inconnu
+            ModelUnavailableError: Si le chargement échoue
+        """
+        if name not in self.model_paths:
+            raise ValueError(f"Modèle inconnu: {name} (disponibles: {sorted(self.model_paths)})")
+
+        bundle = self._touch(name)
+        if bundle is not None:
+            return bundle
+
+        # Un seul chargement à la fois par modèle: les requêtes concurrentes l'attendent
+        with self._load_locks[name]:
+            bundle = self._touch(name)
+            if bundle is not None:
+                return bundle
+
+            path = self.model_paths[name]
+            logger.info(f"Registre: chargement du modèle {name} depuis {path}")
+            try:
+                bundle = self.loader(name, path)
+            except Exception as e:
+                raise ModelUnavailableError(f"Impossible de charger le modèle {name}: {e}") from e
+
+            with self._lock:
+                self._entries[name] = bundle
+                self.loads += 1
+                self._evict_over_budget(keep=name)
+            logger.info(f"Registre: modèle {name} chargé ({bundle.size_bytes / (1024 * 1024):.1f} Mo)")
+            return bundle
+
+    def _touch(self, name: str) -> Optional[ModelBundle]:
+        """Retourne le modèle résident et le marque comme le plus récemment utilisé"""
+        with self._lock:
+            bundle = self._entries.get(name)
+            if bundle is not None:
+                self._entries.move_to_end(name)
+            return bundle
+
+    def _evict_over_budget(self, keep: str):
+        """Évince les modèles les moins récemment utilisés tant que le budget est dépassé"""
+        if not self.memory_budget_bytes:
+            return
+
+        for name in list(self._entries):
+            if self._used_bytes() <= self.memory_budget_bytes:
+                break
+            if name == keep:
+                continue
+            evicted = self._entries.pop(name)
+            self.evictions += 1
+            logger.info(f"Registre: modèle {name} évincé ({evicted.size_bytes / (1024 * 1024):.1f} Mo)")
+
+        if self._used_bytes() > self.memory_budget_bytes:
+            logger.warning(f"Registre: le modèle {keep} dépasse à lui seul le budget mémoire")
+
+    def _used_bytes(self) -> int:
+        return self.pinned_bytes + sum(bundle.size_bytes for bundle in self._entries.values())
+
+    def peek(self, name: str) -> Optional[ModelBundle]:
+        """Retourne le modèle s'il est résident, sans le charger ni modifier l'ordre LRU"""
+        with self._lock:
+            return self._entries.get(name)
+
+    def evict(self, name: str) -> bool:
+        """Décharge un modèle; retourne False s'il n'était pas résident"""
+        with self._lock:
+            return self._entries.pop(name, None) is not None
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """Modèles résidents, du moins au plus récemment utilisé"""
+        with self._lock:
+            return [bundle.describe() for bundle in self._entries.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupation mémoire et compteurs du registre"""
+        with self._lock:
+            return {
+                "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 2),
+                "memory_used_mb": round(self._used_bytes() / (1024 * 1024), 2),
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
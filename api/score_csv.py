@@ -0,0 +1,287 @@
+"""
+Scoring hors ligne d'archives de tweets - Air Paradis
+
+Rescore un fichier au format Sentiment140 (training.1600000.processed.noemoticon.csv:
+latin-1, sans en-tête, colonnes sentiment/id/date/query/user/text) avec les mêmes
+chargeurs de modèles que l'API.
+
+Le fichier est lu par paquets, chaque paquet est scoré dans un pool de processus
+(un modèle chargé par processus) et écrit dans son propre fichier de sortie.
+Un checkpoint permet de reprendre après un crash sans rescorer les paquets terminés.
+
+Usage:
+    python score_csv.py ../data/training.1600000.processed.noemoticon.csv \\
+        --output ../data/scored --format parquet --model-type logistic \\
+        --model-path ./models/logistic_regression_model.pkl
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+import app as api
+
+logger = logging.getLogger("score_csv")
+
+SENTIMENT140_COLUMNS = ["sentiment", "id", "date", "query", "user", "text"]
+OUTPUT_FORMATS = ["csv", "parquet"]
+CHECKPOINT_FILE = "_checkpoint.json"
+
+
+def load_labeled_sample(path: str, size: int, seed: int = 42) -> tuple:
+    """
+    Tire un échantillon étiqueté d'un fichier Sentiment140 (latin-1, sans en-tête,
+    sentiment 0/4) ou d'un CSV prétraité avec en-tête text,sentiment (val_lemmatized.csv,
+    test_lemmatized.csv...). Les fichiers sont triés par sentiment ou découpés de façon
+    stratifiée: un tirage aléatoire est nécessaire.
+
+    Returns:
+        (textes, sentiments 0/1)
+    """
+    with open(path, "r", encoding="latin-1") as f:
+        first_field = f.readline().split(",", 1)[0].strip().strip('"')
+
+    if first_field.isdigit():
+        frame = pd.read_csv(
+            path, encoding="latin-1", header=None, names=SENTIMENT140_COLUMNS, usecols=["sentiment", "text"]
+        )
+        frame["sentiment"] = (frame["sentiment"] == 4).astype(int)
+    else:
+        frame = pd.read_csv(path, usecols=["text", "sentiment"], keep_default_na=False)
+    frame = frame.sample(n=min(size, len(frame)), random_state=seed)
+    texts = frame["text"].fillna("").astype(str).tolist()
+    return texts, frame["sentiment"].values.astype(int)
+
+
+def require_held_out(path: str):
+    """
+    Refuse les fichiers d'entraînement pour une évaluation (calibration, dérive)
+
+    Le modèle logistique a été ajusté sur training.1600000...csv et train_*.csv: mesurée
+    sur ces tweets, sa confiance et son exactitude sont surestimées.
+
+    Raises:
+        ValueError: Si le nom du fichier désigne des données d'entraînement
+    """
+    name = os.path.basename(path)
+    if name.startswith(("training.", "train_")):
+        raise ValueError(
+            f"{name}: données d'entraînement, évaluation biaisée. "
+            "Utiliser le jeu de validation ou de test (data/processed/val_*.csv, test_*.csv)"
+        )
+
+
+def _part_path(output_dir: str, index: int, fmt: str) -> str:
+    """Chemin du fichier de sortie d'un paquet"""
+    return os.path.join(output_dir, f"part-{index:05d}.{fmt}")
+
+
+def score_chunk(index: int, chunk: pd.DataFrame, output_dir: str, fmt: str,
+                batch_size: int) -> Dict[str, Any]:
+    """
+    Score un paquet de tweets et l'écrit dans son fichier de sortie
+
+    Exécuté dans un processus du pool (ou dans le processus principal si workers=0).
+    """
+    start = time.perf_counter()
+    texts = chunk["text"].fillna("").astype(str).tolist()
+
+    predictions = []
+    for i in range(0, len(texts), batch_size):
+        predictions.extend(api.predict_texts(texts[i:i + batch_size]))
+
+    result = pd.DataFrame({
+        "id": chunk["id"].values,
+        "sentiment": chunk["sentiment"].values,
+        "text": texts,
+        "predicted_class": [predicted_class for predicted_class, _, _ in predictions],
+        "confidence": [confidence for _, confidence, _ in predictions],
+        "prob_negative": [probabilities["negative"] for _, _, probabilities in predictions],
+        "prob_positive": [probabilities["positive"] for _, _, probabilities in predictions],
+    })
+    result["sentiment_label"] = result["predicted_class"].map(api.SENTIMENT_LABELS)
+
+    # Écriture atomique: un paquet présent sur disque est forcément complet
+    path = _part_path(output_dir, index, fmt)
+    tmp_path = path + ".tmp"
+    if fmt == "parquet":
+        result.to_parquet(tmp_path, index=False)
+    else:
+        result.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    return {"index": index, "rows": len(result), "seconds": time.perf_counter() - start}
+
+
+def _load_checkpoint(output_dir: str, params: Dict[str, Any], resume: bool) -> set:
+    """Charge la liste des paquets terminés (vérifie que les paramètres n'ont pas changé)"""
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not resume or not os.path.exists(path):
+        return set()
+
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("params") != params:
+        raise ValueError(
+            f"Checkpoint incompatible ({path}): paramètres différents, "
+            "relancer sans --resume ou changer de répertoire de sortie"
+        )
+
+    return {
+        index for index in checkpoint.get("done", [])
+        if os.path.exists(_part_path(output_dir, index, params["format"]))
+    }
+
+
+def _save_checkpoint(output_dir: str, params: Dict[str, Any], done: set):
+    """Enregistre atomiquement la liste des paquets terminés"""
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"params": params, "done": sorted(done)}, f)
+    os.replace(path + ".tmp", path)
+
+
+def score_file(input_path: str, output_dir: str, model_type: str, model_path: str,
+               fmt: str = "csv", chunk_size: int = 100000, batch_size: int = 512,
+               workers: Optional[int] = None, resume: bool = True) -> Dict[str, Any]:
+    """
+    Score un fichier Sentiment140 par paquets dans un pool de processus
+
+    Args:
+        workers: Nombre de processus (défaut: tous les coeurs, 0 = processus courant)
+
+    Returns:
+        Résumé (lignes scorées, paquets, durée, lignes/seconde)
+
+    Raises:
+        ValueError: Si le format est inconnu, le checkpoint incompatible ou si le modèle
+            ne peut pas être chargé
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Format non supporté: {fmt} (attendu: {OUTPUT_FORMATS})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    params = {
+        "input": os.path.abspath(input_path),
+        "input_size": os.path.getsize(input_path),
+        "model_type": model_type,
+        "model_path": os.path.abspath(model_path),
+        "chunk_size": chunk_size,
+        "format": fmt,
+    }
+    done = _load_checkpoint(output_dir, params, resume)
+    if done:
+        logger.info(f"Reprise: {len(done)} paquets déjà scorés")
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    reader = pd.read_csv(
+        input_path,
+        encoding="latin-1",
+        header=None,
+        names=SENTIMENT140_COLUMNS,
+        usecols=["sentiment", "id", "text"],
+        chunksize=chunk_size
+    )
+
+    start = time.perf_counter()
+    rows = 0
+    scored_chunks = 0
+
+    def record(result: Dict[str, Any]):
+        nonlocal rows, scored_chunks
+        done.add(result["index"])
+        _save_checkpoint(output_dir, params, done)
+        rows += result["rows"]
+        scored_chunks += 1
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Paquet {result['index']}: {result['rows']} lignes en {result['seconds']:.1f}s "
+            f"(cumul {rows} lignes, {rows / elapsed:,.0f} lignes/s)"
+        )
+
+    if workers == 0:
+        try:
+            api.init_inference_worker(model_type, model_path)
+        except RuntimeError as e:
+            raise ValueError(str(e)) from e
+        for index, chunk in enumerate(reader):
+            if index not in done:
+                record(score_chunk(index, chunk, output_dir, fmt, batch_size))
+    else:
+        # Un processus qui ne charge pas le modèle casse le pool (initializer en échec)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=api.init_inference_worker,
+                                     initargs=(model_type, model_path)) as pool:
+                pending = set()
+                for index, chunk in enumerate(reader):
+                    if index in done:
+                        continue
+                    # Nombre de paquets en vol borné pour garder une mémoire constante
+                    if len(pending) >= 2 * workers:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            record(future.result())
+                    pending.add(pool.submit(score_chunk, index, chunk, output_dir, fmt, batch_size))
+
+                for future in pending:
+                    record(future.result())
+        except BrokenProcessPool as e:
+            raise ValueError(
+                f"Impossible de charger le modèle {model_type} depuis {model_path} "
+                "dans les processus du pool (voir les logs des workers)"
+            ) from e
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": rows,
+        "chunks": scored_chunks,
+        "skipped_chunks": len(done) - scored_chunks,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        "output_dir": output_dir,
+    }
+    logger.info(
+        f"Scoring terminé: {rows} lignes en {elapsed:.1f}s "
+        f"({summary['rows_per_second']:,.0f} lignes/s)"
+    )
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scoring hors ligne d'un fichier Sentiment140")
+    parser.add_argument("input", help="Fichier CSV au format Sentiment140")
+    parser.add_argument("--output", required=True, help="Répertoire de sortie (un fichier par paquet)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv", help="Format de sortie")
+    parser.add_argument("--model-type", default=api.MODEL_TYPE, choices=api.AVAILABLE_MODELS)
+    parser.add_argument("--model-path", default=api.MODEL_PATH)
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Lignes par paquet")
+    parser.add_argument("--batch-size", type=int, default=512, help="Tweets par inférence")
+    parser.add_argument("--workers", type=int, default=None, help="Processus (défaut: tous les coeurs)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignorer le checkpoint existant")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = score_file(
+            args.input, args.output, args.model_type, args.model_path,
+            fmt=args.format, chunk_size=args.chunk_size, batch_size=args.batch_size,
+            workers=args.workers, resume=not args.no_resume
+        )
+    except (ImportError, OSError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
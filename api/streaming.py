@@ -0,0 +1,105 @@
+"""
+Scoring en flux NDJSON - Air Paradis
+
+Outils pour POST /predict/stream: lecture incrémentale d'un corps de requête NDJSON
+(une ligne JSON par tweet) et réponse NDJSON envoyée au fil de l'eau. La mémoire
+utilisée reste constante quel que soit le nombre de tweets envoyés.
+"""
+
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Ligne brute: (numéro de ligne, contenu décodé, erreur éventuelle)
+RawLine = Tuple[int, Optional[str], Optional[str]]
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Réponse NDJSON produite pendant la lecture du corps de la requête
+
+    La StreamingResponse de Starlette consomme receive() pour détecter la déconnexion
+    du client, ce qui entre en concurrence avec la lecture du corps de la requête.
+    Ici, c'est la lecture du corps (request.stream()) qui détecte la déconnexion.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = 16384) -> AsyncIterator[RawLine]:
+    """
+    Découpe un flux d'octets en lignes NDJSON, sans jamais le charger en entier
+
+    Les lignes vides sont ignorées. Une ligne plus longue que max_line_bytes est
+    signalée en erreur puis ignorée jusqu'au saut de ligne suivant.
+    """
+    buffer = b""
+    line_no = 0
+    skipping = False
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            if skipping:
+                # Fin d'une ligne trop longue, déjà signalée
+                skipping = False
+                continue
+            if line.strip():
+                line_no += 1
+                yield _decode_line(line_no, line)
+
+        if skipping:
+            buffer = b""
+        elif len(buffer) > max_line_bytes:
+            line_no += 1
+            yield line_no, None, f"Ligne trop longue (> {max_line_bytes} octets)"
+            buffer = b""
+            skipping = True
+
+    if buffer.strip() and not skipping:
+        line_no += 1
+        yield _decode_line(line_no, buffer)
+
+
+def _decode_line(line_no: int, line: bytes) -> RawLine:
+    """Décode une ligne en UTF-8"""
+    try:
+        return line_no, line.decode("utf-8"), None
+    except UnicodeDecodeError:
+        return line_no, None, "Ligne non décodable en UTF-8"
+
+
+def parse_tweet_line(line: str) -> Tuple[Optional[str], object]:
+    """
+    Extrait le tweet d'une ligne NDJSON
+
+    Formats acceptés: "texte" ou {"text": "texte", "id": ...}
+
+    Returns:
+        (texte, identifiant éventuel)
+
+    Raises:
+        ValueError: Si la ligne n'est pas un tweet valide
+    """
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON invalide: {e.msg}")
+
+    if isinstance(item, str):
+        return item, None
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return item["text"], item.get("id")
+    raise ValueError("Attendu: une chaîne ou un objet {\"text\": ...}")
@@ -10,18 +10,57 @@ Pour exécuter les tests:
 
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+import asyncio
+import json
+import os
 import numpy as np
 import tensorflow as tf
 from datetime import datetime
 
 # Import de l'application
-from app import app, load_bert_model, predict_bert, predict_logistic
+from batching import MicroBatcher
+from cache import PredictionCache
+from logistic_scorer import CompiledLogisticScorer, build_logistic_scorer
+from executor import ExecutorSaturatedError, InferenceExecutor
+from metrics import Histogram, STAGE_SECONDS, TOKENS_TOTAL, batch_size_bucket, current_endpoint, process_memory
+from bucketing import length_buckets, pad_bucket, parse_boundaries
+from recycling import MemoryWatchdog
+from registry import ModelBundle, ModelRegistry, ModelUnavailableError
+from hot_reload import ArtifactWatcher
+from compact_artifacts import export_logistic_artifacts, load_logistic_artifacts
+from compact_response import COMPACT_MEDIA_TYPE
+from onnx_backend import KerasSequenceTokenizer, drift_report, keras_tokenizer_config, select_precision
+import backends
+from app import (
+    app, load_bert_model, predict_bert, predict_logistic,
+    predict_bert_batch, predict_logistic_batch, build_startup_report, _softmax,
+    preload_model, startup_event, predict_onnx_batch, predict_cascade,
+    warm_up_bundle, run_warm_up, warmup_report
+)
 
 # Client de test
 client = TestClient(app)
 
 
+def fake_bert_encoding(texts, **kwargs):
+    """Encodage factice: une ligne de tenseur par texte"""
+    n = len(texts) if isinstance(texts, list) else 1
+    return {
+        'input_ids': tf.constant([[101, 2023, 102]] * n),
+        'attention_mask': tf.constant([[1, 1, 1]] * n)
+    }
+
+
+def fake_bert_outputs(logits_row):
+    """Sortie factice du modèle BERT: mêmes logits pour chaque ligne du batch"""
+    def forward(encoding):
+        outputs = Mock()
+        outputs.logits = tf.constant([logits_row] * int(encoding['input_ids'].shape[0]))
+        return outputs
+    return forward
+
+
 # Fixtures
 @pytest.fixture
 def mock_bert_model():
@@ -226,15 +265,9 @@ class TestPredictBatchEndpoint:
     @patch('app.tokenizer')
     def test_predict_batch_success(self, mock_tokenizer, mock_model, sample_batch):
         """Test de prédiction batch réussie"""
-        # Configuration des mocks
-        mock_tokenizer.return_value = {
-            'input_ids': tf.constant([[101, 2023, 102]]),
-            'attention_mask': tf.constant([[1, 1, 1]])
-        }
-
-        mock_outputs = Mock()
-        mock_outputs.logits = tf.constant([[0.3, 0.7]])
-        mock_model.return_value = mock_outputs
+        # Configuration des mocks (une ligne de sortie par tweet du batch)
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.3, 0.7])
 
         # Requête
         response = client.post("/predict/batch", json=sample_batch)
@@ -272,6 +305,22 @@ class TestPredictBatchEndpoint:
 
         assert response.status_code == 422  # Validation error
 
+    @patch('app.text_preprocessor', None)  # textes bruts transmis au tokenizer
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_predict_batch_single_forward_pass(self, mock_tokenizer, mock_model, sample_batch):
+        """Test qu'un batch ne déclenche qu'une seule tokenisation et une seule passe forward"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.3, 0.7])
+
+        response = client.post("/predict/batch", json=sample_batch)
+
+        assert response.status_code == 200
+        assert mock_tokenizer.call_count == 1
+        assert mock_model.call_count == 1
+        assert mock_tokenizer.call_args[0][0] == sample_batch["tweets"]
+
     @patch('app.model', None)
     def test_predict_batch_model_not_loaded(self, sample_batch):
         """Test batch quand le modèle n'est pas chargé"""
@@ -280,6 +329,57 @@ class TestPredictBatchEndpoint:
         assert response.status_code == 503  # Service unavailable
 
 
+# Tests de l'endpoint de prédiction en flux
+class TestPredictStreamEndpoint:
+    """Tests de l'endpoint /predict/stream (NDJSON)"""
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.STREAM_CHUNK_SIZE', 2)
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_stream_scores_in_chunks(self, mock_tokenizer, mock_model):
+        """Test du scoring en flux par paquets, dans l'ordre des lignes"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        def body():
+            yield b'"Great flight"\n{"text": "Lost my bag", "id": 42}\n'
+            yield b'\n"On ti'
+            yield b'me!"\n'
+
+        response = client.post("/predict/stream", content=body())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["text"] for record in records] == ["Great flight", "Lost my bag", "On time!"]
+        assert [record["line"] for record in records] == [1, 2, 3]
+        assert records[1]["id"] == 42
+        assert mock_model.call_count == 2
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_stream_reports_invalid_lines(self, mock_tokenizer, mock_model):
+        """Test que les lignes invalides produisent une erreur sans arrêter le flux"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        body = b'not json\n"   "\n{"id": 1}\n"Nice crew"\n'
+        response = client.post("/predict/stream", content=body)
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["line"] for record in records if "error" in record] == [1, 2, 3]
+        assert records[-1]["text"] == "Nice crew"
+
+    @patch('app.model', None)
+    def test_stream_model_not_loaded(self):
+        """Test du flux quand le modèle n'est pas chargé"""
+        response = client.post("/predict/stream", content=b'"test"\n')
+
+        assert response.status_code == 503
+
+
 # Tests des fonctions de prédiction
 class TestPredictionFunctions:
     """Tests des fonctions de prédiction internes"""
@@ -327,6 +427,1766 @@ class TestPredictionFunctions:
         assert "positive" in probabilities
 
 
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_predict_bert_batch_preserves_order(self, mock_tokenizer, mock_model):
+        """Test que predict_bert_batch renvoie les résultats dans l'ordre des textes"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_outputs = Mock()
+        mock_outputs.logits = tf.constant([[0.9, 0.1], [0.1, 0.9], [0.8, 0.2]])
+        mock_model.return_value = mock_outputs
+
+        results = predict_bert_batch(["bad", "good", "meh"])
+
+        assert [predicted_class for predicted_class, _, _ in results] == [0, 1, 0]
+        assert predict_bert_batch([]) == []
+
+    @patch('app.model')
+    @patch('app.vectorizer')
+    def test_predict_logistic_batch_function(self, mock_vectorizer, mock_model):
+        """Test que predict_logistic_batch vectorise tout le batch en une fois"""
+        mock_vectorizer.transform.return_value = Mock()
+        mock_model.predict.return_value = np.array([1, 0])
+        mock_model.predict_proba.return_value = np.array([[0.3, 0.7], [0.6, 0.4]])
+
+        results = predict_logistic_batch(["good", "bad"])
+
+        mock_vectorizer.transform.assert_called_once_with(["good", "bad"])
+        assert [predicted_class for predicted_class, _, _ in results] == [1, 0]
+        assert results[1][1] == pytest.approx(0.6)
+
+
+# Tests du micro-batching
+class TestMicroBatching:
+    """Tests du regroupement des appels concurrents à /predict"""
+
+    @staticmethod
+    def _recording_predict(calls):
+        def predict_fn(texts):
+            calls.append(list(texts))
+            return [(1, 0.9, {"negative": 0.1, "positive": 0.9, "text": text}) for text in texts]
+        return predict_fn
+
+    def test_concurrent_calls_share_one_batch(self):
+        """Test que des appels concurrents partagent une seule inférence"""
+        calls = []
+        batcher = MicroBatcher(self._recording_predict(calls), max_batch_size=32, max_wait_ms=20)
+
+        async def scenario():
+            return await asyncio.gather(*(batcher.submit(f"tweet {i}") for i in range(5)))
+
+        results = asyncio.run(scenario())
+
+        assert calls == [[f"tweet {i}" for i in range(5)]]
+        assert [result[2]["text"] for result in results] == [f"tweet {i}" for i in range(5)]
+
+    def test_max_batch_size_splits_batches(self):
+        """Test que la taille maximale du batch est respectée"""
+        calls = []
+        batcher = MicroBatcher(self._recording_predict(calls), max_batch_size=2, max_wait_ms=20)
+
+        async def scenario():
+            return await asyncio.gather(*(batcher.submit(f"tweet {i}") for i in range(5)))
+
+        asyncio.run(scenario())
+
+        assert [len(batch) for batch in calls] == [2, 2, 1]
+
+    def test_error_propagates_to_every_caller(self):
+        """Test qu'une erreur d'inférence est renvoyée à chaque appelant"""
+        def failing_predict(texts):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(failing_predict, max_batch_size=8, max_wait_ms=1)
+
+        async def scenario():
+            return await asyncio.gather(
+                batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+# Tests de l'exécuteur d'inférence
+class TestInferenceExecutor:
+    """Tests de l'exécution de l'inférence hors de la boucle d'événements"""
+
+    def test_thread_executor_runs_off_event_loop(self):
+        """Test que l'inférence s'exécute dans un thread du pool"""
+        import threading
+
+        executor = InferenceExecutor(kind="thread", max_workers=2)
+        try:
+            thread_name = asyncio.run(executor.run(lambda: threading.current_thread().name))
+        finally:
+            executor.shutdown()
+
+        assert thread_name.startswith("inference")
+        assert executor.stats()["completed"] == 1
+
+    def test_saturated_executor_rejects(self):
+        """Test qu'un exécuteur plein refuse les nouvelles tâches"""
+        import threading
+
+        release = threading.Event()
+        executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=0)
+
+        async def scenario():
+            blocking = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            try:
+                with pytest.raises(ExecutorSaturatedError):
+                    await executor.run(lambda: None)
+                return executor.stats()
+            finally:
+                release.set()
+                await blocking
+
+        try:
+            stats = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        assert stats["in_flight"] == 1
+        assert stats["saturation"] == 1.0
+        assert stats["rejected"] == 1
+
+    def test_executor_endpoint(self):
+        """Test du endpoint d'état de l'exécuteur"""
+        response = client.get("/executor")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "kind" in data
+        assert "saturation" in data
+        assert "queued" in data
+
+    @patch('app.model', Mock())
+    @patch('app.inference_executor')
+    def test_predict_batch_saturated_returns_503(self, mock_executor, sample_batch):
+        """Test qu'un exécuteur saturé renvoie une erreur 503"""
+        mock_executor.run = AsyncMock(side_effect=ExecutorSaturatedError("saturé"))
+
+        response = client.post("/predict/batch", json=sample_batch)
+
+        assert response.status_code == 503
+
+
+# Tests du cache des prédictions
+class TestPredictionCache:
+    """Tests du cache LRU/TTL des prédictions"""
+
+    def test_key_uses_normalized_text(self):
+        """Test que la clé utilise le texte normalisé comme la validation"""
+        assert PredictionCache.make_key("  Great!  ", "bert", "v1") == PredictionCache.make_key("Great!", "bert", "v1")
+        assert PredictionCache.make_key("Great!", "bert", "v1") != PredictionCache.make_key("Great!", "bert", "v2")
+
+    def test_lru_eviction_and_counters(self):
+        """Test de l'éviction LRU et des compteurs"""
+        cache = PredictionCache(max_size=2, ttl_seconds=0)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" devient la plus ancienne
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Test de l'expiration des entrées"""
+        cache = PredictionCache(max_size=10, ttl_seconds=60)
+        cache.put("a", 1)
+
+        with patch('cache.time.monotonic', return_value=float('inf')):
+            assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    @patch('app.text_preprocessor', None)  # textes bruts transmis au tokenizer
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model_version', 'v1')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_batch_only_predicts_cache_misses(self, mock_tokenizer, mock_model):
+        """Test que le batch ne prédit que les tweets absents du cache, sans doublons"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        with patch('app.prediction_cache', PredictionCache(max_size=100)):
+            response = client.post("/predict/batch", json={"tweets": ["Late again", "Late again", "Great crew"]})
+            assert response.status_code == 200
+            assert response.json()["count"] == 3
+            assert mock_tokenizer.call_args[0][0] == ["Late again", "Great crew"]
+
+            response = client.post("/predict/batch", json={"tweets": ["Great crew", "Late again"]})
+            assert response.status_code == 200
+            assert mock_model.call_count == 1
+
+            stats = client.get("/cache").json()
+            assert stats["hits"] == 2
+            assert stats["misses"] == 3
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model_version', 'v1')
+    @patch('app.PREDICTION_CACHE_ENDPOINTS', {"batch"})
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_cache_can_be_disabled_per_endpoint(self, mock_tokenizer, mock_model, sample_tweet):
+        """Test que le cache peut être désactivé pour /predict"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        with patch('app.prediction_cache', PredictionCache(max_size=100)):
+            client.post("/predict", json=sample_tweet)
+            client.post("/predict", json=sample_tweet)
+
+        assert mock_model.call_count == 2
+
+
+# Tests du scoreur compilé TF-IDF + régression logistique
+class TestCompiledLogisticScorer:
+    """Parité du scoreur compilé avec le pipeline scikit-learn"""
+
+    TEXTS = [
+        "This flight was amazing!",
+        "Terrible terrible terrible delay, worst airline ever",
+        "Lost my luggage AGAIN... thanks for nothing @AirParadis http://t.co/x",
+        "Café crème très bon, flight flight flight",
+        "!!!",
+        "ok",
+    ]
+
+    @pytest.fixture
+    def sklearn_pipeline(self):
+        """Artefacts réels produits par fix_vectorizer.py"""
+        import joblib
+        import warnings
+
+        models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                vectorizer = joblib.load(os.path.join(models_dir, "tfidf_vectorizer.pkl"))
+                model = joblib.load(os.path.join(models_dir, "logistic_regression_model.pkl"))
+                vectorizer.transform(["check"])
+        except Exception as e:
+            pytest.skip(f"Artefacts logistiques non chargeables: {e}")
+        return vectorizer, model
+
+    def test_analyzer_matches_sklearn(self, sklearn_pipeline):
+        """Test que la tokenisation reproduit celle du vectorizer"""
+        vectorizer, model = sklearn_pipeline
+        scorer = CompiledLogisticScorer.from_sklearn(vectorizer, model)
+        analyzer = vectorizer.build_analyzer()
+
+        for text in self.TEXTS:
+            assert scorer.analyze(text) == analyzer(text)
+
+    def test_probabilities_match_sklearn(self, sklearn_pipeline):
+        """Test que les probabilités sont identiques à predict_proba"""
+        vectorizer, model = sklearn_pipeline
+        scorer = CompiledLogisticScorer.from_sklearn(vectorizer, model)
+
+        expected = model.predict_proba(vectorizer.transform(self.TEXTS))
+        np.testing.assert_allclose(scorer.predict_proba(self.TEXTS), expected, rtol=0, atol=1e-12)
+
+    def test_uncompilable_pipeline_falls_back(self):
+        """Test qu'un pipeline non compilable renvoie None (repli sur scikit-learn)"""
+        assert build_logistic_scorer(Mock(analyzer="char"), Mock()) is None
+
+
+# Tests du scoring hors ligne
+class TestOfflineScoring:
+    """Tests du scoreur CSV hors ligne (score_csv.py)"""
+
+    @pytest.fixture
+    def sentiment140_csv(self, tmp_path):
+        """Petit fichier au format Sentiment140 (latin-1, sans en-tête)"""
+        path = tmp_path / "tweets.csv"
+        rows = [
+            f'{4 if i % 2 else 0},{i},"Mon Apr 06 22:19:45 PDT 2009",NO_QUERY,user{i},"caf\xe9 tweet {i}"'
+            for i in range(5)
+        ]
+        path.write_bytes("\n".join(rows).encode("latin-1"))
+        return str(path)
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.MODEL_PATH', 'unused')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_score_file_and_resume(self, mock_tokenizer, mock_model, sentiment140_csv, tmp_path):
+        """Test du scoring par paquets puis de la reprise depuis le checkpoint"""
+        import pandas as pd
+        from score_csv import score_file
+
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+        output_dir = str(tmp_path / "scored")
+
+        summary = score_file(sentiment140_csv, output_dir, "bert", "unused", chunk_size=2, workers=0)
+
+        assert summary["rows"] == 5
+        assert summary["chunks"] == 3
+        scored = pd.concat(
+            pd.read_csv(os.path.join(output_dir, f"part-{i:05d}.csv")) for i in range(3)
+        )
+        assert scored["id"].tolist() == [0, 1, 2, 3, 4]
+        assert scored["text"].iloc[0] == "café tweet 0"
+        assert set(scored["sentiment_label"]) == {"Positif"}
+
+        calls = mock_model.call_count
+        summary = score_file(sentiment140_csv, output_dir, "bert", "unused", chunk_size=2, workers=0)
+
+        assert summary["rows"] == 0
+        assert summary["skipped_chunks"] == 3
+        assert mock_model.call_count == calls
+
+    def test_incompatible_checkpoint_rejected(self, sentiment140_csv, tmp_path):
+        """Test qu'un checkpoint produit avec d'autres paramètres est refusé"""
+        from score_csv import CHECKPOINT_FILE, score_file
+
+        output_dir = tmp_path / "scored"
+        output_dir.mkdir()
+        (output_dir / CHECKPOINT_FILE).write_text(json.dumps({"params": {"chunk_size": 1}, "done": [0]}))
+
+        with pytest.raises(ValueError):
+            score_file(sentiment140_csv, str(output_dir), "bert", "unused", chunk_size=2, workers=0)
+
+    @patch('app.model', None)
+    @patch('app.WARMUP_ENABLED', False)
+    @patch('app.MODEL_TYPE', 'bert')  # modifiés par init_inference_worker
+    @patch('app.MODEL_PATH', 'unused')
+    @patch('app.preprocessing_loaded', True)
+    @pytest.mark.parametrize("workers", [0, 1])
+    def test_model_load_failure_exits_cleanly(self, workers, sentiment140_csv, tmp_path):
+        """Test qu'un modèle impossible à charger donne le code 1, sans trace d'AttributeError"""
+        from score_csv import main
+
+        missing = str(tmp_path / "absent.pkl")
+        code = main([sentiment140_csv, "--output", str(tmp_path / "scored"), "--model-type", "logistic",
+                     "--model-path", missing, "--chunk-size", "2", "--workers", str(workers)])
+
+        assert code == 1
+
+
+# Tests des métriques Prometheus
+class TestMetrics:
+    """Tests des métriques de latence par étape"""
+
+    def test_batch_size_bucket(self):
+        """Test des tranches de taille de batch"""
+        assert batch_size_bucket(1) == "1"
+        assert batch_size_bucket(2) == "2-8"
+        assert batch_size_bucket(32) == "9-32"
+        assert batch_size_bucket(100) == "33-128"
+        assert batch_size_bucket(500) == "129+"
+
+    def test_histogram_render(self):
+        """Test du format texte d'un histogramme (buckets cumulatifs, somme, nombre)"""
+        histogram = Histogram("test_seconds", "Durée de test", ["stage"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+        histogram.observe(5.0, stage="a")
+
+        lines = histogram.render()
+
+        assert '# TYPE test_seconds histogram' in lines
+        assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{stage="a",le="1"} 2' in lines
+        assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{stage="a"} 3' in lines
+        assert histogram.count(stage="a") == 3
+
+    def test_endpoint_propagated_to_inference_thread(self):
+        """Test que l'endpoint courant est visible dans le thread d'inférence"""
+        executor = InferenceExecutor(kind="thread", max_workers=1)
+
+        async def scenario():
+            current_endpoint.set("batch")
+            return await executor.run(current_endpoint.get)
+
+        try:
+            assert asyncio.run(scenario()) == "batch"
+        finally:
+            executor.shutdown()
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_metrics_endpoint_reports_stages(self, mock_tokenizer, mock_model, sample_batch):
+        """Test que /metrics expose les étapes d'une prédiction batch"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+        labels = {"endpoint": "batch", "model_type": "bert", "batch_size": "2-8"}
+        before = {
+            stage: STAGE_SECONDS.count(stage=stage, **labels)
+            for stage in ("validation", "tokenization", "model_forward", "serialization")
+        }
+
+        response = client.post("/predict/batch", json=sample_batch)
+        assert response.status_code == 200
+
+        for stage, count in before.items():
+            assert STAGE_SECONDS.count(stage=stage, **labels) == count + 1
+
+        metrics_response = client.get("/metrics")
+        assert metrics_response.status_code == 200
+        assert metrics_response.headers["content-type"].startswith("text/plain")
+        body = metrics_response.text
+        assert 'airparadis_requests_total{endpoint="batch",status="200"}' in body
+        assert 'airparadis_requests_in_flight{endpoint="batch"} 0' in body
+        assert 'stage="model_forward"' in body
+        assert "# TYPE airparadis_cache_lookups_total counter" in body
+        assert 'airparadis_cache_lookups_total{result="hit"}' in body
+        assert "# TYPE airparadis_cache_evictions_total counter" in body
+
+
+# Tests du registre multi-modèles
+class TestModelRegistry:
+    """Tests du chargement à la demande et de l'éviction sous budget mémoire"""
+
+    MB = 1024 * 1024
+
+    def make_registry(self, sizes, budget_mb=0):
+        """Registre dont le chargeur crée des modèles factices de taille donnée (Mo)"""
+        loaded = []
+
+        def loader(name, path):
+            loaded.append(name)
+            return ModelBundle(name, path, Mock(), version=f"{name}-v1", size_bytes=sizes[name] * self.MB)
+
+        registry = ModelRegistry(
+            loader,
+            {name: f"./models/{name}" for name in sizes},
+            memory_budget_bytes=budget_mb * self.MB
+        )
+        return registry, loaded
+
+    def test_lazy_loading(self):
+        """Test qu'un modèle n'est chargé qu'au premier appel"""
+        registry, loaded = self.make_registry({"lstm": 10, "cnn": 10})
+
+        assert registry.resident() == []
+        first = registry.get("lstm")
+        second = registry.get("lstm")
+
+        assert first is second
+        assert loaded == ["lstm"]
+        assert [info["model_type"] for info in registry.resident()] == ["lstm"]
+
+    def test_lru_eviction_under_budget(self):
+        """Test que le modèle le moins récemment utilisé est évincé"""
+        registry, loaded = self.make_registry({"lstm": 40, "cnn": 40, "bert": 40}, budget_mb=100)
+        registry.pinned_bytes = 10 * self.MB
+
+        registry.get("lstm")
+        registry.get("cnn")
+        registry.get("lstm")  # lstm devient le plus récemment utilisé
+        registry.get("bert")
+
+        assert [info["model_type"] for info in registry.resident()] == ["lstm", "bert"]
+        assert registry.stats()["evictions"] == 1
+        assert registry.stats()["memory_used_mb"] == 90
+
+    def test_unknown_and_failing_models(self):
+        """Test des erreurs: modèle inconnu et échec de chargement"""
+        def failing_loader(name, path):
+            raise OSError("fichier introuvable")
+
+        registry = ModelRegistry(failing_loader, {"bert": "./models/bert"})
+
+        with pytest.raises(ValueError):
+            registry.get("xgboost")
+        with pytest.raises(ModelUnavailableError):
+            registry.get("bert")
+        assert registry.resident() == []
+
+    def test_predict_unknown_model_returns_400(self, sample_tweet):
+        """Test qu'un paramètre ?model= inconnu est refusé"""
+        response = client.post("/predict?model=xgboost", json=sample_tweet)
+
+        assert response.status_code == 400
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model', Mock())
+    def test_batch_routed_to_registry_model(self, sample_batch):
+        """Test qu'une requête ?model= utilise le modèle du registre"""
+        logistic_model = Mock()
+        logistic_model.predict_proba.side_effect = lambda X: np.array([[0.9, 0.1]] * 3)
+
+        def loader(name, path):
+            return ModelBundle("logistic", path, logistic_model, vectorizer=Mock(), size_bytes=self.MB)
+
+        registry = ModelRegistry(loader, {"logistic": "./models/logistic_regression_model.pkl"})
+        with patch('app.model_registry', registry):
+            response = client.post("/predict/batch?model=logistic", json=sample_batch)
+            models_response = client.get("/models")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["model_type"] == "logistic"
+        assert all(p["sentiment"] == "0" for p in data["predictions"])
+
+        resident = models_response.json()["resident_models"]
+        assert {"bert", "logistic"} == {info["model_type"] for info in resident}
+        assert [info["default"] for info in resident] == [True, False]
+
+
+# Tests du rechargement à chaud
+class TestHotReload:
+    """Tests du rechargement du modèle sans interruption de service"""
+
+    @staticmethod
+    def logistic_bundle(prob_positive, version):
+        """Modèle logistique factice renvoyant toujours la même probabilité"""
+        lr_model = Mock()
+        lr_model.predict_proba.side_effect = lambda X: np.array([[1 - prob_positive, prob_positive]])
+        return ModelBundle(
+            "logistic", "./models/logistic_regression_model.pkl", lr_model,
+            vectorizer=Mock(), version=version, size_bytes=1024
+        )
+
+    @pytest.fixture
+    def serving_v1(self):
+        """Modèle v1 en service (les globales sont restaurées après le test)"""
+        with patch.multiple('app', MODEL_TYPE='logistic', model=None, tokenizer=None, vectorizer=None,
+                            logistic_scorer=None, model_version=None, model_size_bytes=0,
+                            model_artifacts=[], MODEL_PATH='./models/logistic_regression_model.pkl'):
+            import app as api
+            api.install_bundle(self.logistic_bundle(0.2, "v1"))
+            yield api
+
+    def test_reload_swaps_model_and_version(self, serving_v1, sample_tweet):
+        """Test que le nouveau modèle sert les requêtes suivantes, avec sa version"""
+        before = client.post("/predict", json=sample_tweet).json()
+        assert before["model_version"] == "v1"
+        assert before["sentiment"] == "0"
+
+        with patch('app.build_bundle', return_value=self.logistic_bundle(0.9, "v2")):
+            response = client.post("/admin/reload")
+
+        assert response.status_code == 200
+        assert response.json()["previous_version"] == "v1"
+        assert response.json()["model_version"] == "v2"
+
+        after = client.post("/predict", json=sample_tweet).json()
+        assert after["model_version"] == "v2"
+        assert after["sentiment"] == "1"
+
+    def test_in_flight_snapshot_keeps_old_version(self, serving_v1):
+        """Test qu'une requête en cours termine avec le modèle qu'elle a lu"""
+        snapshot = serving_v1.current_bundle()
+        serving_v1.install_bundle(self.logistic_bundle(0.9, "v2"))
+
+        predicted_class, _, _ = serving_v1.predict_with_bundle(["ok"], snapshot)[0]
+        assert snapshot.version == "v1"
+        assert predicted_class == 0
+        assert serving_v1.current_bundle().version == "v2"
+
+    def test_failed_reload_keeps_current_model(self, serving_v1):
+        """Test qu'un échec de chargement laisse l'ancien modèle en service"""
+        with patch('app.build_bundle', side_effect=OSError("artefact corrompu")):
+            response = client.post("/admin/reload")
+
+        assert response.status_code == 500
+        assert serving_v1.model_version == "v1"
+
+    @patch('app.ADMIN_TOKEN', 'secret')
+    def test_reload_requires_admin_token(self):
+        """Test que le jeton d'administration est exigé s'il est configuré"""
+        assert client.post("/admin/reload").status_code == 403
+
+    def test_watcher_waits_for_stable_artifacts(self, tmp_path):
+        """Test que la surveillance recharge une fois la modification terminée"""
+        artifact = tmp_path / "logistic_regression_model.pkl"
+        artifact.write_bytes(b"v1")
+        on_change = AsyncMock()
+        watcher = ArtifactWatcher(lambda: [str(artifact)], on_change, interval=0.01)
+
+        async def scenario():
+            watcher.reset()
+            assert await watcher.poll() is False
+            artifact.write_bytes(b"v2 plus long")
+            assert await watcher.poll() is False  # modification détectée, en attente
+            assert await watcher.poll() is True  # fichiers stables: rechargement
+            assert await watcher.poll() is False
+
+        asyncio.run(scenario())
+        on_change.assert_awaited_once()
+
+
+# Tests du démarrage à froid
+class TestColdStart:
+    """Tests de l'import différé des frameworks et du rapport de démarrage"""
+
+    def test_app_import_does_not_load_tensorflow(self):
+        """Test que l'API démarre sans importer TensorFlow ni Transformers"""
+        import subprocess
+        import sys
+
+        code = "import sys, app; print(','.join(n for n in ('tensorflow', 'transformers') if n in sys.modules))"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, "MODEL_TYPE": "logistic"},
+            capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
+
+    def test_missing_backend_raises_import_error(self):
+        """Test qu'un framework absent lève ImportError au chargement du modèle"""
+        with pytest.raises(ImportError):
+            backends.import_backend("framework_inexistant_airparadis")
+
+    def test_softmax_matches_tensorflow(self):
+        """Test que le softmax numpy de BERT est identique à tf.nn.softmax"""
+        logits = np.array([[0.2, 0.8], [3.0, -1.0], [1000.0, 999.0]])
+
+        np.testing.assert_allclose(_softmax(logits), tf.nn.softmax(logits, axis=1).numpy(), atol=1e-12)
+
+    def test_startup_report(self):
+        """Test du contenu du rapport de démarrage"""
+        report = build_startup_report({"tensorflow": 4.2}, 1.5, 0.3, True)
+
+        assert report["framework_import_seconds"] == {"tensorflow": 4.2}
+        assert report["artifact_load_seconds"] == 1.5
+        assert report["warm_up_seconds"] == 0.3
+        assert report["total_seconds"] >= report["app_import_seconds"]
+        assert report["rss_mb"] > 0
+        assert client.get("/startup").status_code == 200
+
+
+# Tests du format compact des artefacts
+class TestCompactArtifacts:
+    """Tests de l'export/import des artefacts logistiques mappés en mémoire"""
+
+    TEXTS = [
+        "great flight thank you",
+        "worst delay ever, lost my luggage",
+        "the crew was great but the delay was terrible",
+        "unknown words only zzz",
+    ]
+
+    @pytest.fixture
+    def fitted_pipeline(self):
+        """Petit pipeline TF-IDF (uni/bigrammes) + régression logistique entraîné"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        texts = [
+            "great flight", "great crew thank you", "amazing service", "love this airline",
+            "worst delay ever", "lost my luggage", "terrible service", "delay again, terrible",
+        ]
+        labels = [1, 1, 1, 1, 0, 0, 0, 0]
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+        model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+        return vectorizer, model
+
+    def test_roundtrip_matches_sklearn(self, fitted_pipeline, tmp_path):
+        """Test que le format compact reproduit predict_proba (précision float32)"""
+        vectorizer, model = fitted_pipeline
+        manifest = export_logistic_artifacts(vectorizer, model, str(tmp_path))
+
+        scorer, loaded_manifest = load_logistic_artifacts(str(tmp_path))
+
+        assert loaded_manifest["version"] == manifest["version"]
+        expected = model.predict_proba(vectorizer.transform(self.TEXTS))
+        np.testing.assert_allclose(scorer.predict_proba(self.TEXTS), expected, atol=1e-6)
+
+        # La table reste dans les tableaux mappés en mémoire (pas de copie dans un dictionnaire)
+        from compact_artifacts import MemmapVocabularyTable
+
+        table = scorer.table
+        assert isinstance(table, MemmapVocabularyTable) and isinstance(table.slots, np.memmap)
+        assert len(table) == len(vectorizer.vocabulary_)
+
+        # Chaque terme est retrouvé, un par un comme par batch, avec les mêmes poids
+        terms = list(vectorizer.vocabulary_) + ["absent du vocabulaire"]
+        idf, weights = table.lookup(terms)
+        for position, (term, index) in enumerate(vectorizer.vocabulary_.items()):
+            assert idf[position] == pytest.approx(vectorizer.idf_[index], rel=1e-6)
+            assert table.get(term) == (idf[position], weights[position])
+        assert table.get("absent du vocabulaire") is None
+        assert (idf[-1], weights[-1]) == (0.0, 0.0)
+
+        # Batch ou texte seul: mêmes logits
+        batch = scorer.decision_function(self.TEXTS + [""])
+        assert batch[:-1] == pytest.approx([scorer.decision_one(text) for text in self.TEXTS])
+        assert batch[-1] == pytest.approx(loaded_manifest["intercept"])
+
+    def test_corrupted_file_is_rejected(self, fitted_pipeline, tmp_path):
+        """Test que la vérification des empreintes détecte un fichier modifié"""
+        vectorizer, model = fitted_pipeline
+        export_logistic_artifacts(vectorizer, model, str(tmp_path))
+
+        coef_path = tmp_path / "coef.npy"
+        data = bytearray(coef_path.read_bytes())
+        data[-1] ^= 0xFF
+        coef_path.write_bytes(bytes(data))
+
+        with pytest.raises(ValueError):
+            load_logistic_artifacts(str(tmp_path))
+
+    def test_unsupported_format_version(self, fitted_pipeline, tmp_path):
+        """Test qu'une version de format inconnue est refusée"""
+        vectorizer, model = fitted_pipeline
+        export_logistic_artifacts(vectorizer, model, str(tmp_path))
+
+        manifest_path = tmp_path / "manifest.json"
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest["format_version"] = 99
+        manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            load_logistic_artifacts(str(tmp_path))
+
+    def test_app_loads_compact_directory(self, fitted_pipeline, tmp_path):
+        """Test que MODEL_PATH peut désigner un répertoire au format compact"""
+        from app import build_logistic_bundle
+
+        vectorizer, model = fitted_pipeline
+        manifest = export_logistic_artifacts(vectorizer, model, str(tmp_path))
+
+        bundle = build_logistic_bundle(str(tmp_path))
+
+        assert bundle.version == manifest["version"]
+        assert bundle.vectorizer is None
+        predicted_class, _, _ = predict_logistic_batch(["great flight"], bundle)[0]
+        assert predicted_class == 1
+
+
+class TestOnnxBackend:
+    """Tests de l'export ONNX, du backend onnxruntime et du rapport d'écart"""
+
+    TEXTS = ["great flight thanks", "worst delay ever lost luggage", "the crew was great", "never again delay"]
+
+    @pytest.fixture
+    def keras_tokenizer(self):
+        """Tokenizer Keras limité à 6 mots, avec jeton hors vocabulaire"""
+        tokenizer = tf.keras.preprocessing.text.Tokenizer(num_words=6, oov_token="<oov>")
+        tokenizer.fit_on_texts(self.TEXTS)
+        return tokenizer
+
+    def test_keras_tokenizer_matches_keras(self, keras_tokenizer):
+        """Test que le tokenizer sans TensorFlow reproduit texts_to_sequences + pad_sequences"""
+        texts = ["Great flight!! Thanks", "unknown words, delay", "great " * 10, ""]
+        expected = tf.keras.preprocessing.sequence.pad_sequences(
+            keras_tokenizer.texts_to_sequences(texts), maxlen=8, padding='post'
+        )
+
+        encoded = KerasSequenceTokenizer(keras_tokenizer_config(keras_tokenizer)).encode(texts, 8)
+
+        np.testing.assert_array_equal(encoded["sequences"], expected)
+
+    def test_drift_report(self):
+        """Test du taux d'accord, des écarts et des exactitudes"""
+        reference = np.array([[0.9, 0.1], [0.2, 0.8], [0.45, 0.55], [0.3, 0.7]])
+        candidate = np.array([[0.88, 0.12], [0.2, 0.8], [0.55, 0.45], [0.3, 0.7]])
+
+        report = drift_report(reference, candidate, labels=np.array([0, 1, 1, 1]))
+
+        assert report["agreement"] == 0.75
+        assert report["flipped"] == 1
+        assert report["max_abs_diff"] == pytest.approx(0.1)
+        assert report["reference_accuracy"] == 1.0
+        assert report["candidate_accuracy"] == 0.75
+        assert report["accuracy_delta"] == pytest.approx(-0.25)
+
+    def test_drift_refuses_training_sample(self, tmp_path):
+        """Test que le rapport d'écart refuse un échantillon tiré des données d'entraînement"""
+        from onnx_backend import run_drift_report
+
+        with patch("onnx_backend.read_manifest") as read_manifest:
+            with pytest.raises(ValueError):
+                run_drift_report(str(tmp_path), "../data/training.1600000.processed.noemoticon.csv")
+        read_manifest.assert_not_called()
+
+    def test_select_precision_falls_back_to_fp32(self):
+        """Test que fp32 est servi quand la version int8 n'a pas été exportée"""
+        assert select_precision({"files": {"model.onnx": "abc"}}, "int8") == "fp32"
+        assert select_precision({"files": {"model.onnx": "a", "model.int8.onnx": "b"}}, "int8") == "int8"
+        with pytest.raises(ValueError):
+            select_precision({"files": {}}, "fp16")
+
+    def test_predict_onnx_bert_softmax(self):
+        """Test que les logits d'un BERT exporté sont convertis en probabilités"""
+        bundle = Mock(model_type="onnx")
+        bundle.tokenizer.return_value = {"input_ids": [[101, 102], [101, 7, 102]]}
+        bundle.tokenizer.pad_token_id = 0
+        bundle.model.source_type = "bert"
+        bundle.model.run.side_effect = lambda features: np.array([[2.0, -1.0], [-1.0, 2.0]])
+
+        predictions = predict_onnx_batch(["bad", "good"], bundle)
+
+        assert [p[0] for p in predictions] == [0, 1]
+        assert predictions[1][2]["positive"] == pytest.approx(_softmax([-1.0, 2.0])[1])
+
+    def test_export_and_serve_keras_model(self, keras_tokenizer, tmp_path):
+        """Test de l'export d'un LSTM (fp32 et int8) et de l'écart avec TensorFlow"""
+        pytest.importorskip("tf2onnx")
+        pytest.importorskip("onnxruntime")
+        import joblib
+        from app import build_bundle, build_onnx_bundle, predict_with_bundle
+        from onnx_backend import export_onnx_model
+
+        keras_model = tf.keras.Sequential([
+            tf.keras.layers.Input((128,)),
+            tf.keras.layers.Embedding(10, 4),
+            tf.keras.layers.LSTM(4),
+            tf.keras.layers.Dense(1, activation="sigmoid"),
+        ])
+        model_path = str(tmp_path / "lstm_model.h5")
+        keras_model.save(model_path)
+        joblib.dump(keras_tokenizer, str(tmp_path / "lstm_model_tokenizer.pkl"))
+
+        manifest = export_onnx_model("lstm", model_path, str(tmp_path / "onnx"), quantize=True)
+        assert set(manifest["files"]) == {"model.onnx", "model.int8.onnx"}
+
+        reference = predict_with_bundle(self.TEXTS, build_bundle("lstm", model_path))
+        fp32 = predict_with_bundle(self.TEXTS, build_onnx_bundle(str(tmp_path / "onnx"), precision="fp32"))
+        int8 = build_onnx_bundle(str(tmp_path / "onnx"), precision="int8")
+
+        for expected, actual in zip(reference, fp32):
+            assert actual[2]["positive"] == pytest.approx(expected[2]["positive"], abs=1e-5)
+        assert int8.model.precision == "int8"
+        assert len(predict_with_bundle(self.TEXTS, int8)) == len(self.TEXTS)
+
+
+class TestKerasGraph:
+    """Tests de l'inférence Keras compilée en graphe (tokenisation comprise)"""
+
+    TEXTS = ["great flight thanks", "worst delay ever lost luggage", "the crew was great", "never again delay"]
+
+    def make_tokenizer(self, **kwargs):
+        tokenizer = tf.keras.preprocessing.text.Tokenizer(**kwargs)
+        tokenizer.fit_on_texts(self.TEXTS)
+        return tokenizer
+
+    def make_model(self, length=8):
+        return tf.keras.Sequential([
+            tf.keras.layers.Input((length,)),
+            tf.keras.layers.Embedding(10, 4),
+            tf.keras.layers.LSTM(4),
+            tf.keras.layers.Dense(1, activation="sigmoid"),
+        ])
+
+    @pytest.mark.parametrize("kwargs", [{"num_words": 6, "oov_token": "<oov>"}, {"num_words": 6}, {}])
+    def test_vectorize_matches_keras(self, kwargs):
+        """Test que la tokenisation dans le graphe reproduit texts_to_sequences + pad_sequences"""
+        from keras_graph import KerasGraphModel
+
+        tokenizer = self.make_tokenizer(**kwargs)
+        texts = ["Great flight!! Thanks", "unknown words, delay", "great " * 10,
+                 "", "The CREW\twas-great", "ÉTÉ delay"]
+        expected = tf.keras.preprocessing.sequence.pad_sequences(
+            tokenizer.texts_to_sequences(texts), maxlen=8, padding='post'
+        )
+
+        graph = KerasGraphModel(self.make_model(), keras_tokenizer_config(tokenizer), 8)
+
+        np.testing.assert_array_equal(graph.vectorize(tf.constant(texts)).numpy(), expected)
+
+    def test_predict_matches_keras_and_traces_once(self):
+        """Test que l'appel du graphe reproduit model.predict, avec une seule trace"""
+        from keras_graph import KerasGraphModel
+
+        tokenizer = self.make_tokenizer(num_words=6, oov_token="<oov>")
+        keras_model = self.make_model()
+        graph = KerasGraphModel(keras_model, keras_tokenizer_config(tokenizer), 8)
+
+        for size in (1, 3, 4):
+            padded = tf.keras.preprocessing.sequence.pad_sequences(
+                tokenizer.texts_to_sequences(self.TEXTS[:size]), maxlen=8, padding='post'
+            )
+            expected = keras_model.predict(padded, verbose=0)
+            np.testing.assert_allclose(graph.predict(self.TEXTS[:size]), expected, atol=1e-6)
+
+        assert graph.serve.experimental_get_tracing_count() == 1
+
+    def test_build_dl_bundle(self, tmp_path):
+        """Test du chargement d'un LSTM sauvegardé et de la prédiction par le graphe"""
+        import joblib
+        from app import MAX_LENGTH, build_dl_bundle, predict_dl_batch
+
+        model_path = str(tmp_path / "lstm_model.h5")
+        self.make_model(MAX_LENGTH).save(model_path)
+        joblib.dump(self.make_tokenizer(num_words=6), str(tmp_path / "lstm_model_tokenizer.pkl"))
+
+        bundle = build_dl_bundle("lstm", model_path)
+        predictions = predict_dl_batch(self.TEXTS, bundle)
+
+        assert len(bundle.artifacts) == 2
+        assert len(predictions) == len(self.TEXTS)
+        assert all(p[2]["positive"] + p[2]["negative"] == pytest.approx(1.0) for p in predictions)
+
+    def test_build_dl_bundle_requires_tokenizer(self, tmp_path):
+        """Test qu'un modèle sans tokenizer associé n'est pas chargé"""
+        from app import MAX_LENGTH, build_dl_bundle
+
+        model_path = str(tmp_path / "cnn_model.h5")
+        self.make_model(MAX_LENGTH).save(model_path)
+
+        with pytest.raises(FileNotFoundError):
+            build_dl_bundle("cnn", model_path)
+
+
+class TestLengthBucketing:
+    """Tests du remplissage dynamique et des tranches de longueur BERT"""
+
+    def test_length_buckets(self):
+        """Test de la répartition des séquences par tranche, de la plus courte à la plus longue"""
+        buckets = length_buckets([5, 40, 12, 130, 16, 17], (16, 32, 64, 128))
+
+        assert buckets == [[0, 2, 4], [5], [1], [3]]
+
+    def test_parse_boundaries(self):
+        """Test de la lecture de BERT_LENGTH_BUCKETS"""
+        assert parse_boundaries("64, 16,32,16") == (16, 32, 64)
+        with pytest.raises(ValueError):
+            parse_boundaries("0,16")
+
+    def test_pad_bucket_to_longest(self):
+        """Test que la tranche est complétée jusqu'à sa plus longue séquence"""
+        encoding = {"input_ids": [[101, 5, 102], [101, 102], [101, 1, 2, 3, 102]],
+                    "attention_mask": [[1, 1, 1], [1, 1], [1, 1, 1, 1, 1]]}
+
+        features = pad_bucket(encoding, [0, 1], {"input_ids": 9})
+
+        np.testing.assert_array_equal(features["input_ids"], [[101, 5, 102], [101, 102, 9]])
+        np.testing.assert_array_equal(features["attention_mask"], [[1, 1, 1], [1, 1, 0]])
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_predict_bert_batch_buckets_by_length(self, mock_tokenizer, mock_model):
+        """Test d'une passe forward par tranche, résultats dans l'ordre des textes"""
+        lengths = {"short": 4, "long": 40, "tiny": 3}
+        mock_tokenizer.pad_token_id = 0
+        mock_tokenizer.side_effect = lambda texts, **kwargs: {
+            "input_ids": [[101] + [7] * (lengths[t] - 2) + [102] for t in texts],
+            "attention_mask": [[1] * lengths[t] for t in texts],
+        }
+        widths = []
+
+        def forward(features):
+            widths.append(features["input_ids"].shape[1])
+            outputs = Mock()
+            # Logits positifs pour les séquences longues
+            positive = features["input_ids"].shape[1] > 16
+            outputs.logits = tf.constant([[0.0, 1.0] if positive else [1.0, 0.0]] * features["input_ids"].shape[0])
+            return outputs
+        mock_model.side_effect = forward
+
+        padding_before = TOKENS_TOTAL.value(model_type="bert", kind="padding")
+        predictions = predict_bert_batch(["short", "long", "tiny"])
+
+        assert sorted(widths) == [4, 40]
+        assert [p[0] for p in predictions] == [0, 1, 0]
+        # Seul "tiny" est complété (1 jeton), au lieu de 3 x 128 - 47 avec max_length
+        assert TOKENS_TOTAL.value(model_type="bert", kind="padding") - padding_before == 1
+        assert "padding" not in mock_tokenizer.call_args.kwargs
+
+
+class TestCascade:
+    """Tests de la cascade logistique -> BERT selon la confiance"""
+
+    # Confiance du modèle logistique par texte
+    CONFIDENCE = {"great flight": 0.95, "meh": 0.55, "awful delay": 0.9, "not bad": 0.6}
+
+    @pytest.fixture
+    def cascade_models(self):
+        """Deux modèles factices: logistique (confiance variable) et BERT (toujours positif)"""
+        bundles = {
+            "logistic": ModelBundle("logistic", "lr.pkl", Mock(), version="lr-v1"),
+            "bert": ModelBundle("bert", "bert", Mock(), version="bert-v1"),
+        }
+        calls = []
+
+        def predict(texts, bundle):
+            calls.append((bundle.model_type, list(texts)))
+            if bundle.model_type == "bert":
+                return [(1, 0.99, {"negative": 0.01, "positive": 0.99}) for _ in texts]
+            return [(0, self.CONFIDENCE[t], {"negative": self.CONFIDENCE[t], "positive": 1 - self.CONFIDENCE[t]})
+                    for t in texts]
+
+        with patch("app.get_bundle", side_effect=lambda name=None: bundles[name]), \
+             patch("app.predict_with_bundle", side_effect=predict), \
+             patch("app.cascade_unavailable_stages", return_value=[]), \
+             patch("app.CASCADE_THRESHOLD", 0.8):
+            yield calls
+
+    def test_only_uncertain_tweets_escalate(self, cascade_models):
+        """Test que seuls les tweets sous le seuil passent au second modèle"""
+        results = predict_cascade(["great flight", "meh", "awful delay", "not bad"])
+
+        assert [stage for stage, _, _ in results] == ["logistic", "bert", "logistic", "bert"]
+        assert [version for _, version, _ in results] == ["lr-v1", "bert-v1", "lr-v1", "bert-v1"]
+        assert cascade_models == [
+            ("logistic", ["great flight", "meh", "awful delay", "not bad"]),
+            ("bert", ["meh", "not bad"]),
+        ]
+
+    def test_confident_batch_skips_second_stage(self, cascade_models):
+        """Test que le second modèle n'est pas appelé si tous les tweets sont sûrs"""
+        predict_cascade(["great flight", "awful delay"])
+
+        assert [model_type for model_type, _ in cascade_models] == ["logistic"]
+
+    def test_predict_reports_stage(self, cascade_models):
+        """Test que /predict?model=cascade indique le modèle qui a répondu"""
+        response = client.post("/predict?model=cascade", json={"text": "meh"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["model_type"] == "cascade"
+        assert data["stage"] == "bert"
+        assert data["model_version"] == "bert-v1"
+
+    def test_batch_reports_stage_per_tweet(self, cascade_models):
+        """Test des étapes par tweet sur /predict/batch, dans l'ordre des tweets"""
+        response = client.post("/predict/batch?model=cascade",
+                               json={"tweets": ["not bad", "great flight"]})
+
+        assert response.status_code == 200
+        assert [p["stage"] for p in response.json()["predictions"]] == ["bert", "logistic"]
+
+    @patch('app.MODEL_TYPE', 'logistic')
+    @patch('app.model', None)
+    def test_unloaded_stage_returns_503(self):
+        """Test qu'une cascade dont le modèle par défaut n'est pas chargé répond 503, pas 500"""
+        response = client.post("/predict?model=cascade", json={"text": "meh"})
+
+        assert response.status_code == 503
+        assert "logistic" in response.json()["detail"]
+
+        with patch("app.get_bundle", return_value=ModelBundle("logistic", "lr.pkl", None)):
+            with pytest.raises(ModelUnavailableError):
+                predict_cascade(["meh"])
+
+    def test_stream_rejects_cascade(self):
+        """Test que la cascade n'est pas proposée sur /predict/stream"""
+        response = client.post("/predict/stream?model=cascade", content=b"great flight\n")
+
+        assert response.status_code == 400
+
+    def test_calibration_table(self):
+        """Test du compromis débit / exactitude simulé par seuil"""
+        from calibrate_cascade import calibration_table
+
+        first = np.array([[0.9, 0.1], [0.4, 0.6], [0.3, 0.7], [0.45, 0.55]])
+        second = np.array([[0.8, 0.2], [0.1, 0.9], [0.9, 0.1], [0.2, 0.8]])
+        labels = np.array([0, 1, 1, 1])
+
+        never, half = calibration_table(first, second, labels, 0.001, 0.01, thresholds=[0.5, 0.65])
+
+        assert never["escalation_rate"] == 0.0
+        assert never["accuracy"] == 1.0
+        assert never["ms_per_tweet"] == 1.0
+        assert half["escalation_rate"] == 0.5
+        assert half["accuracy"] == 1.0
+        assert half["ms_per_tweet"] == pytest.approx(6.0)
+
+    def test_calibration_uses_held_out_split(self, tmp_path):
+        """Test que la calibration lit le jeu de validation et refuse les données d'entraînement"""
+        from calibrate_cascade import main
+        from score_csv import load_labeled_sample
+
+        val_path = tmp_path / "val_lemmatized.csv"
+        val_path.write_text("text,sentiment\ngreat flight,1\nNA,0\nawful delay,0\n", encoding="utf-8")
+        texts, labels = load_labeled_sample(str(val_path), 10)
+
+        assert sorted(zip(texts, labels.tolist())) == [("NA", 0), ("awful delay", 0), ("great flight", 1)]
+
+        train_path = tmp_path / "train_lemmatized.csv"
+        train_path.write_text(val_path.read_text(encoding="utf-8"), encoding="utf-8")
+        with patch("calibrate_cascade.score_stage") as score_stage:
+            assert main([str(train_path)]) == 1
+        score_stage.assert_not_called()
+
+
+class TestHealthProbes:
+    """Tests du préchauffage et des sondes de vie / disponibilité"""
+
+    def test_warm_up_every_batch_size(self):
+        """Test qu'un batch de chaque taille configurée passe dans le modèle"""
+        with patch('app.predict_with_bundle') as mock_predict:
+            warm_up_bundle(Mock(), batch_sizes=(1, 8, 32))
+
+        assert [len(call.args[0]) for call in mock_predict.call_args_list] == [1, 8, 32]
+
+    def test_liveness(self):
+        """Test que la sonde de vie ne dépend pas du modèle"""
+        with patch('app.model', None):
+            response = client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.vectorizer', None)
+    @patch('app.tokenizer')
+    @patch('app.model')
+    def test_ready_after_warm_up(self, mock_model, mock_tokenizer):
+        """Test que le worker n'est prêt qu'une fois préchauffé (BERT, sans vectorizer)"""
+        with patch.dict('app.warmup_report', {"status": "running"}):
+            response = client.get("/health/ready")
+            assert response.status_code == 503
+            assert response.json()["checks"]["warmed_up"] is False
+
+        with patch.dict('app.warmup_report', {"status": "done"}):
+            response = client.get("/health/ready")
+            health = client.get("/health").json()
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert health["status"] == "healthy"
+        assert health["ready"] is True
+
+    def test_not_ready_without_model(self):
+        """Test qu'un worker sans modèle n'est pas prêt"""
+        with patch('app.model', None), patch.dict('app.warmup_report', {"status": "done"}):
+            response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["checks"]["model_loaded"] is False
+
+    def test_warm_up_failure(self):
+        """Test qu'un échec du préchauffage laisse le worker non prêt"""
+        with patch('app.warm_up_models', side_effect=RuntimeError("boom")), \
+                patch.dict('app.warmup_report', {"status": "pending"}):
+            asyncio.run(run_warm_up())
+            report = dict(warmup_report)
+
+        assert report["status"] == "failed"
+        assert report["error"] == "boom"
+
+
+class TestLoadTest:
+    """Tests du générateur de charge (load_test.py)"""
+
+    def test_load_demo_tweets(self):
+        """Test de l'extraction des tweets de démonstration (blocs ``` sans langage)"""
+        from load_test import DEFAULT_TWEETS, load_tweets
+
+        tweets = load_tweets(DEFAULT_TWEETS)
+
+        assert len(tweets) >= 10
+        assert all("\n" not in tweet and not tweet.startswith("{") for tweet in tweets)
+
+    def test_load_sentiment140_tweets(self, tmp_path):
+        """Test du tirage de tweets dans un CSV Sentiment140 (sans en-tête)"""
+        from load_test import load_tweets
+
+        path = tmp_path / "sample.csv"
+        path.write_text("".join(f'"4","{i}","date","NO_QUERY","user","tweet {i}"\n' for i in range(10)))
+
+        tweets = load_tweets(str(path), size=4)
+
+        assert len(tweets) == 4
+        assert all(tweet.startswith("tweet ") for tweet in tweets)
+
+    def test_summarize(self):
+        """Test du débit, du taux d'erreur et des percentiles (requêtes réussies seulement)"""
+        from load_test import summarize
+
+        records = [(i / 1000, 200) for i in range(1, 101)] + [(5.0, 500), (0.1, 0)]
+
+        summary = summarize(records, duration=2.0, tweets_per_request=4)
+
+        assert summary["requests"] == 102
+        assert summary["errors"] == 2
+        assert summary["status_codes"] == {"200": 100, "500": 1, "0": 1}
+        assert summary["throughput_rps"] == 50.0
+        assert summary["tweets_per_second"] == 200.0
+        assert summary["latency_ms"]["p50"] == pytest.approx(50.5)
+        assert summary["latency_ms"]["max"] == pytest.approx(100.0)
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_scenarios_in_process(self, mock_tokenizer, mock_model):
+        """Test des boucles fermée et ouverte contre l'application ASGI"""
+        import httpx
+        from load_test import run_scenario
+
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                closed = await run_scenario(http, ["great flight", "lost luggage"], "predict",
+                                            concurrency=2, max_requests=6, warmup_requests=1,
+                                            server_pid=os.getpid())
+                opened = await run_scenario(http, ["great flight", "lost luggage"], "batch",
+                                            batch_size=3, rate=200, max_requests=5, warmup_requests=0)
+            return closed, opened
+
+        closed, opened = asyncio.run(scenario())
+
+        assert closed["mode"] == "closed" and closed["requests"] == 6
+        assert closed["error_rate"] == 0.0
+        assert closed["peak_rss_mb"] > 0
+        assert opened["mode"] == "open" and opened["requests"] == 5
+        assert opened["tweets_per_second"] == pytest.approx(3 * opened["throughput_rps"], rel=0.01)
+        assert opened["cpu_percent"] is None
+
+
+class TestBenchmarks:
+    """Tests de la suite de microbenchmarks (benchmark.py)"""
+
+    def test_time_function(self):
+        """Test du calibrage des boucles et des statistiques de durée"""
+        from benchmark import time_function
+
+        calls = []
+        timing = time_function(lambda: calls.append(1), min_time=0.001, repeat=3, warmup=2)
+
+        assert str(timing["loops"])[0] in "125"
+        assert len(calls) >= 2 + 3 * timing["loops"]
+        assert 0 < timing["min"] <= timing["median"]
+
+    def test_compare_results(self):
+        """Test de la détection des régressions par rapport à une référence"""
+        from benchmark import compare_results
+
+        def report(**medians):
+            return {"benchmarks": {key: {"median": value} for key, value in medians.items()}}
+
+        rows = compare_results(
+            report(slow=1.3, fast=0.5, same=1.05, added=1.0),
+            report(slow=1.0, fast=1.0, same=1.0, removed=1.0),
+            threshold=0.1
+        )
+
+        assert {row["benchmark"]: row["status"] for row in rows} == {
+            "slow": "regression", "fast": "improvement", "same": "ok",
+            "added": "new", "removed": "missing",
+        }
+
+    def test_missing_artifacts_skipped(self, tmp_path):
+        """Test qu'un modèle sans artefacts est ignoré avec la raison"""
+        from benchmark import collect_benchmarks
+
+        with patch.dict('app.MODEL_PATHS', {"lstm": str(tmp_path / "absent.h5")}):
+            benchmarks, skipped, versions = collect_benchmarks(["lstm"], [1, 128])
+
+        names = {(name, size) for name, size, _ in benchmarks}
+        assert "predict_dl_batch[lstm]" in skipped
+        assert ("TweetBatchInput", 1) in names and ("TweetBatchInput", 128) not in names
+        assert ("serialize_batch_response", 128) in names
+        assert versions == {}
+
+
+class TestCompactResponse:
+    """Tests du format de réponse compact de /predict/batch"""
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_compact_by_query(self, mock_tokenizer, mock_model):
+        """Test du format compact demandé par ?format=compact (colonnes dans l'ordre des tweets)"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        response = client.post("/predict/batch?format=compact", json={"tweets": ["Great!", "Bad!"]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == COMPACT_MEDIA_TYPE
+        assert "content-encoding" not in response.headers
+        data = response.json()
+        assert data["count"] == 2
+        assert data["labels"] == ["Négatif", "Positif"]
+        assert len(data["model_versions"]) == 1
+        assert data["columns"]["sentiment"] == [1, 1]
+        assert data["columns"]["positive"] == pytest.approx([_softmax([0.2, 0.8])[1]] * 2, abs=1e-6)
+        assert "stage" not in data["columns"]
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_compact_by_accept_compressed(self, mock_tokenizer, mock_model):
+        """Test du format compact négocié par Accept, compressé au-delà du seuil"""
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.3, 0.7])
+        tweets = [f"tweet {i}" for i in range(100)]
+
+        response = client.post("/predict/batch", json={"tweets": tweets},
+                               headers={"Accept": COMPACT_MEDIA_TYPE, "Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["columns"]["sentiment"] == [1] * 100
+
+    def test_unknown_format_rejected(self):
+        """Test qu'un format inconnu est refusé"""
+        response = client.post("/predict/batch?format=xml", json={"tweets": ["Great!"]})
+
+        assert response.status_code == 400
+
+    def test_compress_negotiation(self):
+        """Test du seuil de compression et de la négociation Accept-Encoding"""
+        import gzip
+        from compact_response import accepted_encodings, compress
+
+        body = b"x" * 2000
+
+        assert compress(body[:100], "gzip", min_bytes=1024) == (body[:100], None)
+        assert compress(body, "gzip;q=0, br", min_bytes=1024) == (body, None)
+        compressed, encoding = compress(body, "br, gzip", min_bytes=1024, algorithms=("gzip",))
+        assert encoding == "gzip" and gzip.decompress(compressed) == body
+        assert accepted_encodings("gzip;q=0.5, zstd;q=0, br") == ["gzip", "br"]
+
+    def test_compact_payload_versions_and_stages(self):
+        """Test des colonnes version et stage, présentes seulement si elles varient"""
+        from compact_response import compact_payload, encode_json
+
+        prediction = (1, 0.9, {"negative": 0.1, "positive": 0.9})
+        payload = compact_payload(
+            [("logistic", "v1", prediction), ("bert", "v2", prediction), ("logistic", "v1", prediction)],
+            "cascade", "2024-01-15T10:30:00", ["Négatif", "Positif"]
+        )
+        data = json.loads(encode_json(payload))
+
+        assert data["model_versions"] == ["v1", "v2"]
+        assert data["columns"]["version"] == [0, 1, 0]
+        assert data["columns"]["stage"] == ["logistic", "bert", "logistic"]
+        assert data["columns"]["confidence"] == [0.9, 0.9, 0.9]
+
+
+class TestLogging:
+    """Tests du logging non bloquant, échantillonné et structuré"""
+
+    def _capture(self, log_format="json", queue_size=100):
+        import io
+        from logging_setup import setup_logging
+
+        stream = io.StringIO()
+        setup_logging("INFO", log_format, queue_size, stream=stream)
+        return stream
+
+    def _restore(self):
+        import app as api
+        from logging_setup import setup_logging
+
+        setup_logging(api.LOG_LEVEL, api.LOG_FORMAT, api.LOG_QUEUE_SIZE)
+
+    def test_json_records_with_request_id(self):
+        """Test des enregistrements JSON écrits par le thread dédié (request_id et extra)"""
+        import logging
+        from logging_setup import request_id_var, stop_logging
+
+        stream = self._capture()
+        try:
+            token = request_id_var.set("req-42")
+            logging.getLogger("test").info("Prédiction: %s", "Positif", extra={"event": "prediction", "confidence": 0.92})
+            request_id_var.reset(token)
+            stop_logging()
+        finally:
+            self._restore()
+
+        record = json.loads(stream.getvalue().strip())
+        assert record["message"] == "Prédiction: Positif"
+        assert record["request_id"] == "req-42"
+        assert record["event"] == "prediction"
+        assert record["confidence"] == 0.92
+        assert record["level"] == "INFO"
+
+    def test_text_format_and_unknown_format(self):
+        """Test du format texte et du refus d'un format inconnu"""
+        import logging
+        from logging_setup import build_formatter, stop_logging
+
+        stream = self._capture("text")
+        try:
+            logging.getLogger("test").warning("Modèle %s absent", "bert")
+            stop_logging()
+        finally:
+            self._restore()
+
+        assert "WARNING" in stream.getvalue() and "Modèle bert absent" in stream.getvalue()
+        with pytest.raises(ValueError):
+            build_formatter("xml")
+
+    def test_full_queue_drops_without_blocking(self):
+        """Test qu'une file pleine abandonne l'enregistrement au lieu de bloquer"""
+        import logging
+        import queue
+        from logging_setup import LOG_RECORDS_DROPPED, NonBlockingQueueHandler
+
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        test_logger = logging.getLogger("test.queue")
+        test_logger.addHandler(handler)
+        test_logger.propagate = False
+        dropped = LOG_RECORDS_DROPPED.value()
+        try:
+            for i in range(3):
+                test_logger.warning("log %d", i)
+        finally:
+            test_logger.removeHandler(handler)
+            test_logger.propagate = True
+
+        assert handler.queue.qsize() == 1
+        assert handler.queue.get_nowait().getMessage() == "log 0"
+        assert LOG_RECORDS_DROPPED.value() == dropped + 2
+
+    def test_request_id_header(self):
+        """Test de l'en-tête X-Request-ID: repris s'il est valide, généré sinon"""
+        response = client.get("/health/live", headers={"X-Request-ID": "abc-123"})
+        assert response.headers["x-request-id"] == "abc-123"
+
+        generated = client.get("/health/live").headers["x-request-id"]
+        assert len(generated) == 32
+
+        replaced = client.get("/health/live", headers={"X-Request-ID": "a b\"c"}).headers["x-request-id"]
+        assert replaced != 'a b"c'
+
+    def test_should_sample(self):
+        """Test des taux d'échantillonnage extrêmes"""
+        from logging_setup import should_sample
+
+        assert not any(should_sample(0.0) for _ in range(100))
+        assert all(should_sample(1.0) for _ in range(100))
+
+    @patch('app.MODEL_TYPE', 'bert')
+    @patch('app.model')
+    @patch('app.tokenizer')
+    def test_prediction_logs_sampled(self, mock_tokenizer, mock_model, caplog):
+        """Test que les logs par prédiction suivent PREDICTION_LOG_SAMPLE_RATE"""
+        import logging
+
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
+
+        with caplog.at_level(logging.INFO, logger="app"):
+            with patch('app.PREDICTION_LOG_SAMPLE_RATE', 0.0):
+                assert client.post("/predict", json={"text": "Great flight!"}).status_code == 200
+            assert not [r for r in caplog.records if getattr(r, "event", None) == "prediction"]
+
+            with patch('app.PREDICTION_LOG_SAMPLE_RATE', 1.0):
+                assert client.post("/predict", json={"text": "Great flight!"}).status_code == 200
+
+        logged = [r for r in caplog.records if getattr(r, "event", None) == "prediction"]
+        assert len(logged) == 1
+        assert logged[0].sentiment == "Positif"
+        assert logged[0].model_type == "bert"
+
+
+class TestPreprocessing:
+    """Tests du prétraitement partagé entre les notebooks et l'API"""
+
+    STOPWORDS = {"i", "this", "the", "for", "be", "to", "it"}
+
+    def _preprocessor(self, **kwargs):
+        from preprocessing import TweetPreprocessor
+
+        # Normaliseur factice: les corpus NLTK ne sont pas requis pour les tests
+        return TweetPreprocessor(stopwords=self.STOPWORDS, normalizer=lambda token: token.rstrip("s"), **kwargs)
+
+    def test_clean_matches_notebook_steps(self):
+        """Test des étapes du notebook: URLs, mentions, #, RT, non alphabétiques, stopwords, longueur"""
+        preprocessor = self._preprocessor()
+
+        assert preprocessor.clean("@user I love this movie! http://example.com #awesome") == "love movie awesome"
+        assert preprocessor.clean("RT @someone: Great news!!! Visit www.example.com for more info") == "great new visit more info"
+        assert preprocessor.clean("This is soooo bad 123 times worse") == "soooo bad time worse"
+        assert preprocessor.clean(None) == ""
+
+    def test_clean_batch_matches_clean(self):
+        """Test que le batch (substitutions en une passe) donne le même résultat tweet par tweet"""
+        preprocessor = self._preprocessor()
+        tweets = ["Flights\ndelayed again #fail", "@airparadis thanks!", None, "rt great crew", "", "ok"]
+
+        assert preprocessor.clean_batch(tweets) == [preprocessor.clean(tweet) for tweet in tweets]
+        assert preprocessor.clean_batch(tweets)[0] == "flight delayed again fail"
+        assert preprocessor.clean_batch([]) == []
+
+    def test_token_cache_bounded(self):
+        """Test du cache des tokens: borné, et chaque token n'est normalisé qu'une fois"""
+        normalized = []
+        from preprocessing import TweetPreprocessor
+
+        preprocessor = TweetPreprocessor(stopwords=set(), cache_size=2,
+                                         normalizer=lambda token: normalized.append(token) or token)
+        preprocessor.clean_batch(["great great great flight"])
+        preprocessor.clean("crew crew")
+
+        assert normalized == ["great", "flight", "crew"]
+        info = preprocessor.cache_info()
+        assert info.currsize == 2 and info.maxsize == 2 and info.hits == 3
+
+    def test_build_preprocessor_modes(self):
+        """Test des modes: none (textes bruts) et mode inconnu"""
+        from preprocessing import build_preprocessor
+
+        assert build_preprocessor("none") is None
+        with pytest.raises(ValueError):
+            build_preprocessor("tfidf")
+
+    def test_api_feeds_preprocessed_text(self):
+        """Test que le modèle reçoit les tweets nettoyés comme à l'entraînement"""
+        import app as api
+
+        vectorizer = Mock()
+        vectorizer.transform.side_effect = lambda texts: texts
+        model = Mock()
+        model.predict_proba.side_effect = lambda texts: np.array([[0.3, 0.7]] * len(texts))
+        bundle = ModelBundle("logistic", "lr.pkl", model, vectorizer=vectorizer)
+
+        with patch('app.text_preprocessor', self._preprocessor()):
+            api.predict_with_bundle(["@user I love the crews! http://t.co/x", "Delayed #again"], bundle)
+
+        vectorizer.transform.assert_called_once_with(["love crew", "delayed again"])
+
+    def test_missing_corpora_fail_readiness_unless_fallback(self):
+        """Test qu'un prétraitement impossible rend le worker non prêt, sauf PREPROCESSING_FALLBACK"""
+        import app as api
+
+        with patch('app.preprocessing_loaded', False), patch('app.text_preprocessor', None), \
+                patch('app.preprocessing_error', None), \
+                patch('app.build_preprocessor', side_effect=LookupError("wordnet")):
+            assert api.load_text_preprocessor() is False
+            assert api.preprocessing_info()["error"].startswith("corpus NLTK manquants")
+            assert api.readiness_checks()["preprocessing"] is False
+
+            # Pas de modèle servi sur des textes bruts: load_model échoue avant de le charger
+            with patch('app.load_logistic_model', return_value=True) as load_logistic, \
+                    patch('app.MODEL_TYPE', 'logistic'):
+                assert api.load_model() is False
+                load_logistic.assert_not_called()
+
+                with patch('app.PREPROCESSING_FALLBACK', True):
+                    assert api.readiness_checks()["preprocessing"] is True
+                    assert api.load_model() is True
+
+    def test_app_import_does_not_import_nltk(self):
+        """Test que nltk n'est importé qu'au chargement du modèle (démarrage à froid)"""
+        import subprocess
+        import sys
+
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, app; assert 'nltk' not in sys.modules"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+
+
+class TestCorpusPreprocessing:
+    """Tests du prétraitement parallèle du corpus (preprocess_corpus.py)"""
+
+    @pytest.fixture
+    def sentiment140_csv(self, tmp_path):
+        """Petit fichier au format Sentiment140 (latin-1, sans en-tête)"""
+        path = tmp_path / "tweets.csv"
+        rows = [
+            f'{4 if i % 2 else 0},{i},"Mon Apr 06 22:19:45 PDT 2009",NO_QUERY,user{i},"@user The flights {i} caf\xe9 http://t.co/x"'
+            for i in range(5)
+        ]
+        path.write_bytes("\n".join(rows).encode("latin-1"))
+        return str(path)
+
+    @pytest.fixture
+    def fake_nltk(self):
+        """Stopwords et normaliseurs factices (corpus NLTK non requis)"""
+        from preprocessing import TweetPreprocessor
+
+        def build(use_stemming, cache_size):
+            return TweetPreprocessor(use_stemming=use_stemming, cache_size=cache_size, stopwords={"the"},
+                                     normalizer=(lambda token: token[:4]) if use_stemming else (lambda token: token.rstrip("s")))
+
+        with patch("preprocess_corpus.TweetPreprocessor", side_effect=build):
+            yield
+
+    def test_preprocess_file_and_resume(self, sentiment140_csv, tmp_path, fake_nltk):
+        """Test du nettoyage par paquets en Parquet partitionné, puis de la reprise"""
+        import pandas as pd
+        from preprocess_corpus import preprocess_file
+
+        output_dir = str(tmp_path / "processed")
+        summary = preprocess_file(sentiment140_csv, output_dir, chunk_size=2, workers=0)
+
+        assert summary["rows"] == 5 and summary["chunks"] == 3
+        assert set(summary["stage_tweets_per_second"]) == {"read", "lemmatized", "stemmed", "write"}
+
+        dataset = pd.read_parquet(output_dir)
+        lemmatized = dataset[dataset["variant"] == "lemmatized"].sort_values("id")
+        stemmed = dataset[dataset["variant"] == "stemmed"].sort_values("id")
+        assert lemmatized["id"].tolist() == [0, 1, 2, 3, 4]
+        assert lemmatized["sentiment"].tolist() == [0, 1, 0, 1, 0]
+        assert lemmatized["text"].iloc[0] == "@user The flights 0 café http://t.co/x"
+        assert lemmatized["text_clean"].iloc[0] == "flight caf"
+        assert stemmed["text_clean"].iloc[0] == "flig caf"
+
+        summary = preprocess_file(sentiment140_csv, output_dir, chunk_size=2, workers=0)
+
+        assert summary["rows"] == 0
+        assert summary["skipped_chunks"] == 3
+
+    def test_incompatible_checkpoint_and_unknown_variant(self, sentiment140_csv, tmp_path, fake_nltk):
+        """Test du refus d'un checkpoint produit avec d'autres paramètres et d'une variante inconnue"""
+        from preprocess_corpus import preprocess_file
+
+        output_dir = str(tmp_path / "processed")
+        preprocess_file(sentiment140_csv, output_dir, variants=["stemmed"], chunk_size=2, workers=0)
+
+        with pytest.raises(ValueError):
+            preprocess_file(sentiment140_csv, output_dir, variants=["stemmed"], chunk_size=3, workers=0)
+        with pytest.raises(ValueError):
+            preprocess_file(sentiment140_csv, output_dir, variants=["tokenized"], workers=0)
+
+    def test_no_resume_removes_previous_parts(self, sentiment140_csv, tmp_path, fake_nltk):
+        """Test qu'une relance sans reprise avec une autre taille de paquet ne garde pas les anciens paquets"""
+        import os
+        import pandas as pd
+        from preprocess_corpus import preprocess_file
+
+        output_dir = str(tmp_path / "processed")
+        preprocess_file(sentiment140_csv, output_dir, chunk_size=1, workers=0)
+        summary = preprocess_file(sentiment140_csv, output_dir, chunk_size=5, workers=0, resume=False)
+
+        assert summary["chunks"] == 1
+        assert os.listdir(os.path.join(output_dir, "variant=lemmatized")) == ["part-00000.parquet"]
+        assert len(pd.read_parquet(os.path.join(output_dir, "variant=stemmed"))) == 5
+
+
+class TestDatasetCache:
+    """Tests du cache Arrow typé des jeux de données (dataset_cache.py)"""
+
+    @pytest.fixture
+    def processed_csv(self, tmp_path):
+        """CSV prétraité avec en-tête, comme train_lemmatized.csv"""
+        path = tmp_path / "train_lemmatized.csv"
+        rows = ["text,sentiment"] + [f"flight {i},{i % 2}" for i in range(20)] + [",1", "NA,0"]
+        path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+        return path
+
+    def test_raw_sentiment140_types(self, tmp_path):
+        """Test de la conversion typée d'un fichier Sentiment140 brut"""
+        from dataset_cache import load_dataset
+
+        path = tmp_path / "training.csv"
+        path.write_bytes('"0","1","Mon Apr 06","NO_QUERY","a","caf\xe9"\n"4","2","Mon Apr 06","NO_QUERY","b","ok"\n'.encode("latin-1"))
+
+        df = load_dataset(str(path), cache_dir=str(tmp_path / "cache"))
+
+        assert list(df.columns) == ["sentiment", "id", "date", "query", "user", "text"]
+        assert str(df["sentiment"].dtype) == "int8" and df["sentiment"].tolist() == [0, 1]
+        assert str(df["id"].dtype) == "int64"
+        assert str(df["query"].dtype) == "category"
+        assert df["text"].tolist() == ["café", "ok"]
+
+    def test_cache_reuse_and_invalidation(self, processed_csv, tmp_path):
+        """Test de la réutilisation du cache, puis de sa reconstruction quand le CSV change"""
+        import os
+        from dataset_cache import build_cache, load_dataset
+
+        cache_dir = str(tmp_path / "cache")
+        df = load_dataset(str(processed_csv), cache_dir=cache_dir)
+        first = build_cache(str(processed_csv), cache_dir)
+
+        assert len(df) == 22
+        assert str(df["sentiment"].dtype) == "int8"
+        # Texte vide et tweet "NA" gardés comme textes
+        assert df["text"].tolist()[-2:] == ["", "NA"]
+
+        with patch("dataset_cache.pa_csv.open_csv") as open_csv:
+            load_dataset(str(processed_csv), cache_dir=cache_dir)
+        open_csv.assert_not_called()
+
+        processed_csv.write_text("text,sentiment\nnew flight,1\n", encoding="utf-8")
+        df = load_dataset(str(processed_csv), cache_dir=cache_dir)
+
+        assert df["text"].tolist() == ["new flight"]
+        assert not os.path.exists(first)
+        assert len(os.listdir(cache_dir)) == 1
+
+    def test_projection_and_stratified_sample(self, processed_csv, tmp_path):
+        """Test de la sélection de colonnes et de l'échantillon stratifié reproductible"""
+        from dataset_cache import load_dataset
+
+        cache_dir = str(tmp_path / "cache")
+        sample = load_dataset(str(processed_csv), columns=["sentiment", "text"], sample=10, cache_dir=cache_dir)
+
+        assert list(sample.columns) == ["sentiment", "text"]
+        assert sample["sentiment"].value_counts().to_dict() == {0: 5, 1: 5}
+        again = load_dataset(str(processed_csv), columns=["sentiment", "text"], sample=10, cache_dir=cache_dir,
+                             memory_map=False)
+        assert again["text"].tolist() == sample["text"].tolist()
+
+        odd = load_dataset(str(processed_csv), columns=["sentiment"], sample=7, cache_dir=cache_dir)
+        assert sorted(odd["sentiment"].value_counts().tolist()) == [3, 4]
+
+        with pytest.raises(ValueError):
+            load_dataset(str(processed_csv), columns=["label"], cache_dir=cache_dir)
+
+
+class TestWorkerLifecycle:
+    """Tests du préchargement du modèle et du recyclage des workers gunicorn"""
+
+    def test_process_memory(self):
+        """Test des mesures mémoire du worker"""
+        memory = process_memory()
+
+        assert set(memory) == {"rss", "pss", "shared", "private"}
+        assert memory["rss"] > 0
+        if memory["private"] is not None:
+            assert memory["private"] <= memory["rss"]
+
+    def test_memory_watchdog_recycles_once(self):
+        """Test que le worker s'arrête (SIGTERM) une seule fois au-delà du seuil"""
+        watchdog = MemoryWatchdog(100, measure=lambda: 200)
+
+        with patch("recycling.os.kill") as mock_kill:
+            assert watchdog.check() is True
+            assert watchdog.check() is False
+
+        mock_kill.assert_called_once()
+        assert watchdog.triggered
+
+    def test_memory_watchdog_under_limit(self):
+        """Test qu'aucun arrêt n'est demandé sous le seuil"""
+        watchdog = MemoryWatchdog(100, measure=lambda: 50)
+
+        with patch("recycling.os.kill") as mock_kill:
+            assert watchdog.check() is False
+
+        mock_kill.assert_not_called()
+
+    @patch('app.MODEL_TYPE', 'bert')
+    def test_preload_skips_tensorflow_models(self):
+        """Test que les modèles TensorFlow ne sont pas chargés avant le fork"""
+        with patch("app.load_model") as mock_load:
+            assert preload_model() is False
+
+        mock_load.assert_not_called()
+
+    def test_startup_keeps_preloaded_model(self):
+        """Test qu'un worker forké ne recharge pas le modèle préchargé"""
+        with patch("app.model_preload", {"pid": 1, "seconds": 0.1, "model_version": "v1"}), \
+             patch("app.load_model") as mock_load:
+            asyncio.run(startup_event())
+
+        mock_load.assert_not_called()
+
+    def test_worker_endpoint(self):
+        """Test de l'endpoint /worker"""
+        response = client.get("/worker")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pid"] == os.getpid()
+        assert data["memory_mb"]["rss"] > 0
+        assert "enabled" in data["recycling"]
+
+
 # Tests de validation des données
 class TestDataValidation:
     """Tests de validation des données d'entrée"""
@@ -398,15 +2258,9 @@ class TestIntegration:
     @patch('app.tokenizer')
     def test_full_workflow(self, mock_tokenizer, mock_model):
         """Test du workflow complet"""
-        # Configuration des mocks
-        mock_tokenizer.return_value = {
-            'input_ids': tf.constant([[101, 2023, 102]]),
-            'attention_mask': tf.constant([[1, 1, 1]])
-        }
-
-        mock_outputs = Mock()
-        mock_outputs.logits = tf.constant([[0.2, 0.8]])
-        mock_model.return_value = mock_outputs
+        # Configuration des mocks (une ligne de sortie par tweet du batch)
+        mock_tokenizer.side_effect = fake_bert_encoding
+        mock_model.side_effect = fake_bert_outputs([0.2, 0.8])
 
         # 1. Vérifier que l'API est disponible
         response = client.get("/health")
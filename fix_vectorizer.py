@@ -4,10 +4,17 @@ Script pour corriger le vectorizer TF-IDF
 Ce script recharge les données d'entraînement, refit le vectorizer et le sauvegarde correctement
 """
 
-import pandas as pd
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
 import os
+import sys
+
+# Chemins relatifs à la racine du dépôt (le script peut être lancé depuis n'importe où)
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Chargeur typé partagé avec les notebooks (cache Arrow, voir api/dataset_cache.py)
+sys.path.insert(0, os.path.join(ROOT_DIR, "api"))
+from dataset_cache import load_dataset
 
 print("🔧 Correction du vectorizer TF-IDF...")
 
@@ -15,20 +22,18 @@ print("🔧 Correction du vectorizer TF-IDF...")
 print("\n1. Chargement des données...")
 try:
     # Charger train_lemmatized (données preprocessées)
-    data_path = "data/processed/train_lemmatized.csv"
+    data_path = os.path.join(ROOT_DIR, "data", "processed", "train_lemmatized.csv")
 
     if not os.path.exists(data_path):
         print(f"❌ Fichier non trouvé: {data_path}")
-        import sys
         sys.exit(1)
 
-    df = pd.read_csv(data_path)
+    df = load_dataset(data_path)
     print(f"✓ Données chargées: {len(df)} tweets")
 
 except Exception as e:
     print(f"❌ Erreur lors du chargement des données: {e}")
     print("\nSi vous avez les données preprocessées, modifiez data_path dans ce script.")
-    import sys
     sys.exit(1)
 
 # Identifier la colonne de texte
@@ -36,7 +41,6 @@ text_column = 'text'  # Colonne dans les données preprocessées
 
 if text_column not in df.columns:
     print(f"❌ Colonne '{text_column}' non trouvée. Colonnes disponibles: {list(df.columns)}")
-    import sys
     sys.exit(1)
 
 print(f"✓ Utilisation de la colonne: {text_column}")
@@ -61,8 +65,8 @@ print(f"  - Has idf_: {hasattr(tfidf, 'idf_')}")
 
 # Sauvegarder
 print("\n3. Sauvegarde...")
-output_path = "models/tfidf_vectorizer.pkl"
-os.makedirs("models", exist_ok=True)
+output_path = os.path.join(ROOT_DIR, "models", "tfidf_vectorizer.pkl")
+os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
 joblib.dump(tfidf, output_path)
 print(f"✓ Vectorizer sauvegardé: {output_path}")
@@ -81,13 +85,33 @@ print(f"✓ Test de transformation réussi: {result.shape}")
 
 # Copier vers api/models
 print("\n5. Copie vers api/models...")
-api_output_path = "api/models/tfidf_vectorizer.pkl"
-os.makedirs("api/models", exist_ok=True)
+api_output_path = os.path.join(ROOT_DIR, "api", "models", "tfidf_vectorizer.pkl")
+os.makedirs(os.path.dirname(api_output_path), exist_ok=True)
 joblib.dump(tfidf, api_output_path)
 print(f"✓ Copié vers: {api_output_path}")
 
+# Export au format compact (chargé par numpy.memmap, voir api/compact_artifacts.py)
+print("\n6. Export au format compact...")
+api_model_path = os.path.join(ROOT_DIR, "api", "models", "logistic_regression_model.pkl")
+compact_output_path = os.path.join(ROOT_DIR, "api", "models", "logistic_compact")
+if os.path.exists(api_model_path):
+    from compact_artifacts import export_logistic_artifacts
+
+    try:
+        manifest = export_logistic_artifacts(
+            tfidf, joblib.load(api_model_path), compact_output_path,
+            sources={"model": api_model_path, "vectorizer": api_output_path}
+        )
+        print(f"✓ Exporté vers: {compact_output_path} (version {manifest['version']})")
+    except ValueError as e:
+        print(f"⚠️  Export compact impossible: {e}")
+else:
+    print(f"⚠️  Modèle non trouvé ({api_model_path}), export compact ignoré")
+
 print("\n✅ Vectorizer corrigé avec succès!")
 print(f"\nFichiers créés:")
 print(f"  - {output_path}")
 print(f"  - {api_output_path}")
+if os.path.exists(compact_output_path):
+    print(f"  - {compact_output_path}/")
 print("\nVous pouvez maintenant commit et push ces fichiers sur GitHub.")